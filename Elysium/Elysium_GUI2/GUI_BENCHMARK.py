@@ -0,0 +1,217 @@
+# GUI_BENCHMARK.py
+# This is a headless benchmark of the GUI's telemetry path. It builds the full MainWindow on Qt's offscreen platform
+# and feeds synthetic telemetry into GUIController from a background thread, exactly as the EthernetClient does, at
+# increasing rates until the main thread can no longer keep up. Each run is appended as one JSON line to the output
+# file (by default in benchmark_results/ next to this file, which git ignores), so results can be compared across
+# versions.
+#
+# Usage: python GUI_BENCHMARK.py [--rates 100 200 500 ...] [--duration 3] [--graphs 0] [--painted-grid] [--output FILE]
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse, json, platform, random, resource, subprocess, sys, tempfile, threading, time
+from datetime import datetime
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer, QEventLoop
+from GUI_PARSER import benchmark_parser
+
+CHANNELS = [f"P{i}" for i in range(1, 9)] + [f"TC{i}" for i in range(1, 4)] + \
+           [f"LC{i}" for i in range(1, 4)] + [f"B{i}" for i in range(1, 3)]
+DEFAULT_RATES = [100, 200, 500, 1000, 2000, 5000, 10000, 20000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results")
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, "benchmark_results.jsonl")
+BATCH_INTERVAL = 0.005          # The producer sends all frames that came due every 5 ms, like a socket read would
+LAG_TIMER_INTERVAL = 10         # ms between event loop lag probes
+BACKLOG_LIMIT = 0.25            # A step is saturated if more than this many seconds of telemetry are still queued
+
+def make_line(frame):
+    """A telemetry line whose values stay clear of every abort threshold, so no abort dialog blocks the run"""
+    values = {name: 20 + random.random() for name in CHANNELS}
+    values["P3"] = values["P5"] + 10        # Upstream pressures above downstream pressures
+    values["P4"] = values["P6"] + 10
+    values["P7"] = values["P8"] + 10        # Line pressure above chamber pressure
+    return f"t:{frame * 1000}," + ",".join(f"{name}:{value:.3f}" for name, value in values.items())
+
+def rss_bytes():
+    """Current resident memory of this process (peak memory where /proc is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_event_loop(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+
+class PipelineBenchmark:
+    def __init__(self, window, duration):
+        self.window = window
+        self.controller = window.controller
+        self.duration = duration
+        self.processed = 0
+        self.lag_samples = []
+        self.last_probe = None
+
+        # Connected after the controller's own slot, so a frame is counted once the controller has handled it
+        self.controller.comms_signals.data_received.connect(self.count_frame)
+
+        self.lag_timer = QTimer()
+        self.lag_timer.timeout.connect(self.probe_lag)
+
+    def count_frame(self, data_str, received):
+        self.processed += 1
+
+    def probe_lag(self):
+        now = time.perf_counter()
+        if self.last_probe is not None:
+            self.lag_samples.append(max(now - self.last_probe - LAG_TIMER_INTERVAL / 1000, 0.0))
+        self.last_probe = now
+
+    def produce(self, rate, stop, sent):
+        """Background thread standing in for EthernetClient.listen_loop"""
+        start = time.perf_counter()
+        while not stop.is_set():
+            due = int((time.perf_counter() - start) * rate) - sent[0]
+            for _ in range(max(due, 0)):
+                self.controller.handle_received_data(make_line(sent[0]))
+                sent[0] += 1
+            time.sleep(BATCH_INTERVAL)
+
+    def drain(self, sent, timeout=5.0):
+        deadline = time.perf_counter() + timeout
+        while self.processed < sent and time.perf_counter() < deadline:
+            QApplication.processEvents()
+        return self.processed >= sent
+
+    def run_step(self, rate):
+        self.processed = 0
+        self.lag_samples = []
+        self.last_probe = None
+        sent, stop = [0], threading.Event()
+
+        rss_start, cpu_start, wall_start = rss_bytes(), time.process_time(), time.perf_counter()
+        self.lag_timer.start(LAG_TIMER_INTERVAL)
+        producer = threading.Thread(target=self.produce, args=(rate, stop, sent), daemon=True)
+        producer.start()
+        run_event_loop(self.duration)
+        stop.set()
+        producer.join()
+        self.lag_timer.stop()
+        wall, cpu, processed = time.perf_counter() - wall_start, time.process_time() - cpu_start, self.processed
+        backlog = sent[0] - processed
+        drained = self.drain(sent[0])
+
+        lags = sorted(self.lag_samples) or [0.0]
+        return {
+            "rate": rate,
+            "frames_sent": sent[0],
+            "frames_processed": processed,
+            "frames_per_second": processed / wall,
+            "samples_per_second": processed * len(CHANNELS) / wall,
+            "backlog_frames": backlog,
+            "saturated": backlog > rate * BACKLOG_LIMIT or not drained,
+            "loop_lag_ms_mean": 1000 * sum(lags) / len(lags),
+            "loop_lag_ms_p95": 1000 * lags[int(0.95 * (len(lags) - 1))],
+            "loop_lag_ms_max": 1000 * lags[-1],
+            "cpu_us_per_frame": 1e6 * cpu / processed if processed else None,
+            "rss_mb_start": rss_start / 1e6,
+            "rss_mb_end": rss_bytes() / 1e6,
+        }
+
+    def run_recording(self, frames):
+        """Time handle_new_data directly, with and without a recording open"""
+        lines = [make_line(i) for i in range(frames)]
+
+        start = time.perf_counter()
+        for line in lines:
+            self.controller.handle_new_data(line)
+        plain = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "benchmark.csv")
+            self.controller.start_recording(filename)
+            start = time.perf_counter()
+            for line in lines:
+                self.controller.handle_new_data(line)
+            recording = time.perf_counter() - start
+            self.controller.stop_recording()
+            size = os.path.getsize(filename)
+
+        return {
+            "frames": frames,
+            "frames_per_second_without_recording": frames / plain,
+            "frames_per_second_with_recording": frames / recording,
+            "recording_us_per_frame": 1e6 * (recording - plain) / frames,
+            "recording_mb_per_second": size / recording / 1e6,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark of the Elysium2 GUI telemetry path")
+    parser.add_argument("--rates", type=int, nargs="+", default=DEFAULT_RATES, help="Frame rates to step through")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds at each rate")
+    parser.add_argument("--graphs", type=int, default=0, help="Number of sensor graphs to keep open")
+    parser.add_argument("--painted-grid", action="store_true", help="Use the painted sensor grid instead of widgets")
+    parser.add_argument("--recording-frames", type=int, default=20000, help="Frames for the recording benchmark")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="File that each run is appended to")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    # Imported here so that importing the GUI is not part of any measurement, and after QApplication exists
+    from GUI_LAYOUT import MainWindow
+    window = MainWindow(painted_grid=args.painted_grid)
+    window.show()
+    for index in range(args.graphs):
+        window.controller.sensor_grid.open_graph(index)
+    QApplication.processEvents()
+
+    benchmark = PipelineBenchmark(window, args.duration)
+    steps = []
+    for rate in sorted(args.rates):
+        step = benchmark.run_step(rate)
+        steps.append(step)
+        print(f"{rate:>7} frames/s requested: {step['frames_per_second']:8.0f} processed, "
+              f"backlog {step['backlog_frames']:>7}, loop lag p95 {step['loop_lag_ms_p95']:6.1f} ms, "
+              f"{step['cpu_us_per_frame'] or 0:6.0f} us CPU/frame, RSS {step['rss_mb_end']:.0f} MB")
+        if step["saturated"]:
+            break
+
+    parser = benchmark_parser()
+    print("Parser: " + ", ".join(f"{layout} {rate:.0f} frames/s" for layout, rate in parser.items()))
+
+    sustained = max([s["frames_per_second"] for s in steps if not s["saturated"]], default=0.0)
+    recording = benchmark.run_recording(args.recording_frames)
+    print(f"Sustained: {sustained:.0f} frames/s ({sustained * len(CHANNELS):.0f} samples/s)")
+    print(f"Recording: {recording['frames_per_second_with_recording']:.0f} frames/s with, "
+          f"{recording['frames_per_second_without_recording']:.0f} frames/s without")
+
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "channels": len(CHANNELS),
+        "graphs_open": args.graphs,
+        "painted_grid": args.painted_grid,
+        "duration_per_rate": args.duration,
+        "sustained_frames_per_second": sustained,
+        "sustained_samples_per_second": sustained * len(CHANNELS),
+        "steps": steps,
+        "recording": recording,
+        "parser_frames_per_second": parser,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "a") as f:
+        f.write(json.dumps(result) + "\n")
+    print(f"Results appended to {args.output}")
+
+if __name__ == "__main__":
+    main()
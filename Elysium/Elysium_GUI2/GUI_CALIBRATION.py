@@ -0,0 +1,90 @@
+# GUI_CALIBRATION.py
+# This file converts raw sensor readings into engineering units using the per-channel curves in calibration.cfg.
+# Linear and polynomial curves are stored together as one coefficient matrix, so every polynomial channel of a frame
+# is calibrated with a single vectorized Horner evaluation. Lookup tables are interpolated with np.interp.
+# Once bound to a ChannelRegistry, a frame is calibrated as a vector of channel values, without any lookup by name.
+import numpy as np
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_lines
+
+class Calibration:
+    def __init__(self):
+        self.polynomials = {}               # Channel ID -> c0, c1, c2, ... (ascending powers)
+        self.tables = {}                    # Channel ID -> (raw points, engineering points), raw increasing
+
+        # All polynomials packed into one zero-padded matrix, rebuilt whenever a curve changes
+        self.poly_index = {}
+        self.coeffs = np.zeros((0, 1))
+
+        # The same curves by channel index, set by bind()
+        self.poly_slots = np.zeros(0, dtype=int)
+        self.slot_coeffs = np.zeros((0, 1))
+        self.table_slots = []
+
+    def _pack_polynomials(self):
+        width = max([len(c) for c in self.polynomials.values()] + [1])
+        self.coeffs = np.zeros((len(self.polynomials), width))
+        self.poly_index = {}
+        for row, (ID, c) in enumerate(self.polynomials.items()):
+            self.coeffs[row, :len(c)] = c
+            self.poly_index[ID] = row
+
+    def add_polynomial(self, ID, coeffs):
+        """Calibrate ID as c0 + c1*raw + c2*raw^2 + ..."""
+        self.polynomials[ID] = np.asarray(coeffs, dtype=float)
+        self.tables.pop(ID, None)
+        self._pack_polynomials()
+
+    def add_linear(self, ID, gain, offset):
+        self.add_polynomial(ID, [offset, gain])
+
+    def add_table(self, ID, raw_points, engineering_points):
+        order = np.argsort(raw_points)
+        self.tables[ID] = (np.asarray(raw_points, dtype=float)[order], np.asarray(engineering_points, dtype=float)[order])
+        if self.polynomials.pop(ID, None) is not None:
+            self._pack_polynomials()
+
+    def bind(self, channels):
+        """Look up the index of every calibrated channel in a ChannelRegistry once, for apply_frame"""
+        rows = [(channels.index[ID], row) for ID, row in self.poly_index.items() if ID in channels.index]
+        self.poly_slots = np.array([slot for slot, row in rows], dtype=int)
+        self.slot_coeffs = self.coeffs[[row for slot, row in rows]]
+        self.table_slots = [(channels.index[ID], raw_points, engineering_points)
+                            for ID, (raw_points, engineering_points) in self.tables.items() if ID in channels.index]
+
+    def apply_frame(self, raw):
+        """Return a copy of a frame's vector of raw values (by channel index, NaN where absent) in engineering units"""
+        engineering = raw.copy()
+        if len(self.poly_slots):
+            x = raw[self.poly_slots]
+            c = self.slot_coeffs
+            result = c[:, -1]
+            for power in range(c.shape[1] - 2, -1, -1):
+                result = result * x + c[:, power]
+            engineering[self.poly_slots] = result
+        for slot, raw_points, engineering_points in self.table_slots:
+            if raw[slot] == raw[slot]:
+                engineering[slot] = np.interp(raw[slot], raw_points, engineering_points)
+        return engineering
+
+def load_calibration(config_name=DEFAULT_CONFIG):
+    """Load calibration.cfg from a configuration set (a missing file means every channel is shown as received)"""
+    path = config_file("calibration.cfg", config_name)
+    calibration = Calibration()
+    for line in read_cfg_lines(path):
+        args = line.split(",")
+        ID, kind, params = args[0].upper(), args[1] if len(args) > 1 else "", args[2:]
+        try:
+            if kind == "linear" and len(params) == 2:
+                calibration.add_linear(ID, float(params[0]), float(params[1]))
+            elif kind == "poly" and params:
+                calibration.add_polynomial(ID, [float(c) for c in params])
+            elif kind == "table" and len(params) >= 2:
+                points = [[float(v) for v in point.split(":")] for point in params]
+                raw_points, engineering_points = zip(*points)
+                calibration.add_table(ID, raw_points, engineering_points)
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"{path}: expected 'ID,linear,gain,offset', 'ID,poly,c0,c1,...' "
+                             f"or 'ID,table,raw:value,raw:value,...' but found '{line}'")
+    return calibration
@@ -0,0 +1,99 @@
+# GUI_CALIBRATION_FIT.py
+# This is an offline tool that fits calibration curves from a recorded calibration session and writes them into
+# the calibration.cfg of a configuration set, in the format that GUI_CALIBRATION applies on ingest.
+#
+# The session is a CSV file with a "reference" column (the value from the reference gauge, thermometer or weight)
+# and either one column of raw readings per channel (e.g. "reference,P1,P2"), or "channel" and "raw" columns
+# with one reading per row. Several raw readings per reference value are fine, and empty cells are skipped.
+#
+# Usage: python GUI_CALIBRATION_FIT.py session.csv [--degree N] [--config NAME] [--channels P1 P2 ...] [--dry-run]
+import argparse, csv, os
+import numpy as np
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_lines
+
+def read_session(filename):
+    """Return {channel ID: (raw readings, reference values)} from a calibration session CSV"""
+    points = {}
+    with open(filename, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = [name.strip() for name in reader.fieldnames or []]
+        if "reference" not in fields:
+            raise ValueError(f"{filename}: expected a 'reference' column but found {fields}")
+        long_format = "channel" in fields and "raw" in fields
+
+        for row in reader:
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            if not row["reference"]:
+                continue
+            if long_format:
+                readings = [(row["channel"], row["raw"])]
+            else:
+                readings = [(name, row[name]) for name in fields if name != "reference"]
+            for ID, raw in readings:
+                if ID and raw:
+                    points.setdefault(ID.upper(), ([], []))
+                    points[ID.upper()][0].append(float(raw))
+                    points[ID.upper()][1].append(float(row["reference"]))
+
+    return {ID: (np.array(raw), np.array(ref)) for ID, (raw, ref) in points.items()}
+
+def fit_polynomial(raw, reference, degree):
+    """Least squares fit of reference = c0 + c1*raw + ..., returning (coefficients, residuals)"""
+    if len(np.unique(raw)) <= degree:
+        raise ValueError(f"need at least {degree + 1} distinct raw readings for a degree {degree} fit, got {len(np.unique(raw))}")
+    vander = np.vander(raw, degree + 1, increasing=True)
+    coeffs, _, _, _ = np.linalg.lstsq(vander, reference, rcond=None)
+    return coeffs, reference - vander @ coeffs
+
+def format_calibration(ID, coeffs):
+    """Format fitted coefficients as a calibration.cfg row"""
+    if len(coeffs) == 2:
+        return f"{ID},linear,{coeffs[1]:.10g},{coeffs[0]:.10g}"
+    return f"{ID},poly," + ",".join(f"{c:.10g}" for c in coeffs)
+
+def write_calibration(path, rows):
+    """Replace (or add) the rows of the given channels in calibration.cfg, keeping every other channel as it was"""
+    lines = [line for line in read_cfg_lines(path) if line.split(",")[0].upper() not in rows]
+    lines += list(rows.values())
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit sensor calibration curves from a recorded calibration session")
+    parser.add_argument("session", help="CSV file with a reference column and raw readings")
+    parser.add_argument("--degree", type=int, default=1, help="Polynomial degree of the fit (1 = linear)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Configuration set whose calibration.cfg is updated")
+    parser.add_argument("--channels", nargs="+", help="Only fit these channels")
+    parser.add_argument("--dry-run", action="store_true", help="Report the fit without writing calibration.cfg")
+    args = parser.parse_args()
+
+    points = read_session(args.session)
+    if args.channels:
+        points = {ID: points[ID] for ID in (c.upper() for c in args.channels) if ID in points}
+    if not points:
+        raise SystemExit(f"No calibration points found in {args.session}")
+
+    rows = {}
+    print(f"{'Channel':<10}{'Points':>8}{'RMS':>12}{'Max':>12}{'R^2':>10}  Calibration")
+    for ID, (raw, reference) in points.items():
+        try:
+            coeffs, residuals = fit_polynomial(raw, reference, args.degree)
+        except ValueError as e:
+            print(f"{ID:<10}skipped: {e}")
+            continue
+        spread = np.sum((reference - reference.mean()) ** 2)
+        r_squared = 1 - np.sum(residuals ** 2) / spread if spread > 0 else 1.0
+        rows[ID] = format_calibration(ID, coeffs)
+        print(f"{ID:<10}{len(raw):>8}{np.sqrt(np.mean(residuals ** 2)):>12.4g}{np.max(np.abs(residuals)):>12.4g}"
+              f"{r_squared:>10.5f}  {rows[ID]}")
+
+    path = config_file("calibration.cfg", args.config)
+    if args.dry_run or not rows:
+        return
+    if not os.path.isdir(os.path.dirname(path)):
+        raise SystemExit(f"Configuration set '{args.config}' does not exist")
+    write_calibration(path, rows)
+    print(f"Wrote {len(rows)} calibration(s) to {path}")
+
+if __name__ == "__main__":
+    main()
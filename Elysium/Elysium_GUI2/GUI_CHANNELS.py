@@ -0,0 +1,87 @@
+# GUI_CHANNELS.py
+# This file hosts the ChannelRegistry, the list of every channel the GUI knows about (from sensors.cfg, plus the
+# virtual channels). Each channel gets a dense integer index in the order it is registered, which is its slot in the
+# telemetry parser's value vector and its position in the sensor grid, so per-channel state can be kept in lists.
+from collections.abc import Mapping
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_pairs
+
+class Channel:
+    def __init__(self, index, ID, name="", unit="", group="", type="measured"):
+        self.index = index
+        self.ID = ID.upper()
+        self.name = name or self.ID
+        self.unit = unit
+        self.group = group
+        self.type = type            # "measured" (sent by the MCU) or "derived" (computed by the GUI)
+
+class ChannelRegistry:
+    def __init__(self):
+        self.channels = []
+        self.index = {}             # Channel ID -> index, only used where a channel is looked up by name
+
+    @classmethod
+    def from_config(cls, config_name=DEFAULT_CONFIG):
+        """Load the sensors of a configuration set from its sensors.cfg (same format as the C++ GUI)"""
+        path = config_file("sensors.cfg", config_name)
+        registry = cls()
+        for args, placement in read_cfg_pairs(path):
+            placement = placement.split(",")
+            if len(args) != 3 or len(placement) != 2:
+                raise ValueError(f"{path}: expected 'ID,name,unit' and 'group,type' but found "
+                                 f"'{','.join(args)}' and '{','.join(placement)}'")
+            ID, name, unit = args
+            group, type = placement
+            if type not in ("measured", "derived"):
+                raise ValueError(f"{path}: unknown type '{type}' for {ID}, expected measured or derived")
+            registry.add(ID, name, unit, group, type)
+        return registry
+
+    def add(self, ID, name="", unit="", group="", type="measured"):
+        """Register a channel and return it. A channel that is already registered keeps its index"""
+        ID = ID.upper()
+        if ID in self.index:
+            return self.channels[self.index[ID]]
+        channel = Channel(len(self.channels), ID, name, unit, group, type)
+        self.channels.append(channel)
+        self.index[ID] = channel.index
+        return channel
+
+    def get(self, ID):
+        """The channel with this ID, or None"""
+        index = self.index.get(ID.upper())
+        return None if index is None else self.channels[index]
+
+    @property
+    def IDs(self):
+        return [channel.ID for channel in self.channels]
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __getitem__(self, index):
+        return self.channels[index]
+
+    def __contains__(self, ID):
+        return ID.upper() in self.index
+
+class ChannelValues(Mapping):
+    """Read-only view of per-channel arrays by channel ID, for the code that looks channels up by name"""
+    def __init__(self, channels, values, received):
+        self.channels = channels
+        self.values = values
+        self.received = received    # Channels that have a value, the others are left out of the view
+
+    def __getitem__(self, ID):
+        index = self.channels.index.get(ID.upper())
+        if index is None or not self.received[index]:
+            raise KeyError(ID)
+        return self.values[index].item()
+
+    def __iter__(self):
+        return (channel.ID for channel in self.channels if self.received[channel.index])
+
+    def __len__(self):
+        return int(self.received.sum())
@@ -0,0 +1,147 @@
+# GUI_CLOCK.py
+# This file hosts the GUI's time base. Every sample and event time, and every internal duration, is an integer number of
+# nanoseconds on the host's monotonic clock (time.monotonic_ns), which neither jumps under NTP nor costs any formatting.
+# Wall-clock (date) time is only worked out at the boundaries of a recording, through a WallClock anchor.
+#
+# The ClockSync maps the Teensy's micros() clock onto the monotonic clock, so every sample and every event of a run is
+# stamped on the same time base as it arrives and nothing has to be lined up by hand afterwards. The Teensy clock is
+# modelled as host = teensy + offset + drift * teensy, fitted by linear regression over a sliding window of recent
+# measurements:
+# - SYNC round trips: the heartbeat sends "SYNC:<seq>", the MCU answers "SYNC:<seq>:<micros>", and the reply is taken
+#   to have been sampled halfway through the round trip (round trips that took much longer than the fastest ones in
+#   the window are not used, since their midpoint is uncertain).
+# - Without replies (firmware that does not answer SYNC), the telemetry itself: the smallest delay between a frame's
+#   Teensy time and its arrival in each second of Teensy time, which only adds the fixed minimum link latency.
+import threading, time
+from collections import deque
+from datetime import datetime
+import numpy as np
+
+SYNC_WINDOW = 64            # Measurements kept for the regression (about a minute at one per second)
+RTT_TOLERANCE = 3.0         # Round trips slower than this multiple of the fastest one in the window are not used
+MICROS_WRAP = 2 ** 32       # micros() is an unsigned 32 bit counter, which wraps after about 71.6 minutes
+REBOOT_JUMP = 1.0           # A Teensy clock going back by more than this (s) without wrapping means the MCU restarted
+NS_PER_SECOND = 1_000_000_000
+
+def now_ns():
+    """The current time on the GUI's time base, in integer nanoseconds"""
+    return time.monotonic_ns()
+
+class WallClock:
+    """Converts times on the GUI's time base to dates, from one reading of both clocks (taken when a recording starts)"""
+    def __init__(self):
+        self.monotonic_ns = time.monotonic_ns()
+        self.wall_ns = time.time_ns()
+
+    def format(self, t_ns=None):
+        """The date and time of t_ns (by default the anchor itself), formatted like 2025-04-12 14:03:27.512"""
+        t_ns = self.monotonic_ns if t_ns is None else t_ns
+        wall = datetime.fromtimestamp((self.wall_ns + t_ns - self.monotonic_ns) / NS_PER_SECOND)
+        return wall.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+class ClockSync:
+    def __init__(self):
+        self.lock = threading.Lock()    # Round trips are added by the comms thread, frames mapped on the main thread
+        self.reset()
+
+    def reset(self):
+        """Forget every measurement, e.g. on a new connection"""
+        with self.lock:
+            self.round_trips = deque(maxlen=SYNC_WINDOW)    # (teensy s, host s at the midpoint, round trip time s)
+            self.frame_delays = deque(maxlen=SYNC_WINDOW)   # (teensy s, smallest host - teensy in that second)
+            self.bucket = None                              # Second of Teensy time of the newest frame
+            self.bucket_delay = None
+            self.epoch = 0.0                                # Seconds added to micros() for the wraps so far
+            self.last_teensy = None
+            self.last_mapped = None
+            self.offset = None          # host - teensy at the reference time (s)
+            self.drift = 0.0            # Change of offset per second of Teensy time (negative if the Teensy runs fast)
+            self.reference = 0.0        # Teensy time (s) that offset refers to
+            self.source = None          # "round trip" or "telemetry", whichever the current fit uses
+
+    def _unwrap(self, micros):
+        """Teensy time in seconds, continuous across micros() wraps. Must hold the lock"""
+        t = micros / 1e6 + self.epoch
+        if self.last_teensy is not None and t < self.last_teensy - REBOOT_JUMP:
+            if self.last_teensy - t > MICROS_WRAP / 2e6:
+                self.epoch += MICROS_WRAP / 1e6
+                t += MICROS_WRAP / 1e6
+            else:
+                # The MCU restarted, so the measurements so far describe a clock that no longer exists
+                self.round_trips.clear()
+                self.frame_delays.clear()
+                self.bucket = self.bucket_delay = self.offset = self.last_mapped = None
+                self.epoch = 0.0
+                self.last_teensy = None     # Or every reading of the new clock would look like another restart
+                t = micros / 1e6
+        self.last_teensy = max(t, self.last_teensy or t)
+        return t
+
+    def add_round_trip(self, sent_ns, micros, received_ns):
+        """A SYNC reply carrying the Teensy's micros(), for a request sent and answered at these host times (ns)"""
+        with self.lock:
+            self.round_trips.append((self._unwrap(micros), (sent_ns + received_ns) / 2e9,
+                                     (received_ns - sent_ns) / NS_PER_SECOND))
+            self._fit()
+
+    def observe_frame(self, micros, received_ns):
+        """A telemetry frame stamped micros() by the Teensy, which arrived at this host time (ns)"""
+        with self.lock:
+            teensy = self._unwrap(micros)
+            delay = received_ns / NS_PER_SECOND - teensy
+            bucket = int(teensy)
+            if bucket != self.bucket:
+                if self.bucket_delay is not None:
+                    self.frame_delays.append(self.bucket_delay)
+                self.bucket, self.bucket_delay = bucket, (teensy, delay)
+                self._fit()
+            elif delay < self.bucket_delay[1]:
+                self.bucket_delay = (teensy, delay)
+
+    def _fit(self):
+        """Refit offset and drift. Must hold the lock"""
+        if len(self.round_trips) >= 2 or (self.round_trips and not self.frame_delays):
+            fastest = min(rtt for _, _, rtt in self.round_trips)
+            points = [(teensy, host - teensy) for teensy, host, rtt in self.round_trips
+                      if rtt <= RTT_TOLERANCE * fastest]
+            self.source = "round trip"
+        else:
+            points = list(self.frame_delays)
+            if self.bucket_delay is not None:
+                points.append(self.bucket_delay)
+            self.source = "telemetry"
+        if not points:
+            return
+        teensy, delay = np.array(points).T
+        self.reference = teensy.mean()
+        if len(points) >= 2 and np.ptp(teensy) > 0:
+            self.drift, self.offset = np.polyfit(teensy - self.reference, delay, 1)
+        else:
+            self.drift, self.offset = 0.0, delay.mean()
+
+    def to_host(self, micros, received_ns=None):
+        """
+        Host monotonic time (ns) of a Teensy micros() timestamp. Successive results never go backwards, even when the
+        fit is updated. Before the first measurement the arrival time (or the current time) is used.
+        """
+        with self.lock:
+            teensy = self._unwrap(micros)
+            if self.offset is None:
+                mapped = now_ns() if received_ns is None else received_ns
+            else:
+                mapped = round((teensy + self.offset + self.drift * (teensy - self.reference)) * NS_PER_SECOND)
+            if self.last_mapped is not None and mapped < self.last_mapped:
+                mapped = self.last_mapped
+            self.last_mapped = mapped
+            return mapped
+
+    def status(self):
+        """Short description of the current fit, for the log"""
+        with self.lock:
+            if self.offset is None:
+                return "not synchronized"
+            if self.source == "round trip":
+                rtt = min(rtt for _, _, rtt in self.round_trips) * 1e3
+                return (f"offset {self.offset:.6f} s, Teensy clock {-self.drift * 1e6:+.1f} ppm, "
+                        f"best round trip {rtt:.2f} ms")
+            return f"offset {self.offset:.6f} s, Teensy clock {-self.drift * 1e6:+.1f} ppm (from telemetry)"
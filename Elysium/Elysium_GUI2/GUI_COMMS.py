@@ -4,22 +4,29 @@ import socket
 import threading
 import time
 from PyQt5.QtCore import QObject, pyqtSignal
+from GUI_CLOCK import ClockSync, now_ns
 
 class CommsSignals(QObject):
-    data_received = pyqtSignal(str)
+    data_received = pyqtSignal(str, 'qint64')      # Line, time (ns) at which it was received
     abort_triggered = pyqtSignal(str, str)
+    event_logged = pyqtSignal(str, str, 'qint64')   # Event type, details, time (ns), from a backend thread
 
 class EthernetClient:
     def __init__(self):
         self.sock = None
         self.connecting = False
         self.connected = False
+        self.connections = 0            # Successful connections so far, which numbers the current one
         self.receive_callback = None
         self.log_event_callback = None
         self.heartbeat_active = False
         self.heartbeat_thread = None
         self.listening_active = False
         self.listen_thread = None
+        # Teensy clock synchronization, from the SYNC round trips sent along with the heartbeat
+        self.clock = ClockSync()
+        self.sync_sequence = 0
+        self.sync_sent = {}         # Sequence number -> time (ns) the SYNC request was sent
 
     def start_heartbeat(self):
         """Start sending heartbeat NOOP signals (Req 25)"""
@@ -33,6 +40,7 @@ class EthernetClient:
                     self.sock.sendall("NOOP\n".encode())
                     if self.log_event_callback:
                         self.log_event_callback("HEARTBEAT:NOOP")
+                    self.send_sync()
                 except Exception:
                     self.connected = False
                     break
@@ -44,11 +52,30 @@ class EthernetClient:
     def stop_heartbeat(self):
         self.heartbeat_active = False
 
+    def send_sync(self):
+        """Ask the MCU for its clock, which it answers with "SYNC:<sequence>:<micros>" """
+        self.sync_sequence += 1
+        # Requests that were never answered are forgotten after a few heartbeats
+        for sequence in [s for s in list(self.sync_sent) if s < self.sync_sequence - 8]:
+            self.sync_sent.pop(sequence, None)
+        self.sync_sent[self.sync_sequence] = now_ns()
+        self.sock.sendall(f"SYNC:{self.sync_sequence}\n".encode())
+
+    def handle_sync_reply(self, line, received):
+        parts = line.split(":")
+        try:
+            sent = self.sync_sent.pop(int(parts[1]))
+            self.clock.add_round_trip(sent, float(parts[2]), received)
+        except (IndexError, KeyError, ValueError):
+            pass
+
     def listen_loop(self):
         buffer = ""
         while self.connected and self.listening_active:
             try:
                 data = self.sock.recv(1024)
+                # Stamped here rather than on the main thread, so the GUI's queueing delay does not reach the clock sync
+                received = now_ns()
                 if not data:
                     self.connected = False
                     break
@@ -58,8 +85,11 @@ class EthernetClient:
                 # Split into lines while preserving partial messages
                 lines = decoded.split('\n')
                 for line in lines[:-1]:
-                    if line.strip() and self.receive_callback:
-                        self.receive_callback(line.strip())
+                    line = line.strip()
+                    if line.startswith("SYNC:"):
+                        self.handle_sync_reply(line, received)
+                    elif line and self.receive_callback:
+                        self.receive_callback(line, received)
                 buffer = lines[-1]
                 
             except Exception:
@@ -114,6 +144,9 @@ class EthernetClient:
 
                 # Tells the socket to connect to the MCU's IP and port
                 self.sock.connect((ip, port))
+                self.clock.reset()
+                self.sync_sent = {}
+                self.connections += 1
                 self.connected = True
                 self.connecting = False
 
@@ -0,0 +1,28 @@
+# GUI_CONFIG.py
+# This file locates the configuration sets (shared with the C++ Elysium_GUI) and reads their .cfg files
+import os
+
+# The configuration sets live with the C++ GUI so that both GUIs describe the hardware from the same files
+CONFIG_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                            "..", "Elysium_GUI", "Assets", "configurations"))
+DEFAULT_CONFIG = "elysium2"
+
+def config_dir(name=DEFAULT_CONFIG):
+    return os.path.join(CONFIG_ROOT, name)
+
+def config_file(filename, name=DEFAULT_CONFIG):
+    return os.path.join(config_dir(name), filename)
+
+def read_cfg_lines(path):
+    """Return the non-empty lines of a .cfg file, or an empty list if the file does not exist"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def read_cfg_pairs(path):
+    """Group a .cfg file that uses two rows per element into (first_row_args, second_row) pairs"""
+    lines = read_cfg_lines(path)
+    if len(lines) % 2:
+        raise ValueError(f"{path}: expected two rows per element but found {len(lines)} rows")
+    return [(lines[i].split(","), lines[i + 1]) for i in range(0, len(lines), 2)]
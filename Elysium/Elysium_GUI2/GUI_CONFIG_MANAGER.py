@@ -0,0 +1,165 @@
+# GUI_CONFIG_MANAGER.py
+# This file hosts the ConfigManager, which watches the active configuration set and reloads it while the GUI runs.
+# The directory is watched with QFileSystemWatcher (inotify on Linux, kqueue/ReadDirectoryChangesW elsewhere), so
+# nothing is polled. A changed set is fully loaded and validated into a new ConfigSet first, and only a valid one is
+# handed to the controller. Both the watcher and the telemetry handler run on the main thread, so the swap always
+# happens between two frames, and frames that arrive meanwhile wait in the event queue instead of being dropped.
+# While the controller holds swaps (during an abort, a lockout or a recording), a reload is put off until it is over.
+import os
+from PyQt5.QtCore import QFileSystemWatcher, QTimer
+from GUI_CONFIG import CONFIG_ROOT, DEFAULT_CONFIG, config_dir
+from GUI_CHANNELS import ChannelRegistry
+from GUI_VIRTUAL_CHANNELS import VirtualChannelEngine
+from GUI_CALIBRATION import Calibration, load_calibration
+from GUI_FILTERS import FilterBank, load_filter_banks
+from GUI_VALVES import ValveSet, load_control_states
+from GUI_VECTORS import VectorChannelSet
+from GUI_SPECTRUM import SpectralMonitor
+
+def list_configs():
+    """Names of the configuration sets, i.e. the subdirectories of CONFIG_ROOT"""
+    return sorted(name for name in os.listdir(CONFIG_ROOT) if os.path.isdir(os.path.join(CONFIG_ROOT, name)))
+
+class ConfigSet:
+    """
+    Everything the GUI loads from one configuration set. Loading never raises: a file that cannot be read is
+    replaced by its empty default and reported in errors, so the GUI can start with a partly broken set, while a
+    reload is only applied if errors is empty.
+    """
+    def __init__(self, name=DEFAULT_CONFIG):
+        self.name = name
+        self.errors = []
+
+        self.channels = self._load("sensors.cfg", ChannelRegistry.from_config, ChannelRegistry)
+        self.virtual_channels = self._load("virtual_channels.cfg", VirtualChannelEngine.from_config, VirtualChannelEngine)
+        self.calibration = self._load("calibration.cfg", load_calibration, Calibration)
+        self.display_filters, self.abort_filters = self._load("filters.cfg", load_filter_banks,
+                                                              lambda: (FilterBank(), FilterBank()))
+        self.valves = self._load("valves.cfg", ValveSet.from_config, ValveSet)
+        self.control_states = self._load("control_states.cfg", lambda name: load_control_states(self.valves, name), dict)
+        self.vectors = self._load("vectors.cfg", VectorChannelSet.from_config, VectorChannelSet)
+        self.spectral = self._load("spectrum.cfg", SpectralMonitor.from_config, SpectralMonitor)
+
+        # Virtual channels join the registry after the sensors, so their indices follow the measured channels
+        for channel in self.virtual_channels.channels:
+            self.channels.add(channel.ID, channel.name, channel.unit, type="derived")
+        # Each vector channel gets one tile (showing its magnitude), its axes are kept out of the registry
+        for vector in self.vectors.vectors:
+            self.channels.add(vector.ID, vector.name, vector.unit, type="vector")
+        self.validate()
+
+    def _load(self, filename, load, default):
+        try:
+            return load(self.name)
+        except (ValueError, OSError) as e:
+            self.errors.append(f"INVALID FORMAT in {filename}: {e}")
+            return default()
+
+    def validate(self):
+        """Check that every file only refers to channels that exist in this set"""
+        known = set(channel.ID for channel in self.channels if channel.type == "measured")
+        for channel in self.virtual_channels.channels:
+            missing = [name for name in channel.inputs if name not in known]
+            if missing:
+                self.errors.append(f"INVALID FORMAT in virtual_channels.cfg: {channel.ID} uses unknown channel(s) "
+                                   f"{', '.join(missing)}")
+            known.add(channel.ID)
+        # Calibration runs on the raw frame before virtual channels are computed, so their rows would never apply
+        virtual = set(channel.ID for channel in self.virtual_channels.channels)
+        calibrated = list(self.calibration.polynomials) + list(self.calibration.tables)
+        computed = sorted(set(ID for ID in calibrated if ID in virtual))
+        if computed:
+            self.errors.append(f"INVALID FORMAT in calibration.cfg: virtual channel(s) {', '.join(computed)} cannot "
+                               f"be calibrated, they are computed from calibrated values")
+        for filename, IDs in (("calibration.cfg", calibrated),
+                              ("filters.cfg", list(self.display_filters.chains) + list(self.abort_filters.chains)),
+                              ("spectrum.cfg", list(self.spectral.channels))):
+            missing = sorted(set(ID for ID in IDs if ID not in known))
+            if missing:
+                self.errors.append(f"INVALID FORMAT in {filename}: unknown channel(s) {', '.join(missing)}")
+        clashes = [axis for axis in self.vectors.axis_IDs if axis in self.channels]
+        if clashes:
+            self.errors.append(f"INVALID FORMAT in vectors.cfg: axes {', '.join(clashes)} are already channels")
+
+class ConfigManager:
+    # Editors save a file in several steps, so a reload waits until the directory has been quiet for this long (ms)
+    SETTLE_TIME = 300
+
+    def __init__(self, apply_config, report=print, name=DEFAULT_CONFIG):
+        """
+        apply_config: called with a validated ConfigSet to swap in.
+        report: called with a message whenever a reload succeeds or is rejected.
+        """
+        self.apply_config = apply_config
+        self.report = report
+        self.name = name
+        self.check_swap = None          # Optional callback (ConfigSet) -> reason to refuse the swap, or None
+        self.check_hold = None          # Optional callback () -> reason to put every swap off for now, or None
+        self.deferred = None            # Name of the set whose reload was put off
+
+        self.watcher = QFileSystemWatcher()
+        self.watcher.directoryChanged.connect(self._schedule_reload)
+        self.watcher.fileChanged.connect(self._schedule_reload)
+        self.settle_timer = QTimer()
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.timeout.connect(self.reload)
+
+    def load(self):
+        """Load the current configuration set for startup, reporting but tolerating errors"""
+        config = ConfigSet(self.name)
+        for error in config.errors:
+            self.report(error)
+        self._watch()
+        return config
+
+    def select(self, name):
+        """Switch to another configuration set"""
+        if name != self.name:
+            self.reload(name)
+
+    def _watch(self):
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        directory = config_dir(self.name)
+        # Watching the directory catches files being created, deleted or replaced, the files catch edits in place
+        self.watcher.addPath(directory)
+        files = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".cfg")]
+        if files:
+            self.watcher.addPaths(files)
+
+    def _schedule_reload(self, path):
+        self.settle_timer.start(self.SETTLE_TIME)
+
+    def reload(self, name=None):
+        """Load, validate and apply a configuration set (by default the current one). Returns whether it was applied"""
+        name = name or self.name
+        reason = self.check_hold() if self.check_hold else None
+        if reason:
+            self.deferred = name
+            self._watch()
+            self.report(f"Configuration {name} not loaded yet ({reason}), it will be once that is over")
+            return False
+        self.deferred = None
+
+        config = ConfigSet(name)
+        if not config.errors and self.check_swap:
+            reason = self.check_swap(config)
+            if reason:
+                config.errors.append(reason)
+        if not config.errors:
+            self.name = name
+        # Also re-arms the watch on files that an editor replaced by renaming a new file over them
+        self._watch()
+
+        if config.errors:
+            self.report(f"Configuration {name} not loaded, keeping {self.name}:\n" + "\n".join(config.errors))
+            return False
+        self.apply_config(config)
+        self.report(f"Configuration {name} loaded")
+        return True
+
+    def apply_deferred(self):
+        """Reload the set whose reload was put off, if any, now that swaps are not held anymore"""
+        if self.deferred:
+            self.reload(self.deferred)
@@ -1,15 +1,24 @@
 # GUI_CONNECT.py
 # This window displays a form to enter in information about how to connect to the MCU, 
 # with associated information on the state of the connection
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout, QLineEdit
+import os
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout, QLineEdit, QComboBox, QFileDialog
 from PyQt5.QtCore import Qt
 
 from GUI_COMMS import EthernetClient
 
 class ConnectionWindow(QWidget):
-    def __init__(self, ethernet_client: EthernetClient):
+    # Replay speeds offered to the operator, 0 replays as fast as the GUI can process the data
+    replay_speeds = {"1x": 1.0, "2x": 2.0, "5x": 5.0, "10x": 10.0, "Max": 0.0}
+
+    def __init__(self, ethernet_client: EthernetClient, start_replay=None, stop_replay=None, check_replay=None,
+                 select_config=None, config_names=None, current_config=None):
         super().__init__()
         self.ethernet_client = ethernet_client
+        self.start_replay = start_replay        # Returns whether the replay started
+        self.stop_replay = stop_replay
+        self.check_replay = check_replay        # Optional, returns why a replay cannot start now, or None
+        self.replaying = False
         
         eth_layout = QVBoxLayout()
         eth_layout.setContentsMargins(0, 0, 0, 0)
@@ -20,6 +29,17 @@ class ConnectionWindow(QWidget):
         # self.conn_status_label.setFont(QFont("Arial", 10, QFont.Bold))
         eth_layout.addWidget(self.conn_status_label)
 
+        # Counters of the telemetry that was lost, repeated or reordered on the way
+        self.integrity_label = QLabel("")
+        self.integrity_label.setAlignment(Qt.AlignCenter)
+        eth_layout.addWidget(self.integrity_label)
+
+        # Latest warning raised by the monitoring (e.g. a spectral peak), empty until there is one
+        self.warning_label = QLabel("")
+        self.warning_label.setAlignment(Qt.AlignCenter)
+        self.warning_label.hide()
+        eth_layout.addWidget(self.warning_label)
+
         eth_input_layout = QHBoxLayout()
         eth_input_layout.setContentsMargins(0, 0, 0, 0)
         eth_input_layout.setSpacing(10)
@@ -37,8 +57,81 @@ class ConnectionWindow(QWidget):
         eth_input_layout.addWidget(connect_btn)
         eth_layout.addLayout(eth_input_layout)
 
+        # Replay of past recordings, for post-test review and for measuring the GUI's throughput
+        if start_replay and stop_replay:
+            replay_layout = QHBoxLayout()
+            replay_layout.setContentsMargins(0, 0, 0, 0)
+            replay_layout.setSpacing(10)
+
+            self.replay_speed_input = QComboBox()
+            self.replay_speed_input.addItems(self.replay_speeds.keys())
+            self.replay_btn = QPushButton("Replay Recording")
+            self.replay_btn.clicked.connect(self.toggle_replay)
+
+            replay_layout.addWidget(QLabel("Replay Speed:"))
+            replay_layout.addWidget(self.replay_speed_input)
+            replay_layout.addWidget(self.replay_btn)
+            eth_layout.addLayout(replay_layout)
+
+        # Configuration set, which is reloaded in place whenever another one is selected or its files change
+        if select_config and config_names:
+            config_layout = QHBoxLayout()
+            config_layout.setContentsMargins(0, 0, 0, 0)
+            config_layout.setSpacing(10)
+
+            self.config_input = QComboBox()
+            self.config_input.addItems(config_names)
+            if current_config in config_names:
+                self.config_input.setCurrentText(current_config)
+            self.config_input.activated[str].connect(select_config)
+            self.config_status_label = QLabel("")
+
+            config_layout.addWidget(QLabel("Configuration:"))
+            config_layout.addWidget(self.config_input)
+            config_layout.addWidget(self.config_status_label)
+            eth_layout.addLayout(config_layout)
+
         self.setLayout(eth_layout)
 
+    def show_config_status(self, message, current_config):
+        if hasattr(self, "config_status_label"):
+            self.config_status_label.setText(message)
+            self.config_input.setCurrentText(current_config)
+
+
+    def show_integrity(self, message):
+        self.integrity_label.setText(message)
+
+    def show_warning(self, message):
+        self.warning_label.setText(f"WARNING: {message}")
+        self.warning_label.show()
+
+    def toggle_replay(self):
+        if self.replaying:
+            self.stop_replay()
+            return
+
+        reason = self.check_replay() if self.check_replay else None
+        if reason:
+            self.conn_status_label.setText(reason)
+            return
+
+        filename, _ = QFileDialog.getOpenFileName(self, "Replay Recording", "", "Recordings (*.csv *.txt *.log);;All Files (*)")
+        if not filename:
+            return
+
+        def replay_callback(stats):
+            self.replaying = False
+            self.replay_btn.setText("Replay Recording")
+            self.conn_status_label.setText(f"Replay finished: {stats['frames']} frames "
+                                           f"({stats['frames_per_second']:.0f} frames/s)")
+
+        speed = self.replay_speeds[self.replay_speed_input.currentText()]
+        if not self.start_replay(filename, speed, replay_callback):
+            return
+        self.replaying = True
+        self.replay_btn.setText("Stop Replay")
+        self.conn_status_label.setText(f"Replaying {os.path.basename(filename)}")
 
     def connect_ethernet(self):
         # Get the IP and port from the input fields
@@ -48,6 +141,10 @@ class ConnectionWindow(QWidget):
             self.conn_status_label.setText("Port must be a number")
             return
         port = int(port_text)
+
+        # Connecting to the MCU ends any replay in progress
+        if self.replaying:
+            self.stop_replay()
     
         # Update the UI to show connecting state
         self.conn_status_label.setText("Connecting...")
@@ -2,41 +2,75 @@
 # This file will manage all UI related states, and stores functions that will manipulate them
 import csv, os
 from ast import Dict
+import numpy as np
 from PyQt5.QtWidgets import QVBoxLayout, QPushButton, QDialog, QLabel, QDialogButtonBox, QCheckBox, QMessageBox, QGroupBox
-from PyQt5.QtCore import Qt, QTimer, QDateTime
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 from GUI_ABORT import AbortWindow
 from GUI_LOGO import LogoWindow
 from GUI_DAQ import DAQWindow
 from GUI_COMMS import EthernetClient, CommsSignals
+from GUI_REPLAY import ReplayClient
 from GUI_CONNECT import ConnectionWindow
 from GUI_VALVE_DIAGRAM import ValveDiagramWindow
-from GUI_GRAPHS import SensorGridWindow
+from GUI_GRAPHS import SensorGridWindow, PaintedSensorGrid
 from GUI_VALVE_CONTROL import ValveControlWindow
+from GUI_PARSER import TelemetryParser
+from GUI_CONFIG_MANAGER import ConfigManager, list_configs
+from GUI_VECTORS import VectorGraph
+from GUI_SPECTRUM import SpectrumWindow
+from GUI_CLOCK import WallClock, now_ns
+from GUI_INTEGRITY import StreamIntegrityMonitor, StalenessTracker
+from GUI_MIRROR import MIRROR_HOST, TelemetryMirror
+from GUI_CHANNELS import ChannelValues
+
+ABORT_PERSISTENCE_NS = 150_000_000     # How long an upstream pressure violation must last before it aborts (150 ms)
+TELEMETRY_ABORT_CHANNELS = ("P2", "P3", "P4", "P5", "P6", "P7", "P8")  # Channels the abort checks cannot do without
 
 class GUIController:
-    def __init__(self):
+    def __init__(self, painted_grid=False, mirror_port=None, mirror_host=MIRROR_HOST):
+        """
+        painted_grid: draw the sensor tiles with PaintedSensorGrid instead of widgets, for many channels
+        mirror_port: republish the telemetry and events to read-only viewers on this TCP port (see GUI_MIRROR)
+        mirror_host: the interface the mirror listens on
+        """
         self.current_sensor_values: Dict[str, float] = {}
 
         # These signals are functions that will be run when the backend EthernetClient receives new packets
         self.comms_signals = CommsSignals()
         self.comms_signals.data_received.connect(self.process_data_main_thread)
         self.comms_signals.abort_triggered.connect(self.handle_abort)
+        self.comms_signals.event_logged.connect(self.log_event)
 
         # The EthernetClient will connect to the "flight" MCU and listen for packets in a backend thread
         self.ethernet_client = EthernetClient()
         self.ethernet_client.receive_callback = self.handle_received_data
         self.ethernet_client.log_event_callback = self.log_event
+        # The live client is kept aside while a recording is replayed in its place
+        self.live_client = self.ethernet_client
 
         # For file recording
         self.csv_file = None
         self.csv_writer = None
+        self.wall_clock = None              # Anchors the recording's monotonic times to the date, taken when it starts
+
+        # Optional fan-out of what this GUI receives to viewers on other machines, set up before anything is logged
+        self.mirror = None
+        if mirror_port is not None:
+            self.mirror = TelemetryMirror(mirror_port, mirror_host)
+            self.mirror.log_event_callback = self.handle_mirror_event
+            try:
+                self.mirror.start()
+            except OSError as e:
+                # The viewers are optional, so the ground station starts without them (e.g. the port is taken)
+                self.mirror = None
+                print(f"Mirror disabled, cannot listen on {mirror_host}:{mirror_port}: {e}")
+                self.handle_mirror_event("MIRROR:ERROR", f"Cannot listen on {mirror_host}:{mirror_port}: {e}")
 
         # These are constants and dictionaries that the UI needs to be tracked
         self.abort_active = False
         self.lockout_mode = False
         self.ncs3_opened_due_to_p2 = False
-        self.current_sensor_values = {}
         self.abort_modes = {}
         self.pre_abort_valve_states = {}
         self.fire_sequence_btn = None
@@ -47,22 +81,242 @@ class GUIController:
         self.throttling_enabled = False
         self.gimbaling_enabled = False
 
+        # Everything that comes from the configuration set (sensors, virtual channels, calibration, filters, valves and
+        # control states) is loaded together, and reloaded whenever its files change or another set is selected
+        self.config_status = ""             # Latest configuration message, shown once the connection panel exists
+        self.config_manager = ConfigManager(self.apply_config, report=self.report_config)
+        self.config_manager.check_swap = self.check_config_swap
+        self.config_manager.check_hold = self.check_config_hold
+        self.config = None
+        self.use_config(self.config_manager.load())
+
         # Here we declare most of the UI elements that will be used. They are owned by the Controller to make it easy to manage interconnections
-        self.diagram = ValveDiagramWindow()
-        self.conn_widget = ConnectionWindow(ethernet_client=self.ethernet_client)
-        self.valve_control = ValveControlWindow(apply_valve_state=self.apply_valve_state, show_fire_sequence_dialog=self.show_fire_sequence_dialog)
+        # The connection and abort controls come first, the panels that only display telemetry after them
+        self.conn_widget = ConnectionWindow(ethernet_client=self.ethernet_client, start_replay=self.start_replay, stop_replay=self.stop_replay,
+                                            check_replay=self.check_replay,
+                                            select_config=self.config_manager.select, config_names=list_configs(), current_config=self.config.name)
+        self.conn_widget.show_config_status(self.config_status, self.config_manager.name)
+        self.abort_menu = AbortWindow(trigger_manual_abort=self.trigger_manual_abort, confirm_safe_state=self.confirm_safe_state)
+        self.diagram = ValveDiagramWindow(self.valves)
+        self.valve_control = ValveControlWindow(self.control_states, apply_valve_state=self.apply_valve_state, show_fire_sequence_dialog=self.show_fire_sequence_dialog)
         self.status_label = QLabel("Current State: None")
-        self.sensor_grid = SensorGridWindow()
+        grid_class = PaintedSensorGrid if painted_grid else SensorGridWindow
+        self.sensor_grid = grid_class(self.channels, open_vector_graph=self.open_vector_graph,
+                                      gaps_for=lambda index, since: self.integrity.gaps_for(index, since))
+        self.vector_graphs = {}
+        self.spectrum_window = None
         self.daq_window = DAQWindow(self)
-        self.abort_menu = AbortWindow(trigger_manual_abort=self.trigger_manual_abort, confirm_safe_state=self.confirm_safe_state)
-
-        # Some of the UI elements have callbacks that need to connect to functions in GUIController. This behavior may be revisited
-        self.sensor_grid.signals.update_signal.connect(self.update_sensor_value)
         
+        # Vector channel tiles and graphs are redrawn from their ring buffers at a fixed rate, not per sample
+        self.vector_refresh_interval = 100
+        self.setup_vector_refresh()
+
+        # The stream integrity counters are shown at a fixed rate too
+        self.integrity_refresh_interval = 500
+        self.setup_integrity_refresh()
+
         # Abort related configuration
         self.init_abort_modes()
         self.setup_abort_monitor()
+
+        # Channels that stop updating are greyed out, and can trip the loss of telemetry abort
+        self.stale_check_interval = 100
+        self.setup_stale_watchdog()
     
+    # CONFIGURATION ------------------------------------------------------------------------------------------------
+    def use_config(self, config):
+        # Readings of another set's channels must not reach the abort logic, a reload of the same set keeps them
+        previous = self.channels if self.config and config.name == self.config.name else None
+        self.config = config
+        # Every channel (from sensors.cfg, then the virtual channels) has a fixed index, shared by the parser and the grid
+        self.channels = config.channels
+        self.bind_channel_state(previous)
+        if self.mirror:
+            self.mirror.set_channels(self.channels)
+        # High rate multi-axis channels (vectors.cfg), whose axes get parser slots after the registered channels
+        self.vectors = config.vectors
+        self.vector_axis_IDs = self.vectors.axis_IDs
+        self.parser = TelemetryParser(self.channels.IDs + self.vector_axis_IDs)
+        self.vectors.bind(self.parser)
+        # Gaps, duplicates and reordering in the telemetry, tracked per channel of this set
+        self.integrity = StreamIntegrityMonitor(len(self.channels))
+        self.staleness = StalenessTracker(len(self.channels))
+        # Spectral monitoring of the channels in spectrum.cfg, computed in its own worker thread
+        if hasattr(self, "spectral"):
+            self.spectral.stop()
+        self.spectral = config.spectral
+        self.spectral.bind(self.channels)
+        self.spectral.signals.peak_detected.connect(self.handle_spectral_peak)
+        self.spectral.start()
+        # Virtual channels are formulas over the real sensors (from virtual_channels.cfg), shown and used like real sensors
+        self.virtual_channels = config.virtual_channels
+        self.virtual_channels.bind(self.channels)
+        # Calibration curves convert raw readings to engineering units, so recalibrating is only a config change
+        self.calibration = config.calibration
+        self.calibration.bind(self.channels)
+        # Streaming filters are configured separately for what is displayed and for what the abort logic sees
+        self.display_filters, self.abort_filters = config.display_filters, config.abort_filters
+        self.display_filters.bind(self.channels)
+        self.abort_filters.bind(self.channels)
+        # Valves (valves.cfg) and the operation states (control_states.cfg) that the buttons apply, as valve bitmasks
+        self.valves = config.valves
+        self.control_states = config.control_states
+
+    def bind_channel_state(self, previous=None):
+        """
+        Allocate the per-channel state, indexed like the registry, carrying the values over from the previous registry
+        (by channel ID) if given. The abort logic reads it by name through ChannelValues views
+        """
+        n = len(self.channels)
+        state = {
+            "raw_values": np.full(n, np.nan),                   # Latest values exactly as received from the MCU
+            "engineering_values": np.full(n, np.nan),           # Latest calibrated, unfiltered values (virtual too)
+            "abort_values": np.full(n, np.nan),                 # Values seen by the abort logic (after its filters)
+            "acquired": np.zeros(n, dtype=np.int64),            # Synchronized time (ns) each value was sampled at
+            "received": np.zeros(n, dtype=bool),                # Channels received at least once
+            "live_connection": np.zeros(n, dtype=np.int64),     # MCU connection that last delivered it, 0 if none
+        }
+        if previous is not None:
+            for channel in self.channels:
+                old = previous.get(channel.ID)
+                if old is not None:
+                    for name, array in state.items():
+                        array[channel.index] = getattr(self, name)[old.index]
+        for name, array in state.items():
+            setattr(self, name, array)
+        self.current_sensor_values = ChannelValues(self.channels, self.abort_values, self.received)
+        self.acquisition_times = ChannelValues(self.channels, self.acquired, self.received)
+
+    def apply_config(self, config):
+        """Swap in a reloaded configuration set. This runs on the main thread, so always between two frames"""
+        self.use_config(config)
+        for graph in self.vector_graphs.values():
+            graph.close()
+        self.vector_graphs = {}
+        if self.spectrum_window:
+            self.spectrum_window.close()
+            self.spectrum_window = None
+        self.sensor_grid.set_channels(self.channels)
+        self.diagram.set_valves(self.valves)
+        self.valve_control.set_control_states(self.control_states)
+        self.update_lockout_state()
+        self.log_event("CONFIG:LOADED", config.name)
+
+    def check_config_swap(self, config):
+        """Refuse a configuration set that would lose track of a valve that is currently open"""
+        lost = [name for name, is_open in self.diagram.valve_states.items() if is_open and name not in config.valves.bits]
+        if lost:
+            return f"Valve(s) {', '.join(lost)} are open but not in valves.cfg, close them first"
+        return None
+
+    def check_config_hold(self):
+        """Put configuration swaps off during an abort, a lockout or a recording, whose rules must not change midway"""
+        if self.abort_active or self.lockout_mode:
+            return "abort or lockout in progress"
+        if self.csv_writer:
+            return "recording in progress"
+        return None
+
+    def report_config(self, message):
+        self.log_event("CONFIG:STATUS", message.replace("\n", "; "))
+        self.config_status = message.splitlines()[0]
+        if hasattr(self, "conn_widget"):
+            self.conn_widget.show_config_status(self.config_status, self.config_manager.name)
+
+    # VECTOR CHANNELS ----------------------------------------------------------------------------------------------
+    def setup_vector_refresh(self):
+        self.vector_timer = QTimer()
+        self.vector_timer.timeout.connect(self.refresh_vectors)
+        self.vector_timer.start(self.vector_refresh_interval)
+
+    def refresh_vectors(self):
+        for vector in self.vectors.vectors:
+            if vector.buffer.count == vector.displayed_count:
+                continue
+            vector.displayed_count = vector.buffer.count
+            self.staleness.update([self.channels.index[vector.ID]], now_ns())
+            self.sensor_grid.signals.update_signal.emit(self.channels.index[vector.ID], vector.magnitude(),
+                                                        vector.buffer.last_time)
+            if vector.ID in self.vector_graphs and self.vector_graphs[vector.ID].isVisible():
+                self.vector_graphs[vector.ID].refresh()
+
+    def open_vector_graph(self, ID):
+        if ID not in self.vector_graphs:
+            vector = next(vector for vector in self.vectors.vectors if vector.ID == ID)
+            self.vector_graphs[ID] = VectorGraph(vector)
+        self.vector_graphs[ID].show()
+        self.vector_graphs[ID].raise_()
+        self.vector_graphs[ID].activateWindow()
+
+    # STREAM INTEGRITY ---------------------------------------------------------------------------------------------
+    def setup_integrity_refresh(self):
+        self.integrity_timer = QTimer()
+        self.integrity_timer.timeout.connect(self.refresh_integrity)
+        self.integrity_timer.start(self.integrity_refresh_interval)
+
+    def refresh_integrity(self):
+        self.conn_widget.show_integrity(self.integrity.summary())
+
+    def check_integrity(self, values, teensy_time, t):
+        """Count the samples of this frame that were lost, repeated or reordered, and log every gap"""
+        for index, start, end, missed in self.integrity.observe(values, teensy_time, t):
+            self.log_event("INTEGRITY:GAP", f"{self.channels[index].ID}: {missed} samples missed over "
+                                            f"{(end - start) / 1e6:.1f} ms", t)
+
+    def setup_stale_watchdog(self):
+        self.stale_timer = QTimer()
+        self.stale_timer.timeout.connect(self.check_staleness)
+        self.stale_timer.start(self.stale_check_interval)
+
+    def check_staleness(self):
+        """Grey out the tiles of channels that stopped updating, and abort on loss of telemetry if enabled"""
+        now = now_ns()
+        went_stale, recovered = self.staleness.check(now)
+        if len(went_stale) or len(recovered):
+            ages = self.staleness.ages(now)
+            for index in went_stale:
+                self.sensor_grid.set_stale(index, True)
+                self.log_event("TELEMETRY:STALE", f"{self.channels[index].ID}: no update for {ages[index]:.1f} s", now)
+            for index in recovered:
+                self.sensor_grid.set_stale(index, False)
+                self.log_event("TELEMETRY:RESTORED", self.channels[index].ID, now)
+
+        # Checked on every tick, not only when a channel goes stale, so that enabling the mode while the telemetry is
+        # already lost aborts too (handle_abort ignores the repeats). Only the channels that the current connection to
+        # the MCU has delivered count: a replayed recording that ends or is paused is not a loss of telemetry
+        connection = self.live_client.connections
+        lost = [ID for ID in TELEMETRY_ABORT_CHANNELS if connection and ID in self.channels.index
+                and self.staleness.flagged[self.channels.index[ID]]
+                and self.live_connection[self.channels.index[ID]] == connection]
+        if lost and self.abort_modes.get("loss_of_telemetry") and self.ethernet_client is self.live_client:
+            self.comms_signals.abort_triggered.emit("loss_of_telemetry",
+                                                    f"Loss of telemetry: no update of {', '.join(lost)}")
+
+    def reset_staleness(self):
+        """Forget when every channel was last updated, and un-grey the tiles, when a replay starts or finishes"""
+        for index in np.flatnonzero(self.staleness.flagged):
+            self.sensor_grid.set_stale(index, False)
+        self.staleness = StalenessTracker(len(self.channels))
+
+    # SPECTRAL MONITORING ------------------------------------------------------------------------------------------
+    def show_spectrum_window(self):
+        if not self.spectral.channels:
+            QMessageBox.information(self.daq_window, "Spectrum View", "No channels are listed in spectrum.cfg")
+            return
+        if self.spectrum_window is None:
+            self.spectrum_window = SpectrumWindow(self.spectral, {channel.ID: channel.unit for channel in self.channels})
+        self.spectrum_window.show()
+        self.spectrum_window.raise_()
+        self.spectrum_window.activateWindow()
+
+    def handle_spectral_peak(self, ID, frequency, amplitude):
+        """A peak in a channel's band stayed above its threshold: always a warning, an abort if the mode is enabled"""
+        details = f"{ID} peak of {amplitude:.2f} at {frequency:.0f} Hz"
+        self.conn_widget.show_warning(details)
+        self.log_event("WARNING:SPECTRAL_PEAK", details)
+        if self.abort_modes.get("combustion_instability"):
+            self.comms_signals.abort_triggered.emit("combustion_instability", f"Combustion instability: {details}")
+
     # ABORT CONTROL ------------------------------------------------------------------------------------------------
     def setup_abort_monitor(self):
         self.abort_timer = QTimer()
@@ -74,13 +328,18 @@ class GUIController:
             "high_upstream_pressure": True,
             "reverse_flow": True,
             "high_chamber_pressure": True,
-            "high_p2": True
+            "high_p2": True,
+            "combustion_instability": False,    # Spectral peaks only warn unless this is enabled
+            "loss_of_telemetry": False          # Stale tiles are only greyed out unless this is enabled
         }
     
+    def acquisition_time(self, *IDs):
+        """Synchronized time (ns) of the newest sample among these channels"""
+        return max(self.acquisition_times.get(ID, 0) for ID in IDs)
+
     def check_abort_conditions(self):
         if not self.current_sensor_values or self.abort_active:
             return
-        current_time = QDateTime.currentDateTime().toMSecsSinceEpoch()
         p3 = self.current_sensor_values.get("P3", 0)
         p4 = self.current_sensor_values.get("P4", 0)
         p5 = self.current_sensor_values.get("P5", 0)
@@ -88,6 +347,8 @@ class GUIController:
         pc = self.current_sensor_values.get("P8", 0)
         pline = self.current_sensor_values.get("P7", 0)
         p2 = self.current_sensor_values.get("P2", 0)
+        dp53 = self.current_sensor_values.get("DP53", p5 - p3)
+        dp64 = self.current_sensor_values.get("DP64", p6 - p4)
 
         if p2 > 1375:
             if not self.diagram.valve_states.get("NCS3", False):
@@ -110,10 +371,12 @@ class GUIController:
             )
 
         if self.abort_modes["high_upstream_pressure"]:
-            if p5 - p3 >= 5:
+            # The 150 ms are measured between the sample times (Teensy clock), not between when the GUI saw them
+            if dp53 >= 5:
+                current_time = self.acquisition_time("P5", "P3", "DP53")
                 if self.p3_p5_violation_start is None:
                     self.p3_p5_violation_start = current_time
-                elif current_time - self.p3_p5_violation_start >= 150:
+                elif current_time - self.p3_p5_violation_start >= ABORT_PERSISTENCE_NS:
                     self.comms_signals.abort_triggered.emit(
                         "high_upstream_pressure",
                         f"P5 {p5} psi > P3 {p3} psi by 5+ psi for 150ms"
@@ -121,10 +384,11 @@ class GUIController:
             else:
                 self.p3_p5_violation_start = None
 
-            if p6 - p4 >= 5:
+            if dp64 >= 5:
+                current_time = self.acquisition_time("P6", "P4", "DP64")
                 if self.p4_p6_violation_start is None:
                     self.p4_p6_violation_start = current_time
-                elif current_time - self.p4_p6_violation_start >= 150:
+                elif current_time - self.p4_p6_violation_start >= ABORT_PERSISTENCE_NS:
                     self.comms_signals.abort_triggered.emit(
                         "high_upstream_pressure",
                         f"P6 {p6} psi > P4 {p4} psi by 5+ psi for 150ms"
@@ -161,7 +425,7 @@ class GUIController:
         
         # Disable/enable valve state buttons
         for btn in self.daq_window.findChildren(QPushButton):
-            if btn.text() in ValveControlWindow.valve_states:
+            if btn.text() in self.control_states:
                 btn.setEnabled(not self.lockout_mode)
 
     def confirm_safe_state(self):
@@ -199,7 +463,9 @@ class GUIController:
             ("high_upstream_pressure", "High Upstream Pressure"),
             ("reverse_flow", "Reverse Flow Risk"),
             ("high_chamber_pressure", "High Chamber Pressure"),
-            ("high_p2", "High P2 Pressure")
+            ("high_p2", "High P2 Pressure"),
+            ("combustion_instability", "Combustion Instability (Spectral Peak)"),
+            ("loss_of_telemetry", "Loss of Telemetry (Stale Data)")
         ]
         
         for mode_id, mode_name in modes:
@@ -299,7 +565,7 @@ class GUIController:
         
         # Disable/enable valve state buttons
         for btn in self.valve_control.findChildren(QPushButton):
-            if btn.text() in ValveControlWindow.valve_states:
+            if btn.text() in self.control_states:
                 btn.setEnabled(not self.lockout_mode)
         self.valve_control.fire_sequence_btn.setEnabled(not self.lockout_mode)
         self.daq_window.throttling_btn.setEnabled(not self.lockout_mode)
@@ -317,49 +583,145 @@ class GUIController:
         
         # Log safe state confirmation
         self.log_event("ABORT_RESOLVED", "Operator confirmed safe state")
+        self.config_manager.apply_deferred()
 
     # DAQ RECORDING ------------------------------------------------------------------------------------------------
-    def log_event(self, event_type, event_details=""):
+    def log_event(self, event_type, event_details="", t=None):
         """Log an event to CSV (Req 15)"""
+        if self.mirror:
+            self.mirror.publish_event(event_type, event_details, t)
         if not self.csv_writer:
             return
             
-        timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd HH:mm:ss.zzz")
+        t = now_ns() if t is None else t
+        # Only the rows that start and stop a recording carry a date, every other row is placed by its SyncTime
+        timestamp = self.wall_clock.format(t) if event_type.startswith("RECORDING:") else ""
         self.csv_writer.writerow([
             timestamp, "", 
             "ON" if self.throttling_enabled else "OFF",
             "ON" if self.gimbaling_enabled else "OFF",
-            "", event_type, event_details
+            "", event_type, event_details, t
         ])
 
-    def handle_new_data(self, data_str):
-        """ Parse teensy timestamp (first token) (Req 4) """
+    def sample_time(self, teensy_time, received):
+        """Time (ns) at which a frame was sampled, from its Teensy time when it has one"""
+        if teensy_time is None:
+            return received
+        if self.ethernet_client is not self.live_client:
+            # A replayed recording keeps its own Teensy time base, it has nothing to be synchronized with
+            return round(teensy_time * 1000)
+        clock = self.live_client.clock
+        clock.observe_frame(teensy_time, received)
+        return clock.to_host(teensy_time, received)
+
+    def handle_new_data(self, data_str, received=None):
+        """ Parse teensy timestamp ("t:" key, or the first token of older telemetry) (Req 4) """
+
+        values = self.parser.parse(data_str)
+        teensy_time = self.parser.timestamp
+        sensor_data = data_str.strip()
+        # Every sample of the frame gets the same synchronized, monotonic time
+        received = now_ns() if received is None else received
+        t = self.sample_time(teensy_time, received)
+        if teensy_time is not None:
+            self.check_integrity(values, teensy_time, t)
 
-        timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd HH:mm:ss.zzz")
-        
-        parts = data_str.split(maxsplit=1)
-        teensy_ts = parts[0] if len(parts) > 1 else ""
-        sensor_data = parts[1] if len(parts) > 1 else data_str
-        
         if self.csv_writer:
             self.csv_writer.writerow([
-                timestamp, teensy_ts, 
+                "", "" if teensy_time is None else int(teensy_time),
                 "ON" if self.throttling_enabled else "OFF",
                 "ON" if self.gimbaling_enabled else "OFF",
-                sensor_data, "", ""
+                sensor_data, "", "", t
             ])
         
         if self.sensor_grid:
-            self.sensor_grid.handle_data_line(sensor_data)
-    
-    def update_sensor_value(self, sensor, value):
-        self.current_sensor_values[sensor] = value
+            # The registered channels come first in the parser's vector, so their slots are their channel indices
+            raw = np.array(values[:len(self.channels)])
+            present = raw == raw
+            # Vector samples go to their ring buffers, and frames holding nothing else skip the scalar pipeline
+            if self.vector_axis_IDs:
+                self.vectors.store(values, t)
+            if not present.any():
+                return
+
+            self.raw_values[present] = raw[present]
+            self.received |= present
+            engineering = self.calibration.apply_frame(raw)
+            self.engineering_values[present] = engineering[present]
+
+            # Virtual channels are derived from the unfiltered values, then filtered like any other channel
+            engineering = self.engineering_values
+            self.virtual_channels.evaluate_frame(engineering, present, self.received)
+            if self.spectral.slots:
+                self.spectral.push(engineering, present, t)
+
+            # Every channel in this frame was sampled at the frame's time, whatever rate the channel arrives at
+            self.abort_values[present] = self.abort_filters.apply_frame(engineering, present)[present]
+            self.acquired[present] = t
+            if self.ethernet_client is self.live_client:
+                self.live_connection[present] = self.live_client.connections
+            indices = np.flatnonzero(present)
+            self.staleness.update(indices, received)
+            displayed = self.display_filters.apply_frame(engineering, present)
+            emit = self.sensor_grid.signals.update_signal.emit
+            for index in indices.tolist():
+                emit(index, displayed[index].item(), t)
+            if self.mirror:
+                self.mirror.publish_frame(t, indices, displayed)
+
+    # REPLAY -------------------------------------------------------------------------------------------------------
+    def check_replay(self):
+        """Refuse to replay a recording in the middle of a test, since it takes the place of the MCU connection"""
+        if self.abort_active or self.lockout_mode:
+            return "Cannot replay during an abort or lockout"
+        if self.csv_writer:
+            return "Cannot replay while recording, stop the recording first"
+        return None
+
+    def start_replay(self, filename, speed, finished_callback=None):
+        """Feed a recording through the same path as live telemetry, in place of the MCU connection"""
+        reason = self.check_replay()
+        if reason:
+            QMessageBox.warning(self.daq_window, "Replay Recording", reason)
+            return False
+        if self.live_client.connected or self.live_client.connecting:
+            reply = QMessageBox.question(self.daq_window, "Replay Recording",
+                                         "Replaying a recording disconnects the GUI from the MCU. Continue?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return False
+        self.stop_replay()
+        self.live_client.disconnect()
 
-    def handle_received_data(self, data_str):
-        self.comms_signals.data_received.emit(data_str)
+        replay = ReplayClient(filename, speed)
+        replay.receive_callback = self.handle_received_data
+        replay.log_event_callback = self.log_event
 
-    def process_data_main_thread(self, data_str):
-        self.handle_new_data(data_str)
+        def replay_finished(stats):
+            self.ethernet_client = self.live_client
+            self.reset_staleness()
+            if finished_callback:
+                finished_callback(stats)
+
+        replay.finished_callback = replay_finished
+        self.ethernet_client = replay
+        self.reset_staleness()
+        replay.start()
+        return True
+
+    def stop_replay(self):
+        if isinstance(self.ethernet_client, ReplayClient):
+            self.ethernet_client.disconnect()
+
+    def handle_received_data(self, data_str, received=None):
+        self.comms_signals.data_received.emit(data_str, now_ns() if received is None else received)
+
+    def process_data_main_thread(self, data_str, received):
+        self.handle_new_data(data_str, received)
+
+    def handle_mirror_event(self, event_type, event_details):
+        # The mirror logs from its own threads, so the event is written to the CSV by the main thread
+        self.comms_signals.event_logged.emit(event_type, event_details, now_ns())
 
     # Start recording, returns whether the conditions were fit for recording to start, otherwise returns false
     def start_recording(self, filename: str) -> bool:
@@ -382,11 +744,15 @@ class GUIController:
             self.file = open(filename, "w", newline="")
             self.csv_writer = csv.writer(self.file)
             # Add columns for throttling/gimbaling (Req 26) and event logging (Req 15)
+            # SyncTime is the monotonic time (ns) of every row, i.e. for sensor data the Teensy time mapped through the
+            # clock sync, so samples and events share one time base. Only the RECORDING: rows have a Timestamp (date),
+            # which anchors that time base to the date
             self.csv_writer.writerow([
                 "Timestamp", "TeensyTimestamp", "Throttling", "Gimbaling", 
-                "SensorData", "EventType", "EventDetails"
+                "SensorData", "EventType", "EventDetails", "SyncTime"
             ])
-            self.log_event("RECORDING:START")
+            self.wall_clock = WallClock()
+            self.log_event("RECORDING:START", self.live_client.clock.status())
 
             return True
 
@@ -396,11 +762,13 @@ class GUIController:
 
     def stop_recording(self):
         if self.file:
-            self.log_event("RECORDING:STOP")
+            self.log_event("INTEGRITY:SUMMARY", self.integrity.summary())
+            self.log_event("RECORDING:STOP", self.live_client.clock.status())
 
             self.file.close()
             self.file = None
             self.csv_writer = None
+            self.config_manager.apply_deferred()
 
     # VALVE CONTROL ------------------------------------------------------------------------------------------------
     def toggle_throttling(self):
@@ -571,12 +939,15 @@ class GUIController:
         if self.lockout_mode:
             return
             
-        active_valves = ValveControlWindow.valve_states.get(operation, [])
-        for name in self.diagram.valve_states:
-            state = name in active_valves
-            self.diagram.set_valve_state(name, state)
+        # Only the valves whose state actually changes are commanded. A state that is not in control_states.cfg
+        # closes every valve, as before
+        current = self.valves.mask(self.diagram.valve_states)
+        state = self.control_states.get(operation)
+        target = state.target(current) if state else 0
+        for name, is_open in self.valves.changes(current, target):
+            self.diagram.set_valve_state(name, is_open)
             try:
-                self.ethernet_client.send_valve_command(name, state)
+                self.ethernet_client.send_valve_command(name, is_open)
             except Exception:
                 pass
         self.status_label.setText(f"Current State: {operation}")
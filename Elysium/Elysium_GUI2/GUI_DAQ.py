@@ -58,6 +58,10 @@ class DAQWindow(QWidget):
         self.abort_config_btn.clicked.connect(self.controller.show_abort_control)
         self.buttons_valve_layout.addWidget(self.abort_config_btn)
 
+        self.spectrum_btn = QPushButton("Spectrum View")
+        self.spectrum_btn.clicked.connect(self.controller.show_spectrum_window)
+        self.buttons_valve_layout.addWidget(self.spectrum_btn)
+
 
         # Throttling and Gimbaling controls (Req 26)
         self.buttons_throttle_gimbal_layout = QVBoxLayout()
@@ -0,0 +1,210 @@
+# GUI_FILTERS.py
+# This file hosts the streaming digital filters that can be applied per channel, configured in filters.cfg.
+# Each filter keeps its state in small arrays, so a batch of any length can be filtered in one vectorized call
+# and the result is identical to filtering the samples one at a time.
+# The live telemetry is filtered one sample per channel per frame, which the IIR/FIR filters run as a plain difference
+# equation: lfilter costs far more per call than a biquad step does, so it is kept for batches. scipy.signal takes most
+# of a second to import, so it is only imported when a batch is first filtered, and the low-pass coefficients and
+# initial states are worked out without it.
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_lines
+
+_lfilter = None         # scipy.signal's, imported by the first batch that is filtered
+
+def _scipy_lfilter():
+    global _lfilter
+    if _lfilter is None:
+        from scipy.signal import lfilter
+        _lfilter = lfilter
+    return _lfilter
+
+class LinearFilter:
+    """
+    An IIR/FIR filter given by its (b, a) coefficients, with a carried-over state vector (transposed direct form II,
+    as in lfilter). A single sample is stepped through directly, a batch goes through lfilter
+    """
+    def __init__(self, b, a):
+        b, a = np.asarray(b, dtype=float), np.asarray(a, dtype=float)
+        n = max(len(b), len(a))
+        self.b = np.pad(b, (0, n - len(b))) / a[0]
+        self.a = np.pad(a, (0, n - len(a))) / a[0]
+        self._b, self._a = self.b.tolist(), self.a.tolist()
+        self.zi = None          # List of the n - 1 state values
+
+    def reset(self):
+        self.zi = None
+
+    def _steady_state(self, x):
+        """The state of the filter after a long run of x, so it starts without a transient from zero"""
+        b, a = self._b, self._a
+        y = x * sum(b) / sum(a)
+        zi, acc = [0.0] * (len(b) - 1), 0.0
+        for i in range(len(b) - 2, -1, -1):
+            acc += b[i + 1] * x - a[i + 1] * y
+            zi[i] = acc
+        return zi
+
+    def process(self, x):
+        """Filter one value (returning a float) or an array of consecutive values (returning an array)"""
+        if np.ndim(x) == 0:
+            x = float(x)
+            if self.zi is None:
+                self.zi = self._steady_state(x)
+            b, a, z = self._b, self._a, self.zi
+            if not z:
+                return b[0] * x
+            y = b[0] * x + z[0]
+            last = len(z) - 1
+            for i in range(last):
+                z[i] = b[i + 1] * x + z[i + 1] - a[i + 1] * y
+            z[last] = b[last + 1] * x - a[last + 1] * y
+            return y
+
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        if self.zi is None:
+            self.zi = self._steady_state(x[0])
+        y, zf = _scipy_lfilter()(self.b, self.a, x, zi=np.array(self.zi))
+        self.zi = zf.tolist()
+        return y
+
+class MovingAverageFilter(LinearFilter):
+    def __init__(self, n):
+        n = int(n)
+        if n < 1:
+            raise ValueError(f"Moving average length must be at least 1, got {n}")
+        super().__init__(np.full(n, 1.0 / n), [1.0])
+
+class EMAFilter(LinearFilter):
+    def __init__(self, alpha):
+        alpha = float(alpha)
+        if not 0 < alpha <= 1:
+            raise ValueError(f"EMA alpha must be in (0, 1], got {alpha}")
+        super().__init__([alpha], [1.0, alpha - 1.0])
+
+class LowPassFilter(LinearFilter):
+    """Second order (biquad) Butterworth low-pass, with the same bilinear transform design as scipy.signal.butter"""
+    def __init__(self, cutoff_hz, sample_rate_hz):
+        cutoff_hz, sample_rate_hz = float(cutoff_hz), float(sample_rate_hz)
+        if not 0 < cutoff_hz < sample_rate_hz / 2:
+            raise ValueError(f"Low-pass cutoff must be between 0 and half the sample rate, got {cutoff_hz} Hz "
+                             f"at {sample_rate_hz} Hz")
+        k = np.tan(np.pi * cutoff_hz / sample_rate_hz)     # Prewarped cutoff
+        norm = 1 / (1 + np.sqrt(2) * k + k * k)
+        b = np.array([1.0, 2.0, 1.0]) * k * k * norm
+        a = [1.0, 2 * (k * k - 1) * norm, (1 - np.sqrt(2) * k + k * k) * norm]
+        super().__init__(b, a)
+
+class MedianFilter:
+    """Median of the last N samples, which rejects single-sample spikes without smearing steps"""
+    def __init__(self, n):
+        self.n = int(n)
+        if self.n < 1:
+            raise ValueError(f"Median length must be at least 1, got {self.n}")
+        self.history = None
+
+    def reset(self):
+        self.history = None
+
+    def process(self, x):
+        """Filter one value (returning a float) or an array of consecutive values (returning an array)"""
+        single = np.ndim(x) == 0
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        if self.history is None:
+            self.history = np.full(self.n - 1, x[0])
+        window = np.concatenate((self.history, x))
+        self.history = window[len(window) - (self.n - 1):]
+        if single:
+            return float(np.median(window))
+        return np.median(sliding_window_view(window, self.n), axis=-1)
+
+# The name used in filters.cfg for each filter, and the number of arguments it takes
+FILTER_KINDS = {
+    "average": (MovingAverageFilter, 1),
+    "ema": (EMAFilter, 1),
+    "median": (MedianFilter, 1),
+    "lowpass": (LowPassFilter, 2),
+}
+
+class FilterBank:
+    """A chain of filters per channel. Channels without filters pass through unchanged"""
+    def __init__(self):
+        self.chains = {}
+        self.slots = []             # (channel index, chain), set by bind()
+
+    def add(self, channel, stage):
+        self.chains.setdefault(channel, []).append(stage)
+
+    def reset(self):
+        for chain in self.chains.values():
+            for stage in chain:
+                stage.reset()
+
+    def process(self, channel, x):
+        """
+        Filter one value or an array of consecutive values of a channel, returning the same shape. Non-finite samples
+        (inf, NaN) are passed through as they are and left out of the filters, whose state would never recover from one
+        """
+        return self._filter(self.chains.get(channel), x)
+
+    @staticmethod
+    def _filter(chain, x):
+        if not chain:
+            return x
+        if np.ndim(x) == 0:
+            if not math.isfinite(x):
+                return x
+            y = x
+            for stage in chain:
+                y = stage.process(y)
+            return y
+
+        x = np.asarray(x, dtype=float)
+        finite = np.isfinite(x)
+        if not finite.any():
+            return x
+        y = x[finite]
+        for stage in chain:
+            y = stage.process(y)
+        if finite.all():
+            return y
+        result = x.copy()
+        result[finite] = y
+        return result
+
+    def apply(self, values):
+        """Filter a mapping of channel to value (or to an array of values)"""
+        return {channel: self.process(channel, x) for channel, x in values.items()}
+
+    def bind(self, channels):
+        """Look up the index of every filtered channel in a ChannelRegistry once, for apply_frame"""
+        self.slots = [(channels.index[ID], chain) for ID, chain in self.chains.items() if ID in channels.index]
+
+    def apply_frame(self, values, present):
+        """Filter the present channels of a vector of values indexed by channel, returning a filtered copy"""
+        filtered = values.copy()
+        for slot, chain in self.slots:
+            if present[slot]:
+                filtered[slot] = self._filter(chain, values[slot])
+        return filtered
+
+def load_filter_banks(config_name=DEFAULT_CONFIG):
+    """Load filters.cfg from a configuration set into a (display, abort) pair of filter banks"""
+    path = config_file("filters.cfg", config_name)
+    display, abort = FilterBank(), FilterBank()
+    for line in read_cfg_lines(path):
+        args = line.split(",")
+        if len(args) < 3 or args[1] not in ("display", "abort", "both") or args[2] not in FILTER_KINDS:
+            raise ValueError(f"{path}: expected 'ID,display|abort|both,{'|'.join(FILTER_KINDS)},[args]*' but found '{line}'")
+        ID, target, kind, params = args[0].upper(), args[1], args[2], args[3:]
+        filter_class, n_args = FILTER_KINDS[kind]
+        if len(params) != n_args:
+            raise ValueError(f"{path}: '{kind}' takes {n_args} argument(s) but found '{line}'")
+
+        # Display and abort filters are separate instances so that each keeps its own state
+        if target in ("display", "both"):
+            display.add(ID, filter_class(*params))
+        if target in ("abort", "both"):
+            abort.add(ID, filter_class(*params))
+    return display, abort
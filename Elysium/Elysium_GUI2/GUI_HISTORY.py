@@ -0,0 +1,96 @@
+# GUI_HISTORY.py
+# This file hosts the ChannelHistory, which keeps the recent samples of every channel together with their acquisition
+# times (the Teensy clock synchronized to the host's, as int64 nanoseconds, see GUI_CLOCK). Channels do not have to
+# arrive together: each one has its own ring buffer and keeps its own rate, so a slow HX711 load cell is not padded to
+# the rate of the pressure transducers. Views that need several channels on a common time base resample them when they read the history
+# (resample-on-read), instead of forcing one rate on every channel at ingest.
+import numpy as np
+from GUI_CLOCK import NS_PER_SECOND
+
+HISTORY_SECONDS = 10        # Time span shown by the graphs
+HISTORY_SAMPLES = 16384     # Samples kept per channel, enough for 10 s at more than 1.6 kHz
+
+class ChannelHistory:
+    def __init__(self, count=0, capacity=HISTORY_SAMPLES):
+        self.capacity = capacity
+        self.times = np.zeros((count, capacity), dtype=np.int64)
+        self.values = np.zeros((count, capacity))
+        self.heads = np.zeros(count, dtype=int)        # Column the next sample of each channel is written to
+        self.counts = np.zeros(count, dtype=int)       # Samples written in total for each channel
+
+    def __len__(self):
+        return len(self.heads)
+
+    def resize(self, count):
+        """Add empty rows for channels registered since (indices are never reused, so rows are only appended)"""
+        added = count - len(self)
+        if added > 0:
+            self.times = np.vstack((self.times, np.zeros((added, self.capacity), dtype=np.int64)))
+            self.values = np.vstack((self.values, np.zeros((added, self.capacity))))
+            self.heads = np.concatenate((self.heads, np.zeros(added, dtype=int)))
+            self.counts = np.concatenate((self.counts, np.zeros(added, dtype=int)))
+
+    def append(self, index, t, value):
+        column = self.heads[index]
+        self.times[index, column] = t
+        self.values[index, column] = value
+        self.heads[index] = (column + 1) % self.capacity
+        self.counts[index] += 1
+
+    def copy_channel(self, index, other, other_index):
+        """Take over the samples of a channel from another history, e.g. after the channels were reloaded"""
+        self.times[index] = other.times[other_index]
+        self.values[index] = other.values[other_index]
+        self.heads[index] = other.heads[other_index]
+        self.counts[index] = other.counts[other_index]
+
+    def last(self, index):
+        """(acquisition time, value) of the newest sample of a channel, or None before the first one"""
+        if not self.counts[index]:
+            return None
+        column = (self.heads[index] - 1) % self.capacity
+        return self.times[index, column], self.values[index, column]
+
+    def latest(self, index, seconds=None):
+        """The samples of a channel in time order, as (times, values), optionally only the last `seconds` of them"""
+        n = min(self.counts[index], self.capacity)
+        columns = (self.heads[index] - n + np.arange(n)) % self.capacity
+        times, values = self.times[index, columns], self.values[index, columns]
+        if seconds is not None and n:
+            first = np.searchsorted(times, times[-1] - round(seconds * NS_PER_SECOND))
+            times, values = times[first:], values[first:]
+        return times, values
+
+    def sample_rate(self, index, seconds=1.0):
+        """Rate (Hz) at which a channel has been arriving, measured over its last `seconds` of samples"""
+        times, _ = self.latest(index, seconds)
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) * NS_PER_SECOND / (times[-1] - times[0])
+
+    def resample(self, indices, times):
+        """
+        Values of several channels at the given acquisition times (ns), as a (len(times) x len(indices)) array, by
+        linear interpolation between each channel's own samples. Times outside a channel's samples give NaN.
+        """
+        times = np.asarray(times, dtype=np.int64)
+        result = np.full((len(times), len(indices)), np.nan)
+        for column, index in enumerate(indices):
+            sample_times, values = self.latest(index)
+            if len(sample_times):
+                # Relative to the first sample, so the float conversion keeps the nanoseconds
+                result[:, column] = np.interp(times - sample_times[0], sample_times - sample_times[0], values,
+                                              left=np.nan, right=np.nan)
+        return result
+
+    def aligned(self, indices, rate, seconds=HISTORY_SECONDS):
+        """
+        Several channels on a common, uniform time base at `rate` Hz over their last `seconds`, ending at the newest
+        sample of the slowest channel (so no channel is extrapolated). Returns (times, values) like resample.
+        """
+        ends = [self.last(index) for index in indices]
+        if not indices or any(end is None for end in ends):
+            return np.zeros(0), np.zeros((0, len(indices)))
+        end = min(t for t, _ in ends)
+        times = end - np.round(np.arange(int(seconds * rate), -1, -1) * NS_PER_SECOND / rate).astype(np.int64)
+        return times, self.resample(indices, times)
@@ -0,0 +1,138 @@
+# GUI_INTEGRITY.py
+# This file hosts the StreamIntegrityMonitor, which checks the telemetry as it is ingested for samples that never
+# arrived, arrived twice or arrived out of order (lines mangled by the decoding, dropped by a broken connection, or
+# repeated by the link). The MCU does not number its frames, so each channel's cadence is learnt from its own Teensy
+# timestamps: a sample later than GAP_TOLERANCE intervals after the previous one is a gap (and the samples that fit in
+# it are counted as missed), one with the same timestamp is a duplicate, and one with an earlier timestamp is reordered.
+# The StalenessTracker is the other side of it: it notices channels that stop updating at all.
+from collections import deque
+import numpy as np
+from GUI_CLOCK import NS_PER_SECOND
+
+GAP_TOLERANCE = 1.5         # Intervals between two samples beyond which the samples in between are counted as missing
+RELEARN_GAPS = 3            # Consecutive "gaps" of about the same length mean that the channel's rate changed
+RELEARN_TOLERANCE = 0.2     # Relative difference within which two gaps are "about the same length"
+INTERVAL_SMOOTHING = 0.1    # Weight of each new interval in the channel's expected interval
+RESTART_JUMP = 1e6          # A timestamp going back by more than this (us) means the MCU restarted, not reordering
+GAP_HISTORY = 256           # Gaps kept for the graphs' timeline overlay
+STALE_INTERVALS = 5         # Usual update intervals a channel may miss before it is stale
+STALE_TIMEOUT_NS = 500_000_000  # Shortest time without an update after which a channel is stale, whatever its rate
+
+class StreamIntegrityMonitor:
+    def __init__(self, count=0):
+        self.count = count
+        self.last_teensy = np.full(count, np.nan)       # Teensy time (us) of each channel's previous sample
+        self.last_time = np.zeros(count, dtype=np.int64)    # Synchronized time (ns) of each channel's previous sample
+        self.interval = np.full(count, np.nan)          # Expected time (us) between two samples of each channel
+        self.pending = np.zeros(count, dtype=int)       # Consecutive gaps of about the same length, used to notice a
+        self.pending_gap = np.full(count, np.nan)       # change of rate, and the length (us) of the first of them
+        self.samples = np.zeros(count, dtype=np.int64)
+        self.gaps = np.zeros(count, dtype=np.int64)
+        self.missed = np.zeros(count, dtype=np.int64)
+        self.duplicates = np.zeros(count, dtype=np.int64)
+        self.reordered = np.zeros(count, dtype=np.int64)
+        self.recent_gaps = deque(maxlen=GAP_HISTORY)    # (channel index, start ns, end ns, samples missed)
+
+    def observe(self, values, teensy_time, t):
+        """
+        Check one frame: values is the parser's value vector (NaN for the channels not in the frame, channel indices
+        first), teensy_time its Teensy time (us) and t its synchronized time (ns). Returns the gaps it closed, as
+        (channel index, start ns, end ns, samples missed).
+        """
+        present = np.flatnonzero(~np.isnan(values[:self.count]))
+        if not len(present):
+            return []
+        self.samples[present] += 1
+        dt = teensy_time - self.last_teensy[present]
+
+        # First sample of a channel, or the MCU restarted: start over without counting anything
+        fresh = np.isnan(dt) | (dt < -RESTART_JUMP)
+        duplicate = dt == 0
+        reordered = (dt < 0) & ~fresh
+        self.duplicates[present[duplicate]] += 1
+        self.reordered[present[reordered]] += 1
+
+        # Reordered and duplicated samples leave the channel's state alone
+        advancing = ~(duplicate | reordered)
+        channels, dt = present[advancing], dt[advancing]
+        interval = self.interval[channels]
+        fresh = fresh[advancing]
+
+        gaps = []
+        late = ~fresh & (dt > GAP_TOLERANCE * interval)
+        for index, gap, expected in zip(channels[late], dt[late], interval[late]):
+            if abs(gap - self.pending_gap[index]) <= RELEARN_TOLERANCE * self.pending_gap[index]:
+                self.pending[index] += 1
+            else:
+                # A gap of another length (e.g. an outage after a few dropped samples) starts the count over
+                self.pending[index] = 1
+                self.pending_gap[index] = gap
+            if self.pending[index] >= RELEARN_GAPS:
+                # Not a gap but a new rate (e.g. a slower sensor mode), so nothing is counted from now on
+                self.interval[index] = gap
+                self.pending[index] = 0
+                continue
+            missed = int(round(gap / expected)) - 1
+            self.gaps[index] += 1
+            self.missed[index] += missed
+            gaps.append((int(index), int(self.last_time[index]), t, missed))
+
+        normal = ~fresh & ~late
+        self.pending[channels[normal]] = 0
+        learnt = np.isnan(interval) & ~fresh
+        smoothed = interval + INTERVAL_SMOOTHING * (dt - interval)
+        self.interval[channels[normal]] = np.where(learnt, dt, smoothed)[normal]
+
+        self.last_teensy[channels] = teensy_time
+        self.last_time[channels] = t
+        self.recent_gaps.extend(gaps)
+        return gaps
+
+    def gaps_for(self, index, since):
+        """(start ns, end ns) of the recent gaps of a channel that end after `since` (ns)"""
+        return [(start, end) for channel, start, end, _ in self.recent_gaps if channel == index and end > since]
+
+    def totals(self):
+        """Counters summed over every channel"""
+        return {"samples": int(self.samples.sum()), "gaps": int(self.gaps.sum()), "missed": int(self.missed.sum()),
+                "duplicates": int(self.duplicates.sum()), "reordered": int(self.reordered.sum())}
+
+    def summary(self):
+        """One line description of the counters, for the status label and the log"""
+        totals = self.totals()
+        return (f"Stream: {totals['gaps']} gaps ({totals['missed']} samples missed), "
+                f"{totals['duplicates']} duplicates, {totals['reordered']} out of order")
+
+class StalenessTracker:
+    """
+    Age of every channel's newest update, for the stale-data watchdog. A channel is stale once it has gone
+    STALE_INTERVALS of its usual update interval (and at least STALE_TIMEOUT_NS) without an update, e.g. when the
+    telemetry stops while the socket stays open and the GUI would otherwise keep showing the last values.
+    """
+    def __init__(self, count=0):
+        self.last_update = np.zeros(count, dtype=np.int64)     # Host time (ns) of the newest update, 0 if never
+        self.interval = np.full(count, np.nan)                  # Usual time (ns) between two updates of each channel
+        self.flagged = np.zeros(count, dtype=bool)              # Channels currently reported as stale
+
+    def update(self, indices, now):
+        """These channels were updated at host time `now` (ns)"""
+        indices = np.asarray(indices, dtype=int)
+        seen = self.last_update[indices] > 0
+        dt = now - self.last_update[indices]
+        interval = self.interval[indices]
+        interval = np.where(np.isnan(interval), dt, interval + INTERVAL_SMOOTHING * (dt - interval))
+        self.interval[indices] = np.where(seen, interval, np.nan)
+        self.last_update[indices] = now
+
+    def ages(self, now):
+        """Seconds since each channel's newest update (NaN for the channels never updated)"""
+        return np.where(self.last_update > 0, (now - self.last_update) / NS_PER_SECOND, np.nan)
+
+    def check(self, now):
+        """Flag the channels that went stale and clear the ones that recovered. Returns both, as index arrays"""
+        timeout = np.fmax(STALE_INTERVALS * self.interval, STALE_TIMEOUT_NS)
+        stale = (self.last_update > 0) & (now - self.last_update > timeout)
+        went_stale = np.flatnonzero(stale & ~self.flagged)
+        recovered = np.flatnonzero(~stale & self.flagged)
+        self.flagged = stale
+        return went_stale, recovered
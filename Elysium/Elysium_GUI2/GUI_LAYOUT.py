@@ -5,17 +5,22 @@ from PyQt5.QtWidgets import QMainWindow, QSizePolicy, QWidget, QVBoxLayout, QPus
 from PyQt5.QtCore import QSize, Qt
 from GUI_LOGO import LogoWindow
 from GUI_CONTROLLER import GUIController
+from GUI_THEME import ThemeEngine, THEME_STYLE_SHEET
+from GUI_MIRROR import MIRROR_HOST
+
+TEXT_SIZES = (6, 10, 14)    # Small, medium and large text (pt)
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, painted_grid=False, mirror_port=None, mirror_host=MIRROR_HOST):
         super().__init__()
         self.setWindowTitle("Rocket Engine Control Panel")
         self.setGeometry(100, 100, 1280, 720)
 
         # Dark mode is the only setting where it makes sense to have contained to this window
         self.dark_mode = False
+        self.theme_engine = ThemeEngine(TEXT_SIZES)
 
-        self.controller = GUIController()
+        self.controller = GUIController(painted_grid=painted_grid, mirror_port=mirror_port, mirror_host=mirror_host)
 
         self.init_ui()
 
@@ -88,11 +93,12 @@ class MainWindow(QMainWindow):
 
         main_layout.addLayout(body_horizontal_layout)
 
-        self.apply_stylesheet()
-
         central_widget.setLayout(main_layout)
         self.setCentralWidget(central_widget)
 
+        self.setStyleSheet(THEME_STYLE_SHEET)
+        self.apply_theme()
+
     def make_divider(self):
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
@@ -102,28 +108,29 @@ class MainWindow(QMainWindow):
     def change_text_size(self):
         if self.text_size == 10:
             self.text_size = 14
-            self.apply_stylesheet()
+            self.apply_theme()
             self.text_size_btn.setText("Small Text")
 
         elif self.text_size == 14:
             self.text_size = 6
-            self.apply_stylesheet()
+            self.apply_theme()
             self.text_size_btn.setText("Medium Text")
 
         elif self.text_size == 6:
             self.text_size = 10
-            self.apply_stylesheet()
+            self.apply_theme()
             self.text_size_btn.setText("Large Text")
         else:
             self.text_size = 10
-            self.apply_stylesheet()
+            self.apply_theme()
             self.text_size_btn.setText("Large Text")
 
 
     def toggle_dark_mode(self):
         """Toggle between dark and light mode"""
         self.dark_mode = not self.dark_mode
-        self.apply_stylesheet()
+        self.controller.sensor_grid.set_dark_mode(self.dark_mode)
+        self.apply_theme()
         if self.dark_mode:
             self.logo.set_dark_image()
             self.controller.diagram.set_dark_image()
@@ -132,156 +139,8 @@ class MainWindow(QMainWindow):
             self.controller.diagram.set_light_image()
         
         self.dark_mode_btn.setText("Light Mode" if self.dark_mode else "Dark Mode")
-        
-        # Update sensor grid
-        self.controller.sensor_grid.set_dark_mode(self.dark_mode)
 
-    def apply_stylesheet(self):
-        """Apply appropriate stylesheet based on current mode"""
-        if self.dark_mode:
-            # dark_stylesheet = """
-            #     QWidget {
-            #         background-color: #333333;
-            #         color: #EEEEEE;
-            #     }
-            #     QLabel {
-            #         color: #EEEEEE;
-            #     }
-            #     QPushButton {
-            #         background-color: #555555;
-            #         color: #EEEEEE;
-            #         border: 1px solid #888888;
-            #     }
-            #     QPushButton:hover {
-            #         background-color: #666666;
-            #     }
-            #     QPushButton:pressed {
-            #         background-color: #444444;
-            #     }
-            #     QLineEdit {
-            #         background-color: #444444;
-            #         color: #EEEEEE;
-            #         border: 1px solid #555555;
-            #     }
-            #     QCheckBox {
-            #         color: #EEEEEE;
-            #     }
-            #     QScrollArea {
-            #         background-color: #333333;
-            #     }
-            #     QFrame {
-            #         background-color: #555555;
-            #     }
-            #     QDialog {
-            #         background-color: #333333;
-            #     }
-            #     /* Valve diagram background */
-            #     ValveDiagram {
-            #         background-color: #222222;
-            #     }
-            # """
-            dark_stylesheet = f"""
-                QMainWindow {{
-                    background-color: #222222;
-                }}
-                QWidget {{
-                    background-color: #222222;
-                    color: #FFFFFF;
-                }}
-                QPushButton {{
-                    background-color: #333333;
-                    color: #FFFFFF;
-                    border-style: inset;
-                    border-width: 2px;
-                    border-radius: 10px;
-                    border-color: #999999;
-                    font-family: "Arail";
-                    font-size: {self.text_size}pt;
-                    font-weight: bold;
-                    padding: 6px;
-                }}
-                QPushButton:pressed {{
-                    background-color: #222222;
-                    border-style: inset;
-                }}
-                QPushButton:hover {{
-                    background-color: #666666;
-                }}
-                QLineEdit {{
-                    background-color: #333333;
-                    color: #FFFFFF;
-                    font-family: "Arail";
-                    font-size: {self.text_size}pt;
-                    font-weight: bold;
-                    border-style: inset;
-                    border-width: 2px;
-                    border-radius: 10px;
-                    border-color: #666666;
-                    padding: 2px;
-                }}
-                QLabel {{
-                    font-family: "Arail";
-                    font-size: {self.text_size}pt;
-                    font-weight: bold;
-                    color: #FFFFFF;
-                }}
-                ValveDiagram {{
-                    background-color: #222222;
-                }}
-            """
-            self.setStyleSheet(dark_stylesheet)
-        else:
-            # Light mode - reset to default
-            light_stylesheet = f"""
-                QMainWindow {{
-                    background-color: #FFFFFF;
-                }}
-                QPushButton {{
-                    background-color: #FFFFFF;
-                    color: #000000;
-                    border-style: inset;
-                    border-width: 2px;
-                    border-radius: 10px;
-                    border-color: #666666;
-                    font-family: "Arail";
-                    font-size: {self.text_size}pt;
-                    font-weight: bold;
-                    padding: 6px;
-                }}
-                QPushButton:hover {{
-                    background-color: #CCCCCC;
-                    border-style: inset;
-                }}
-                QPushButton:pressed {{
-                    background-color: #666666;
-                    border-style: inset;
-                }}
-                QLineEdit {{
-                    background-color: #FFFFFF;
-                    color: #000000;
-                    font-family: "Arail";
-                    font-size: {self.text_size}pt;
-                    font-weight: bold;
-                    border-style: inset;
-                    border-width: 2px;
-                    border-radius: 10px;
-                    border-color: #666666;
-                    padding: 2px;
-                }}
-                QLabel {{
-                    font-family: "Arail";
-                    font-size: {self.text_size}pt;
-                    font-weight: bold;
-                    color: #000000;
-                }}
-                QHBoxLayout {{
-                    background-color: #FFFFFF;
-                }}
-                QVBoxLayout {{
-                    background-color: #FFFFFF;
-                }}
-                ValveDiagram {{
-                    background-color: #FFFFFF;
-                }}
-            """
-            self.setStyleSheet(light_stylesheet)
+    def apply_theme(self):
+        """Apply the palette and font of the current mode and text size to the whole GUI"""
+        self.theme_engine.apply(self.dark_mode, self.text_size, self)
+        self.controller.sensor_grid.set_text_size(self.text_size)
@@ -1,5 +1,6 @@
 # GUI_LOGO.py
 # This file displays the RED logo with some scaling
+# Both logos are scaled once, so switching the theme only swaps the pixmap
 from PyQt5.QtWidgets import QLabel, QWidget, QVBoxLayout
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt
@@ -8,6 +9,7 @@ class LogoWindow(QWidget):
     def __init__(self, scale_width=120):
         super().__init__()
         self.scale_width = scale_width
+        self.pixmaps = {}       # Scaled logo of each image file
 
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -20,12 +22,13 @@ class LogoWindow(QWidget):
         self.logo_label.setAlignment(Qt.AlignLeading)
         layout.addWidget(self.logo_label)
     
+    def logo(self, path):
+        if path not in self.pixmaps:
+            self.pixmaps[path] = QPixmap(path).scaledToWidth(self.scale_width, Qt.SmoothTransformation)
+        return self.pixmaps[path]
+
     def set_dark_image(self):
-        pixmap = QPixmap("RED Logo White.png")
-        pixmap = pixmap.scaledToWidth(self.scale_width, Qt.SmoothTransformation)
-        self.logo_label.setPixmap(pixmap)
+        self.logo_label.setPixmap(self.logo("RED Logo White.png"))
 
     def set_light_image(self):
-        pixmap = QPixmap("RED Logo Maroon.png")
-        pixmap = pixmap.scaledToWidth(self.scale_width, Qt.SmoothTransformation)
-        self.logo_label.setPixmap(pixmap)
\ No newline at end of file
+        self.logo_label.setPixmap(self.logo("RED Logo Maroon.png"))
@@ -1,11 +1,42 @@
 # GUI_MAIN.py
 # This file is the starting point for the Elysium2 GUI
-import sys
+# The startup time breakdown (see GUI_STARTUP) is printed once the window is up, and again once the background loading
+# has finished.
+import time
+LAUNCHED = time.monotonic_ns()      # Before any other import, so the imports are part of the breakdown
+
+import argparse, sys
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+from GUI_STARTUP import STARTUP, Preloader
 from GUI_LAYOUT import MainWindow
+from GUI_MIRROR import MIRROR_HOST, MIRROR_PORT
+
+def window_ready():
+    STARTUP.mark("first paint")
+    print(STARTUP.report())
+    # Nothing needs the plotting and filtering modules yet, so they load while the panel is already usable
+    preloader.start()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    STARTUP.begin(LAUNCHED)
+    STARTUP.mark("imports")
+    parser = argparse.ArgumentParser(description="Elysium2 GUI")
+    parser.add_argument("--painted-grid", action="store_true",
+                        help="Paint the sensor tiles in one widget (faster with many channels)")
+    parser.add_argument("--mirror", type=int, nargs="?", const=MIRROR_PORT, metavar="PORT",
+                        help=f"Republish the telemetry to read-only viewers on this TCP port (default {MIRROR_PORT})")
+    parser.add_argument("--mirror-host", default=MIRROR_HOST, metavar="HOST",
+                        help=f"Interface the mirror listens on (default {MIRROR_HOST}, every interface)")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    STARTUP.mark("Qt")
+    window = MainWindow(painted_grid=args.painted_grid, mirror_port=args.mirror,
+                        mirror_host=args.mirror_host)
+    STARTUP.mark("window")
+    preloader = Preloader(done=lambda: print(STARTUP.report()))
     window.show()
+    # Runs once the event loop has started and the window has been shown
+    QTimer.singleShot(0, window_ready)
     sys.exit(app.exec_())
@@ -0,0 +1,161 @@
+# GUI_MIRROR.py
+# This file hosts the TelemetryMirror, which republishes what the GUI receives to read-only viewers over TCP, so more
+# people can follow a test without a second connection to the MCU or any load on the control GUI. The main thread only
+# appends each line to every subscriber's buffer; one thread per subscriber does the sending. A subscriber that falls
+# behind loses its oldest lines (and is told how many), and one that stops reading altogether is disconnected.
+#
+# The stream is plain text, one line per message, so any TCP client (e.g. nc) can follow it:
+#   CHANNELS,<ID>:<unit>,...                    Sent on connection and whenever the configuration set changes
+#   DATA,<t ns>,<ID>:<value>,...                The displayed (calibrated, filtered) values of one frame
+#   EVENT,<t ns>,<event type>,<details>         Everything the GUI logs: aborts, valve commands, recordings, ...
+#   DROPPED,<count>                             Lines this subscriber lost because it was not reading fast enough
+# Times are the GUI's synchronized monotonic times (see GUI_CLOCK). Subscribers cannot send anything back.
+#
+# Usage (a console viewer): python GUI_MIRROR.py HOST [PORT]
+import socket, sys, threading
+from collections import deque
+from GUI_CLOCK import now_ns
+
+MIRROR_PORT = 8889              # Default port, next to the MCU's
+MIRROR_HOST = "0.0.0.0"         # Default interface to listen on (all of them)
+MIRROR_BUFFER = 4096            # Lines buffered per subscriber, beyond which its oldest lines are dropped
+MIRROR_SEND_TIMEOUT = 2.0       # Seconds a subscriber may block a send before it is disconnected
+
+class MirrorSubscriber:
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.buffer = deque(maxlen=MIRROR_BUFFER)
+        self.dropped = 0            # Lines dropped since the last DROPPED notice
+        self.total_dropped = 0
+        self.wakeup = threading.Condition()
+        self.active = True
+
+    def push(self, line):
+        with self.wakeup:
+            if len(self.buffer) == MIRROR_BUFFER:
+                self.dropped += 1
+                self.total_dropped += 1
+            self.buffer.append(line)
+            self.wakeup.notify()
+
+    def close(self):
+        with self.wakeup:
+            self.active = False
+            self.wakeup.notify()
+
+    def send_loop(self):
+        self.sock.settimeout(MIRROR_SEND_TIMEOUT)
+        try:
+            while True:
+                with self.wakeup:
+                    while self.active and not self.buffer:
+                        self.wakeup.wait()
+                    if not self.active:
+                        break
+                    lines = list(self.buffer)
+                    self.buffer.clear()
+                    if self.dropped:
+                        lines.insert(0, f"DROPPED,{self.dropped}\n")
+                        self.dropped = 0
+                self.sock.sendall("".join(lines).encode())
+        except OSError:
+            # Gone, or not reading anymore (send timeout)
+            pass
+        finally:
+            self.active = False
+            self.sock.close()
+
+class TelemetryMirror:
+    def __init__(self, port=MIRROR_PORT, host=MIRROR_HOST):
+        self.host = host
+        self.port = port
+        self.server = None
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.channels = None
+        self.log_event_callback = None      # Called from the mirror's threads, like the EthernetClient's
+
+    def start(self):
+        """Listen for subscribers. Raises OSError if the port cannot be bound"""
+        self.server = socket.create_server((self.host, self.port))
+        self.server.settimeout(1)   # So that the accept loop notices stop()
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def stop(self):
+        if self.server:
+            self.server.close()
+            self.server = None
+        with self.lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+
+    def accept_loop(self):
+        server = self.server
+        while self.server is server:
+            try:
+                sock, address = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            subscriber = MirrorSubscriber(sock, address)
+            if self.channels is not None:
+                subscriber.push(self.channels_line())
+            with self.lock:
+                self.subscribers.append(subscriber)
+            self.log("MIRROR:SUBSCRIBED", f"{address[0]}:{address[1]}")
+            threading.Thread(target=self.serve, args=(subscriber,), daemon=True).start()
+
+    def serve(self, subscriber):
+        subscriber.send_loop()
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+        self.log("MIRROR:UNSUBSCRIBED", f"{subscriber.address[0]}:{subscriber.address[1]}, "
+                                        f"{subscriber.total_dropped} lines dropped")
+
+    def log(self, event_type, details):
+        if self.log_event_callback:
+            self.log_event_callback(event_type, details)
+
+    def channels_line(self):
+        return "CHANNELS," + ",".join(f"{channel.ID}:{channel.unit}" for channel in self.channels.channels) + "\n"
+
+    def set_channels(self, channels):
+        """The ChannelRegistry of the configuration set in use, announced to every subscriber"""
+        self.channels = channels
+        self.publish(self.channels_line())
+
+    def publish(self, line):
+        """Queue a line for every subscriber. Cheap enough for the main thread, and free without subscribers"""
+        if not self.subscribers:
+            return
+        with self.lock:
+            for subscriber in self.subscribers:
+                subscriber.push(line)
+
+    def publish_frame(self, t, indices, values):
+        """The values (by channel index) of the channels at these indices"""
+        if self.subscribers and len(indices):
+            channels = self.channels
+            self.publish(f"DATA,{t}," + ",".join(f"{channels[i].ID}:{values[i]:g}" for i in indices) + "\n")
+
+    def publish_event(self, event_type, event_details="", t=None):
+        if self.subscribers:
+            # Commas are the separator, so they cannot appear in the event fields
+            details = str(event_details).replace(",", ";").replace("\n", " ")
+            self.publish(f"EVENT,{now_ns() if t is None else t},{event_type},{details}\n")
+
+def view(host, port=MIRROR_PORT):
+    """Print a mirror's stream until it closes"""
+    with socket.create_connection((host, port)) as sock:
+        for line in sock.makefile(encoding="utf-8", errors="replace"):
+            print(line, end="")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python GUI_MIRROR.py HOST [PORT]")
+        sys.exit(1)
+    view(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else MIRROR_PORT)
@@ -0,0 +1,133 @@
+# GUI_PARSER.py
+# This file hosts the TelemetryParser, which turns lines of key:value telemetry into a vector of channel values.
+# Pairs may be separated by commas (as specified in Elysium/README.md) or whitespace, and the Teensy time is taken
+# from the "t" key, or from a bare leading number as in older telemetry ("123 P1:1.0 P2:2.0").
+#
+# Each key is mapped to its index in the vector through a lookup table that is built once, so parsing a frame is one
+# split, one dictionary lookup and one float conversion per pair. Malformed values do not raise per token: a frame
+# that fails the fast path is parsed again by a validating regular expression, and only its bad pairs are dropped.
+#
+# Run this file directly to benchmark it.
+import math, re, time
+
+NAN = math.nan
+KEY = re.compile(r"[A-Za-z_][\w\-]*")
+NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+PAIR = re.compile(r"(?<![^\s,])([A-Za-z_][\w\-]*):(" + NUMBER.pattern + r")(?![^\s,])")
+
+class TelemetryParser:
+    def __init__(self, channels, learn_unknown=True):
+        """
+        channels: the channel IDs, in the order of the value vector.
+        learn_unknown: give keys that are not in channels a new slot at the end of the vector when first seen,
+                       instead of ignoring them.
+        """
+        self.channels = []
+        self.index = {}                 # Key as received -> slot in the vector, including the "t" slot
+        self.learn_unknown = learn_unknown
+        self.unknown_keys = set()       # Keys that were ignored because learn_unknown is off
+        self.timestamp_index = 0
+        self.values = []
+        self.blank = []
+        for channel in channels:
+            self._add_channel(channel.upper())
+
+    def _add_channel(self, channel):
+        # The timestamp occupies the last slot, so it moves up by one every time a channel is added
+        self.channels.append(channel)
+        self.timestamp_index = len(self.channels)
+        self.index = {key: i for key, i in self.index.items() if key != "t"}
+        self.index[channel] = len(self.channels) - 1
+        self.index["t"] = self.timestamp_index
+        self.blank = [NAN] * (len(self.channels) + 1)
+        self.values = list(self.blank)
+
+    def _resolve(self, key, value):
+        """Slow path for a key that is not in the lookup table yet. Returns its slot, or None to skip it"""
+        if not KEY.fullmatch(key) or not NUMBER.fullmatch(value):
+            return None                 # Not a reading (e.g. a bare timestamp, "Aborted" or a VALVE: echo), never cached
+        channel = key.upper()
+        if channel not in self.index:
+            if not self.learn_unknown:
+                self.unknown_keys.add(key)
+                return None
+            values = self.values
+            self._add_channel(channel)
+            self.values[:len(values) - 1] = values[:-1]
+            self.values[self.timestamp_index] = values[-1]
+        # Lower or mixed case spellings share the slot of the upper case channel
+        self.index[key] = self.index[channel]
+        return self.index[key]
+
+    def parse(self, line):
+        """Fill self.values from one line (NaN for channels not in the line) and return it"""
+        values = self.values
+        values[:] = self.blank
+        get = self.index.get
+        tokens = line.replace(",", " ").split()
+        try:
+            for token in tokens:
+                key, _, value = token.partition(":")
+                i = get(key)
+                if i is None:
+                    i = self._resolve(key, value)
+                    if i is None:
+                        continue
+                    values = self.values        # The vector is replaced when a channel is learned
+                values[i] = float(value)
+        except ValueError:
+            values = self._parse_strict(line)
+
+        if tokens and values[self.timestamp_index] != values[self.timestamp_index]:
+            first = tokens[0]
+            if NUMBER.fullmatch(first):
+                values[self.timestamp_index] = float(first)
+        return values
+
+    def _parse_strict(self, line):
+        values = self.values
+        values[:] = self.blank
+        for key, value in PAIR.findall(line):
+            i = self.index.get(key)
+            if i is None:
+                i = self._resolve(key, value)
+                if i is None:
+                    continue
+                values = self.values
+            values[i] = float(value)
+        return values
+
+    @property
+    def timestamp(self):
+        """Teensy time of the last parsed line, or None if it had none"""
+        t = self.values[self.timestamp_index]
+        return None if t != t else t
+
+    def readings(self):
+        """The channels present in the last parsed line, as a dictionary of channel ID to value"""
+        return {channel: value for channel, value in zip(self.channels, self.values) if value == value}
+
+def benchmark_parser(frames=200000):
+    """Return the frames per second parsed for the comma, whitespace and malformed layouts of a 16 channel frame"""
+    channels = [f"P{i}" for i in range(1, 9)] + [f"TC{i}" for i in range(1, 4)] + \
+               [f"LC{i}" for i in range(1, 4)] + [f"B{i}" for i in range(1, 3)]
+    pairs = [f"{name}:{100 + 7.3 * i:.3f}" for i, name in enumerate(channels)]
+    lines = {
+        "comma": ",".join(["t:6545450000"] + pairs),
+        "space": " ".join(["6545450000"] + pairs),
+        "malformed": ",".join(["t:6545450000"] + pairs[:-1] + ["B2:1.2.3"]),
+    }
+    results = {}
+    for layout, line in lines.items():
+        parser = TelemetryParser(channels)
+        parse = parser.parse
+        count = frames if layout != "malformed" else frames // 10
+        start = time.perf_counter()
+        for _ in range(count):
+            parse(line)
+        results[layout] = count / (time.perf_counter() - start)
+    return results
+
+if __name__ == "__main__":
+    for layout, rate in benchmark_parser().items():
+        print(f"{layout:>10}: {rate:9.0f} frames/s")
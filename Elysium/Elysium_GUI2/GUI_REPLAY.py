@@ -0,0 +1,132 @@
+# GUI_REPLAY.py
+# This file hosts the ReplayClient, which feeds a past recording back through the GUI in place of the EthernetClient.
+# Frames are delivered from the main thread by a QTimer, so every frame goes through the same controller, sensor grid,
+# graph and abort path as live telemetry, and the reported frame rate is the throughput of that whole path.
+import csv, mmap, os, re, time
+from datetime import datetime
+from PyQt5.QtCore import QTimer
+from GUI_CLOCK import NS_PER_SECOND
+
+class RecordingReader:
+    """
+    Streams (time in ns, telemetry line) frames out of a recording through a memory map, without loading the
+    file. Both the CSV files written by GUIController.start_recording and plain telemetry logs (one line per frame,
+    as sent by the MCU) are accepted. The time is None when a frame of a plain log has no "t:" key.
+    """
+    GUI_RECORDING_HEADER = b"Timestamp,TeensyTimestamp"
+    TEENSY_TIME = re.compile(r"(?:^|[,\s])t:([-+0-9.eE]+)")
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def frames(self):
+        if os.path.getsize(self.filename) == 0:
+            return
+        with open(self.filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.readline().startswith(self.GUI_RECORDING_HEADER):
+                yield from self._gui_recording_frames(mm)
+            else:
+                mm.seek(0)
+                yield from self._telemetry_frames(mm)
+
+    def _gui_recording_frames(self, mm):
+        for raw_line in iter(mm.readline, b""):
+            row = next(csv.reader([raw_line.decode(errors="ignore")]), None)
+            # Event rows (heartbeats, valve commands, ...) have no sensor data and are not replayed
+            if not row or len(row) < 5 or not row[4]:
+                continue
+            try:
+                if len(row) > 7 and row[7]:
+                    t = int(row[7])
+                else:
+                    # Older recordings only have the date of every row
+                    t = round(datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S.%f").timestamp() * NS_PER_SECOND)
+            except ValueError:
+                t = None
+            yield t, f"{row[1]} {row[4]}" if row[1] else row[4]
+
+    def _telemetry_frames(self, mm):
+        for raw_line in iter(mm.readline, b""):
+            line = raw_line.decode(errors="ignore").strip()
+            if not line:
+                continue
+            match = self.TEENSY_TIME.search(line)
+            yield (round(float(match.group(1)) * 1000) if match else None), line
+
+class ReplayClient:
+    # Longest time (ns) spent delivering frames before returning to the event loop, so the GUI stays responsive
+    TICK_BUDGET = 20_000_000
+
+    def __init__(self, filename, speed=1.0):
+        self.filename = filename
+        self.speed = speed          # Playback speed relative to real time, 0 plays as fast as possible
+        self.connecting = False
+        self.connected = False
+        self.receive_callback = None
+        self.log_event_callback = None
+        self.finished_callback = None
+
+        self.frames = None
+        self.pending = None
+        self.frames_sent = 0
+        self.first_frame_time = None
+        self.start_time = None
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._deliver_frames)
+
+    def start(self):
+        self.frames = RecordingReader(self.filename).frames()
+        self.connected = True
+        self.start_time = time.perf_counter_ns()
+        if self.log_event_callback:
+            self.log_event_callback("REPLAY:START", f"{os.path.basename(self.filename)} at {self.speed or 'max'}x")
+        self.timer.start(0 if self.speed <= 0 else 5)
+
+    def _deliver_frames(self):
+        deadline = time.perf_counter_ns() + self.TICK_BUDGET
+        while self.connected:
+            if self.pending is None:
+                self.pending = next(self.frames, None)
+                if self.pending is None:
+                    self._finish()
+                    return
+
+            t, line = self.pending
+            if self.speed > 0 and t is not None:
+                if self.first_frame_time is None:
+                    self.first_frame_time = t
+                # Wait for the playback clock to reach this frame
+                if (t - self.first_frame_time) / self.speed > time.perf_counter_ns() - self.start_time:
+                    return
+
+            self.pending = None
+            self.frames_sent += 1
+            if self.receive_callback:
+                self.receive_callback(line)
+            if time.perf_counter_ns() > deadline:
+                return
+
+    def stats(self):
+        elapsed = (time.perf_counter_ns() - self.start_time) / NS_PER_SECOND if self.start_time else 0
+        return {"frames": self.frames_sent, "seconds": elapsed, "frames_per_second": self.frames_sent / elapsed if elapsed else 0}
+
+    def _finish(self):
+        self.timer.stop()
+        self.connected = False
+        stats = self.stats()
+        if self.log_event_callback:
+            self.log_event_callback("REPLAY:END", f"{stats['frames']} frames in {stats['seconds']:.2f}s "
+                                                  f"({stats['frames_per_second']:.0f} frames/s)")
+        if self.finished_callback:
+            self.finished_callback(stats)
+
+    def send_valve_command(self, valve_name, state):
+        # There is no hardware behind a replay, so commands are only recorded
+        if self.log_event_callback:
+            state_str = "OPEN" if state else "CLOSE"
+            self.log_event_callback(f"REPLAY_VALVE_CMD:{valve_name}:{state_str}")
+
+    def disconnect(self):
+        if self.connected:
+            self._finish()
@@ -0,0 +1,265 @@
+# GUI_SPECTRUM.py
+# This file hosts the live spectral view for combustion instability monitoring. Channels listed in spectrum.cfg (e.g.
+# the chamber pressure P8 and the load cells) keep a sliding buffer of their calibrated, unfiltered samples. Every time
+# half a window of new samples has arrived, the latest window is handed to a worker thread, which computes its
+# Hann-windowed FFT with NumPy and appends it to a spectrogram. The averaged spectrum of the latest windows is the PSD
+# that is shown, and a peak inside the channel's frequency band above its threshold is reported as a warning (and,
+# if the "combustion_instability" abort mode is enabled, an abort).
+import queue, threading
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QLabel
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_lines
+from GUI_CLOCK import NS_PER_SECOND
+from GUI_GRAPHS import new_figure
+
+SPECTROGRAM_ROWS = 200      # Windows kept in each spectrogram
+AVERAGED_WINDOWS = 8        # Windows averaged into the displayed PSD
+PEAK_PERSISTENCE = 3        # Consecutive windows a peak must stay above the threshold before it is reported
+
+class SpectrumSignals(QObject):
+    spectrum_ready = pyqtSignal(str)                    # Channel ID
+    peak_detected = pyqtSignal(str, float, float)       # Channel ID, frequency (Hz), amplitude
+
+class SpectralChannel:
+    def __init__(self, ID, nfft, rate, low, high, threshold=None):
+        self.ID = ID.upper()
+        self.nfft = nfft
+        self.rate = rate                    # Nominal sample rate (Hz), used until the timestamps give a better one
+        self.band = (low, high)             # Frequency band (Hz) that is watched for peaks
+        self.threshold = threshold          # Peak amplitude (channel units) that raises a warning, None for no warning
+        self.hop = max(nfft // 2, 1)        # New samples between two windows (50 % overlap)
+
+        # Sliding sample buffer, written on the main thread
+        capacity = 2 * nfft
+        self.samples = np.zeros(capacity)
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.head = 0
+        self.count = 0
+        self.since_window = 0
+
+        # Spectrogram, written by the worker thread and read by the view under the lock
+        self.lock = threading.Lock()
+        self.frequencies = np.fft.rfftfreq(nfft, 1.0 / rate)
+        self.spectrogram = np.full((SPECTROGRAM_ROWS, nfft // 2 + 1), np.nan)
+        self.rows = 0
+        self.window = np.hanning(nfft)
+        self.over_threshold = 0
+
+    def push(self, t, value):
+        """Add one sample. Returns the latest window (times, samples) when a new one is due, otherwise None"""
+        row = self.head
+        self.samples[row] = value
+        self.times[row] = t
+        self.head = (row + 1) % len(self.samples)
+        self.count += 1
+        self.since_window += 1
+        if self.count < self.nfft or self.since_window < self.hop:
+            return None
+        self.since_window = 0
+        rows = (self.head - self.nfft + np.arange(self.nfft)) % len(self.samples)
+        return self.times[rows], self.samples[rows]
+
+    def analyze(self, times, samples):
+        """Worker thread: add the amplitude spectrum of one window, return the (frequency, amplitude) of the band's peak"""
+        if not np.isfinite(samples).all():
+            # One inf or NaN sample would turn the whole spectrum into NaN, so the window is left out altogether
+            return None
+        seconds = (times - times[0]) / NS_PER_SECOND
+        if seconds[-1] > 0:
+            # Samples of a channel are not evenly spaced in general, so the window is resampled onto a uniform grid
+            rate = (self.nfft - 1) / seconds[-1]
+            samples = np.interp(np.arange(self.nfft) / rate, seconds, samples)
+        else:
+            rate = self.rate
+        frequencies = np.fft.rfftfreq(self.nfft, 1.0 / rate)
+        amplitudes = 2 * np.abs(np.fft.rfft((samples - samples.mean()) * self.window)) / self.window.sum()
+        with self.lock:
+            self.frequencies = frequencies
+            self.spectrogram[self.rows % SPECTROGRAM_ROWS] = amplitudes
+            self.rows += 1
+
+        in_band = (frequencies >= self.band[0]) & (frequencies <= self.band[1])
+        if not in_band.any():
+            return None
+        peak = np.argmax(np.where(in_band, amplitudes, -np.inf))
+        return frequencies[peak], amplitudes[peak]
+
+    def psd(self):
+        """(frequencies, power spectral density) averaged over the latest windows, in units^2/Hz"""
+        with self.lock:
+            n = min(self.rows, AVERAGED_WINDOWS)
+            if not n:
+                return self.frequencies, np.zeros(len(self.frequencies))
+            latest = (self.rows - n + np.arange(n)) % SPECTROGRAM_ROWS
+            amplitudes = self.spectrogram[latest]
+            frequencies = self.frequencies
+        # A sinusoid of amplitude A has power A^2 / 2, spread over the window's equivalent noise bandwidth
+        resolution = frequencies[1] - frequencies[0] if len(frequencies) > 1 else 1.0
+        enbw = resolution * self.nfft * np.sum(self.window ** 2) / self.window.sum() ** 2
+        return frequencies, np.mean(amplitudes ** 2, axis=0) / 2 / enbw
+
+    def spectrogram_image(self):
+        """The spectrogram rows in time order (oldest first) and the frequencies of its columns"""
+        with self.lock:
+            n = min(self.rows, SPECTROGRAM_ROWS)
+            order = (self.rows - n + np.arange(n)) % SPECTROGRAM_ROWS
+            return self.frequencies, self.spectrogram[order].copy()
+
+class SpectralMonitor:
+    def __init__(self, channels=None):
+        self.channels = {channel.ID: channel for channel in channels or []}
+        self.slots = []             # (channel index, channel), set by bind()
+        self.signals = SpectrumSignals()
+        # Windows waiting for the worker. If it falls behind, the oldest windows are dropped, never the samples
+        self.pending = queue.Queue(maxsize=4 * max(len(self.channels), 1))
+        self.worker = None
+        self.running = False
+
+    @classmethod
+    def from_config(cls, config_name=DEFAULT_CONFIG):
+        """Load spectrum.cfg from a configuration set (a missing file simply means no spectral channels)"""
+        path = config_file("spectrum.cfg", config_name)
+        channels = []
+        for line in read_cfg_lines(path):
+            args = line.split(",")
+            try:
+                if len(args) not in (5, 6):
+                    raise ValueError
+                nfft, rate, low, high = int(args[1]), float(args[2]), float(args[3]), float(args[4])
+                threshold = float(args[5]) if len(args) == 6 and args[5] else None
+                if nfft < 16 or rate <= 0 or not 0 <= low < high:
+                    raise ValueError
+            except ValueError:
+                raise ValueError(f"{path}: expected 'ID,nfft,rate,low,high,[threshold]' with nfft >= 16 and "
+                                 f"low < high but found '{line}'")
+            channels.append(SpectralChannel(args[0], nfft, rate, low, high, threshold))
+        return cls(channels)
+
+    def start(self):
+        if self.running or not self.channels:
+            return
+        self.running = True
+        self.worker = threading.Thread(target=self.work_loop, daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        self.running = False
+        try:
+            self.pending.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def bind(self, channels):
+        """Look up the index of every monitored channel in a ChannelRegistry once, for push"""
+        self.slots = [(channels.index[ID], channel) for ID, channel in self.channels.items() if ID in channels.index]
+
+    def push(self, values, present, t):
+        """Main thread: add the samples of one frame (a vector of values by channel index, and which of them are in
+        the frame) at time t (ns)"""
+        for slot, channel in self.slots:
+            if not present[slot]:
+                continue
+            window = channel.push(t, values[slot])
+            if window is None:
+                continue
+            while True:
+                try:
+                    self.pending.put_nowait((channel, window))
+                    break
+                except queue.Full:
+                    try:
+                        self.pending.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def work_loop(self):
+        while self.running:
+            item = self.pending.get()
+            if item is None:
+                break
+            channel, (times, samples) = item
+            peak = channel.analyze(times, samples)
+            self.signals.spectrum_ready.emit(channel.ID)
+
+            if peak is None or channel.threshold is None or not np.isfinite(peak[1]) or peak[1] <= channel.threshold:
+                channel.over_threshold = 0
+                continue
+            channel.over_threshold += 1
+            if channel.over_threshold == PEAK_PERSISTENCE:
+                self.signals.peak_detected.emit(channel.ID, float(peak[0]), float(peak[1]))
+
+class SpectrumWindow(QDialog):
+    """PSD and spectrogram of one spectral channel, redrawn whenever the worker finishes a new window"""
+    def __init__(self, monitor, units=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Spectrum")
+        self.resize(800, 700)
+        self.setModal(False)
+        self.monitor = monitor
+        self.units = units or {}
+        self.needs_redraw = False
+
+        self.channel_input = QComboBox()
+        self.channel_input.addItems(monitor.channels.keys())
+        self.channel_input.currentTextChanged.connect(self.build_axes)
+        selector = QHBoxLayout()
+        selector.addWidget(QLabel("Channel:"))
+        selector.addWidget(self.channel_input)
+        selector.addStretch()
+
+        self.figure, self.canvas = new_figure()
+        layout = QVBoxLayout()
+        layout.addLayout(selector)
+        layout.addWidget(self.canvas)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        monitor.signals.spectrum_ready.connect(self.spectrum_ready)
+        self.build_axes()
+
+    def build_axes(self, *args):
+        self.figure.clear()
+        self.channel = self.monitor.channels.get(self.channel_input.currentText())
+        if self.channel is None:
+            self.canvas.draw_idle()
+            return
+        unit = self.units.get(self.channel.ID, "")
+        self.psd_ax = self.figure.add_subplot(2, 1, 1)
+        self.psd_line, = self.psd_ax.semilogy([], [], 'g-', linewidth=1)
+        self.psd_ax.axvspan(*self.channel.band, color="orange", alpha=0.2)
+        self.psd_ax.set_title(f"{self.channel.ID} power spectral density")
+        self.psd_ax.set_xlabel("Frequency (Hz)")
+        self.psd_ax.set_ylabel(f"PSD ({unit}²/Hz)")
+        self.psd_ax.grid(True)
+        self.spectrogram_ax = self.figure.add_subplot(2, 1, 2)
+        self.spectrogram_image = None
+        self.spectrogram_ax.set_xlabel("Frequency (Hz)")
+        self.spectrogram_ax.set_ylabel("Windows ago")
+        self.figure.tight_layout()
+        self.redraw()
+
+    def spectrum_ready(self, ID):
+        # draw_idle coalesces a burst of windows into a single repaint
+        if self.channel is not None and ID == self.channel.ID and self.isVisible():
+            self.redraw()
+
+    def redraw(self):
+        frequencies, psd = self.channel.psd()
+        if len(frequencies) > 1 and psd.any():
+            self.psd_line.set_data(frequencies[1:], psd[1:])
+            self.psd_ax.set_xlim(0, frequencies[-1])
+            self.psd_ax.relim()
+            self.psd_ax.autoscale_view(scalex=False)
+
+        frequencies, image = self.channel.spectrogram_image()
+        if len(image):
+            image = 20 * np.log10(np.maximum(image, 1e-12))[::-1]
+            extent = (frequencies[0], frequencies[-1], len(image), 0)
+            if self.spectrogram_image is None:
+                self.spectrogram_image = self.spectrogram_ax.imshow(image, aspect="auto", extent=extent, cmap="viridis")
+            else:
+                self.spectrogram_image.set_data(image)
+                self.spectrogram_image.set_extent(extent)
+                self.spectrogram_image.autoscale()
+        self.canvas.draw_idle()
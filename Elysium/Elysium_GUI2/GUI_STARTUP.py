@@ -0,0 +1,91 @@
+# GUI_STARTUP.py
+# This file hosts what lets the GUI come up quickly. The heavy modules (matplotlib for the graphs, scipy.signal for the
+# filters) are not imported at startup: they are preloaded in a background thread once the window is up, so the panel
+# can be used while they load, and the first graph or filtered sample only waits for whatever is still missing.
+# matplotlib's Qt backend creates Qt objects as it is imported, so it alone is imported on the main thread, once the
+# rest has loaded.
+# Images are decoded in the background too (QImage can be used off the main thread, QPixmap cannot). The
+# StartupProfile times each phase of the launch and prints the breakdown.
+import importlib, threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage
+from GUI_CLOCK import now_ns
+
+PRELOAD_MODULES = ["matplotlib.figure", "scipy.signal"]               # Imported in a background thread
+MAIN_THREAD_MODULES = ["matplotlib.backends.backend_qt5agg"]            # Imported on the main thread afterwards
+
+class StartupProfile:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.begin(now_ns())
+
+    def begin(self, start_ns):
+        """Start over from the launch time (ns), taken before the first import"""
+        self.start = self.last = start_ns
+        self.phases = []            # (phase, ns) on the main thread, up to the window being usable
+        self.background = []        # (task, ns) of the work left to background threads
+
+    def mark(self, phase):
+        """The main thread finished a phase of the startup"""
+        now = now_ns()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def mark_background(self, task, started_ns):
+        with self.lock:
+            self.background.append((task, now_ns() - started_ns))
+
+    def report(self):
+        """One line breakdown of the phases so far, e.g. for the console"""
+        parts = ", ".join(f"{phase} {ns / 1e6:.0f} ms" for phase, ns in self.phases)
+        line = f"Startup: {parts} (usable after {(self.last - self.start) / 1e6:.0f} ms)"
+        with self.lock:
+            if self.background:
+                line += "; in the background: " + ", ".join(f"{task} {ns / 1e6:.0f} ms" for task, ns in self.background)
+        return line
+
+# Shared by GUI_MAIN and the widgets that load in the background, so their work shows up in the same breakdown
+STARTUP = StartupProfile()
+
+class Preloader(QObject):
+    """
+    Imports modules in a background thread, then main_thread_modules on the thread that owns the Preloader (imported
+    is delivered there), then calls done() from it
+    """
+    imported = pyqtSignal()
+
+    def __init__(self, modules=PRELOAD_MODULES, main_thread_modules=MAIN_THREAD_MODULES, done=None):
+        super().__init__()
+        self.modules = modules
+        self.main_thread_modules = main_thread_modules
+        self.done = done
+        self.imported.connect(self._import_main_thread_modules)
+
+    def start(self):
+        def preload_loop():
+            started = now_ns()
+            for name in self.modules:
+                importlib.import_module(name)
+            STARTUP.mark_background("plotting and filters", started)
+            self.imported.emit()
+        threading.Thread(target=preload_loop, daemon=True).start()
+
+    def _import_main_thread_modules(self):
+        started = now_ns()
+        for name in self.main_thread_modules:
+            importlib.import_module(name)
+        STARTUP.mark_background("plotting backend (main thread)", started)
+        if self.done:
+            self.done()
+
+class ImageLoader(QObject):
+    """Decodes image files in a background thread. loaded is delivered on the thread that owns the loader"""
+    loaded = pyqtSignal(str, QImage)
+
+    def load(self, paths, task="images"):
+        def load_loop():
+            started = now_ns()
+            for path in paths:
+                self.loaded.emit(path, QImage(path))
+            STARTUP.mark_background(task, started)
+        threading.Thread(target=load_loop, daemon=True).start()
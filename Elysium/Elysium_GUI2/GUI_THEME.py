@@ -0,0 +1,98 @@
+# GUI_THEME.py
+# This file hosts the ThemeEngine, which switches the GUI between light and dark mode and between text sizes. Every
+# (theme, text size) combination is built once into a QPalette and a QFont, and switching hands both to the
+# QApplication, from which Qt propagates them to every popup. The main window keeps the look of its buttons and text
+# fields through THEME_STYLE_SHEET, which is set once and takes every color from the palette. A style sheet resolves
+# those colors (and its widgets' fonts) when a widget is polished, so a switch re-polishes the window's widgets rather
+# than parsing a new style sheet. The widgets that draw themselves (sensor grid, P&ID diagram, graphs) are told the
+# theme separately.
+from PyQt5.QtWidgets import QApplication, QWidget
+from PyQt5.QtGui import QPalette, QColor, QFont
+
+THEME_FONT = "Arial"
+# Palette of each theme, keyed by dark mode. Mid, Midlight and Dark are the button border, hover and pressed colors
+THEME_COLORS = {
+    False: {
+        QPalette.Window: "#FFFFFF", QPalette.WindowText: "#000000",
+        QPalette.Base: "#FFFFFF", QPalette.AlternateBase: "#F0F0F0", QPalette.Text: "#000000",
+        QPalette.Button: "#FFFFFF", QPalette.ButtonText: "#000000", QPalette.BrightText: "#FF0000",
+        QPalette.Light: "#FFFFFF", QPalette.Midlight: "#CCCCCC", QPalette.Mid: "#666666",
+        QPalette.Dark: "#666666", QPalette.Shadow: "#333333",
+        QPalette.Highlight: "#666666", QPalette.HighlightedText: "#FFFFFF",
+        QPalette.ToolTipBase: "#FFFFFF", QPalette.ToolTipText: "#000000", QPalette.PlaceholderText: "#888888",
+    },
+    True: {
+        QPalette.Window: "#222222", QPalette.WindowText: "#FFFFFF",
+        QPalette.Base: "#333333", QPalette.AlternateBase: "#2A2A2A", QPalette.Text: "#FFFFFF",
+        QPalette.Button: "#333333", QPalette.ButtonText: "#FFFFFF", QPalette.BrightText: "#FF0000",
+        QPalette.Light: "#666666", QPalette.Midlight: "#666666", QPalette.Mid: "#999999",
+        QPalette.Dark: "#222222", QPalette.Shadow: "#000000",
+        QPalette.Highlight: "#666666", QPalette.HighlightedText: "#FFFFFF",
+        QPalette.ToolTipBase: "#333333", QPalette.ToolTipText: "#FFFFFF", QPalette.PlaceholderText: "#888888",
+    },
+}
+DISABLED_TEXT = "#888888"
+# The main window's style sheet, which takes its colors from the palette and its fonts from the QFont
+THEME_STYLE_SHEET = """
+    QPushButton {
+        background-color: palette(button);
+        color: palette(button-text);
+        border-style: inset;
+        border-width: 2px;
+        border-radius: 10px;
+        border-color: palette(mid);
+        padding: 6px;
+    }
+    QPushButton:hover {
+        background-color: palette(midlight);
+    }
+    QPushButton:pressed {
+        background-color: palette(dark);
+    }
+    QLineEdit {
+        background-color: palette(base);
+        color: palette(text);
+        border-style: inset;
+        border-width: 2px;
+        border-radius: 10px;
+        border-color: #666666;
+        padding: 2px;
+    }
+"""
+
+def repolish(widget):
+    """Have a widget and its children resolve their style sheets again, after the palette or font changed"""
+    style = widget.style()
+    for w in [widget] + widget.findChildren(QWidget):
+        style.unpolish(w)
+        style.polish(w)
+        w.update()
+
+class ThemeEngine:
+    def __init__(self, text_sizes=()):
+        """Builds both themes at each of text_sizes up front, so that no switch has anything left to build"""
+        self.themes = {}            # (dark, text size) -> (QPalette, QFont)
+        for text_size in text_sizes:
+            for dark in THEME_COLORS:
+                self.theme(dark, text_size)
+
+    def theme(self, dark, text_size):
+        """The palette and font of a combination, built on first use"""
+        key = (dark, text_size)
+        if key not in self.themes:
+            palette = QPalette()
+            for role, color in THEME_COLORS[dark].items():
+                palette.setColor(role, QColor(color))
+            for role in (QPalette.WindowText, QPalette.Text, QPalette.ButtonText):
+                palette.setColor(QPalette.Disabled, role, QColor(DISABLED_TEXT))
+            font = QFont(THEME_FONT, text_size)
+            font.setBold(True)
+            self.themes[key] = (palette, font)
+        return self.themes[key]
+
+    def apply(self, dark, text_size, window):
+        """Switch the whole GUI to a combination, re-polishing the window that carries THEME_STYLE_SHEET"""
+        palette, font = self.theme(dark, text_size)
+        QApplication.setPalette(palette)
+        QApplication.setFont(font)
+        repolish(window)
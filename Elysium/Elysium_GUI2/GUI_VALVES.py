@@ -0,0 +1,112 @@
+# GUI_VALVES.py
+# This file loads the valves (valves.cfg) and the operation states (control_states.cfg) of a configuration set.
+# Each valve is one bit of an integer mask (1 = open), and every control state is precomputed as a pair of masks, so
+# moving between states is a XOR of two masks that gives exactly the valves whose commands need to be sent.
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_lines, read_cfg_pairs
+
+# Number of [args] each class of valves.cfg takes, see configurations/README.md
+VALVE_CLASSES = {"Valve": 1, "Solenoid": 1, "LA_Ball": 2}
+
+class Valve:
+    def __init__(self, bit, valve_class, ID, name, args):
+        self.bit = bit
+        self.valve_class = valve_class
+        self.ID = ID
+        self.name = name
+        self.position = None        # (x, y) on the P&ID, from valve_positions.cfg
+        # The initial state is the Valve's "state", a Solenoid's "normally_open" and an LA_Ball's "is_open"
+        self.initially_open = args[-1] == "1"
+
+class ValveSet:
+    def __init__(self, valves=None):
+        self.valves = valves or []
+        self.bits = {valve.ID: valve.bit for valve in self.valves}
+        self.all_mask = (1 << len(self.valves)) - 1
+
+    @classmethod
+    def from_config(cls, config_name=DEFAULT_CONFIG):
+        """Load valves.cfg (same format as the C++ GUI) and the optional valve_positions.cfg of a configuration set"""
+        path = config_file("valves.cfg", config_name)
+        valves = []
+        for line in read_cfg_lines(path):
+            args = line.split(",")
+            if len(args) < 3 or args[0] not in VALVE_CLASSES or len(args) != 3 + VALVE_CLASSES[args[0]]:
+                raise ValueError(f"{path}: expected 'Valve|Solenoid|LA_Ball,ID,name,[args]*' but found '{line}'")
+            valves.append(Valve(len(valves), args[0], args[1], args[2], args[3:]))
+        valve_set = cls(valves)
+
+        path = config_file("valve_positions.cfg", config_name)
+        for line in read_cfg_lines(path):
+            args = line.split(",")
+            if len(args) != 3 or args[0] not in valve_set.bits:
+                raise ValueError(f"{path}: expected 'ID,x,y' for a valve in valves.cfg but found '{line}'")
+            valve_set.valves[valve_set.bits[args[0]]].position = (int(args[1]), int(args[2]))
+        return valve_set
+
+    @property
+    def IDs(self):
+        return [valve.ID for valve in self.valves]
+
+    def mask(self, states):
+        """Pack a dictionary of valve ID -> open into a mask"""
+        mask = 0
+        for ID, is_open in states.items():
+            if is_open and ID in self.bits:
+                mask |= 1 << self.bits[ID]
+        return mask
+
+    def initial_mask(self):
+        return self.mask({valve.ID: valve.initially_open for valve in self.valves})
+
+    def changes(self, current, target):
+        """The (valve ID, open) commands that take the valves from the current mask to the target mask"""
+        commands = []
+        diff = current ^ target
+        while diff:
+            low = diff & -diff
+            bit = low.bit_length() - 1
+            commands.append((self.valves[bit].ID, bool(target & low)))
+            diff ^= low
+        return commands
+
+class ControlState:
+    def __init__(self, names, placements, open_mask, care_mask):
+        self.names = names
+        self.placements = placements        # (row, col) of each name's button, or None for no button
+        self.open_mask = open_mask          # Valves this state opens
+        self.care_mask = care_mask          # Valves this state lists, the others are left as they are
+
+    def target(self, current):
+        """The valve mask after entering this state from the current mask"""
+        return (current & ~self.care_mask) | self.open_mask
+
+def load_control_states(valves, config_name=DEFAULT_CONFIG):
+    """Load control_states.cfg into a dictionary of state name -> ControlState, in the order listed"""
+    path = config_file("control_states.cfg", config_name)
+    states = {}
+    for args, valve_states in read_cfg_pairs(path):
+        if len(args) != 3:
+            raise ValueError(f"{path}: expected 'name1/name2,row1/row2,col1/col2' but found '{','.join(args)}'")
+        names, rows, cols = (arg.split("/") for arg in args)
+        if args[1] or args[2]:
+            if not len(names) == len(rows) == len(cols):
+                raise ValueError(f"{path}: {args[0]} needs one row and one column per name")
+            placements = [(int(row), int(col)) for row, col in zip(rows, cols)]
+        else:
+            placements = [None] * len(names)     # Entered by the GUI itself (e.g. the fire sequence), no button
+
+        open_mask = care_mask = 0
+        for pair in valve_states.split(","):
+            ID, _, state = pair.partition(":")
+            if state not in ("0", "1"):
+                raise ValueError(f"{path}: expected 'valve:0|1' but found '{pair}'")
+            if ID not in valves.bits:
+                continue            # IGNITE, SAFE, ... are not valves of this GUI
+            care_mask |= 1 << valves.bits[ID]
+            if state == "1":
+                open_mask |= 1 << valves.bits[ID]
+
+        state = ControlState(names, placements, open_mask, care_mask)
+        for name in names:
+            states[name] = state
+    return states
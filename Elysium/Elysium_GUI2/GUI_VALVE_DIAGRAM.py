@@ -1,118 +1,127 @@
 # GUI_VALVE_DIAGRAM.py
 # This file will display a diagram of the various valves in the Elysium 2 system.
 # They will update automatically according to various settings
-from stat import SF_APPEND
-from PyQt5.QtWidgets import QWidget, QLabel, QPushButton, QVBoxLayout, QSizePolicy
-from PyQt5.QtGui import QPixmap, QColor, QImage
-from PyQt5.QtCore import Qt, QSize
+# The diagram is painted by the widget itself: the P&ID image of each theme is loaded once and scaled once per widget
+# size, and the valve indicators are drawn over it, so a valve changing state only repaints its own indicator.
+# The images are decoded in the background while the GUI starts, and the indicators are drawn without them meanwhile.
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtGui import QPixmap, QColor, QPainter, QPen, QBrush, QImageReader
+from PyQt5.QtCore import Qt, QSize, QRect, QRectF
+from GUI_STARTUP import ImageLoader
+
+PID_IMAGES = {False: "P&ID Light.png", True: "P&ID Dark.png"}   # Keyed by dark mode
+VALVE_SIZE = 40             # Diameter of a valve indicator, in pixels of the P&ID image
+VALVE_BRUSHES = {False: QBrush(QColor("red")), True: QBrush(QColor("green"))}      # Keyed by open
+VALVE_PEN = QPen(QColor("#555555"), 1)
 
 class ValveDiagramWindow(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, valves, parent=None):
         super().__init__(parent)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(0)
-        layout.setAlignment(Qt.AlignRight | Qt.AlignTop)
-
-        # Load and display the P&ID image
-        self.label = QLabel(self)
-        self.pixmap = QPixmap("P&ID Light.png")
-        self.label.setScaledContents(True)
-        self.label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.min_size = QSize(int(720 / self.pixmap.height() * self.pixmap.width()), int(720))
-        self.label.setPixmap(self.pixmap.scaled(self.min_size, aspectRatioMode=Qt.KeepAspectRatio, 
-                                                transformMode=Qt.SmoothTransformation))
-        
-        self.scalingFactor = 1
-        
-        layout.addWidget(self.label)
-        self.setLayout(layout)
-
-        # Initial valve states: False = closed (red), True = open (green)
-        self.valve_states = {
-            "NCS1": False,
-            "NCS2": False,
-            "NCS3": False,
-            # "NCS4": False,
-            "NCS5": False,
-            "NCS6": False,
-            "LA-BV1": False,
-            "GV-1": False,
-            "GV-2": False
-        }
-
-        # Create and position valve indicators (not clickable)
-        self.valve_buttons = {}
-        self.positions = {
-            "NCS1": (670, 671),
-            "NCS2": (239, 541),
-            "NCS3": (582, 531),
-            # "NCS4": (582, 585),   # Removed by Simeon according to Austin's instruction on Aug 31
-            "NCS5": (464, 72),
-            "NCS6": (464, 5),
-            "LA-BV1": (513, 226),
-            "GV-1": (455, 626),
-            "GV-2": (505, 626)
-        }
+        # Both themes are loaded once in the background, the scaled copies are made on first paint at each size. Only
+        # the image header is read here, for the size the layout and the indicators need
+        self.sources = {}
+        self.scaled = {}
+        self.dark_mode = False
+        self.image_size = QImageReader(PID_IMAGES[False]).size()
+        self.min_size = QSize(int(720 / self.image_size.height() * self.image_size.width()), int(720))
+        self.image_loader = ImageLoader()
+        self.image_loader.loaded.connect(self.image_loaded)
+        self.image_loader.load(list(PID_IMAGES.values()), "P&ID images")
+
+        self.scalingFactor = self.min_size.height() / self.image_size.height()
+        self.image_rect = QRect(0, 0, self.min_size.width(), self.min_size.height())
+
+        self.valve_states = {}
+        self.positions = {}
+        self.set_valves(valves)
+
+    def sizeHint(self):
+        return self.min_size
+
+    def minimumSizeHint(self):
+        return self.min_size
+
+    def set_valves(self, valves):
+        """Place the valve indicators for a set of valves, keeping the state of valves that were already known"""
+        # Initial valve states (from valves.cfg): False = closed (red), True = open (green)
+        self.valve_states = {valve.ID: self.valve_states.get(valve.ID, valve.initially_open) for valve in valves.valves}
+        # Indicators (not clickable) are only drawn for the valves placed in valve_positions.cfg
+        self.positions = {valve.ID: valve.position for valve in valves.valves if valve.position}
+        self.update()
+
+    def valve_rect(self, name):
+        """Where a valve's indicator is drawn in the widget"""
+        x, y = self.positions[name]
         sf = self.scalingFactor
-
-        for name, (x, y) in self.positions.items():
-            btn = QPushButton("", self.label)
-            btn.setGeometry(int(x * sf), int(y * sf), int(40 * sf), int(40 * sf))
-            btn.setStyleSheet(f"background-color: red; border-radius: {int(20 * sf)}px;")
-            btn.setEnabled(False)  # Make non-clickable
-            self.valve_buttons[name] = btn
-
-    def update_button_positions(self):
-        sf = self.scalingFactor
-        for name, (x, y) in self.positions.items():
-            self.valve_buttons[name].setGeometry(int(x * sf), int(y * sf), int(40 * sf), int(40 * sf))
-            self.valve_buttons[name].setStyleSheet(f"background-color: red; border-radius: {int(20 * sf)}px;")
+        return QRect(self.image_rect.left() + int(x * sf), self.image_rect.top() + int(y * sf),
+                     int(VALVE_SIZE * sf), int(VALVE_SIZE * sf))
 
     def set_valve_state(self, name, state):
-        sf = self.scalingFactor
+        if self.valve_states.get(name) == state:
+            return
         self.valve_states[name] = state
-        color = "green" if state else "red"
-        self.valve_buttons[name].setStyleSheet(f"background-color: {color}; border-radius: {int(20 * sf)}px;")
+        if name in self.positions:
+            self.update(self.valve_rect(name).adjusted(-1, -1, 1, 1))
+
+    def image_loaded(self, path, image):
+        dark = path == PID_IMAGES[True]
+        self.sources[dark] = QPixmap.fromImage(image)
+        if dark == self.dark_mode:
+            self.update()
 
     def set_dark_image(self):
-        self.pixmap = QPixmap("P&ID Dark.png")
-        self.label.setScaledContents(True)
-        self.label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.label.setPixmap(self.pixmap.scaled(self.min_size, aspectRatioMode=Qt.KeepAspectRatio, 
-                                                transformMode=Qt.SmoothTransformation))
-        # self.label.setFixedSize(self.pixmap.size() * self.scalingFactor)
+        self.dark_mode = True
+        self.update()
 
     def set_light_image(self):
-        self.pixmap = QPixmap("P&ID Light.png")
-        self.label.setScaledContents(True)
-        self.label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        self.label.setPixmap(self.pixmap.scaled(self.min_size, aspectRatioMode=Qt.KeepAspectRatio, 
-                                                transformMode=Qt.SmoothTransformation))
-        # self.label.setFixedSize(self.pixmap.size() * self.scalingFactor)
+        self.dark_mode = False
+        self.update()
+
+    def scaled_image(self):
+        """The current theme's P&ID at the current size, scaled on first use, or None while it is still loading"""
+        key = (self.dark_mode, self.image_rect.width(), self.image_rect.height())
+        if self.dark_mode not in self.sources:
+            return None
+        if key not in self.scaled:
+            self.scaled[key] = self.sources[self.dark_mode].scaled(self.image_rect.size(), Qt.IgnoreAspectRatio,
+                                                                   Qt.SmoothTransformation)
+        return self.scaled[key]
 
     def resizeEvent(self, e):
         super().resizeEvent(e)
-        
-        if not self.pixmap or self.pixmap.width() == 0:
+
+        if self.image_size.isEmpty():
             return
 
-        ar = self.pixmap.width() / self.pixmap.height()
+        ar = self.image_size.width() / self.image_size.height()
         scaled_width = self.height() * ar   # The image width if it expanded to fill the height
         scaled_height = self.width() / ar   # The image height if it expanded to fill the width
 
         if scaled_width <= self.width():    # If the height-limited image would fit into the width
-            self.img_size = QSize(int(scaled_width), self.height())
+            img_size = QSize(int(scaled_width), self.height())
         else:                               # If the width-limited image would fit into the height
-            self.img_size = QSize(self.width(), int(scaled_height))
-
-        self.label.setMaximumWidth(int(scaled_width))
-        self.label.setMaximumHeight(int(scaled_height))
-        
-        self.scalingFactor = self.img_size.height() / self.pixmap.height()
-
-        self.update_button_positions()
-
-
+            img_size = QSize(self.width(), int(scaled_height))
+
+        # Drawn in the top right corner, like the diagram always was
+        self.image_rect = QRect(self.width() - img_size.width(), 0, img_size.width(), img_size.height())
+        self.scalingFactor = img_size.height() / self.image_size.height()
+        # Scaled copies at other sizes are not needed anymore
+        size = (img_size.width(), img_size.height())
+        self.scaled = {key: image for key, image in self.scaled.items() if key[1:] == size}
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        # Only the part of the image under the dirty region is copied, e.g. one indicator's square
+        dirty = e.rect().intersected(self.image_rect)
+        image = self.scaled_image()
+        if image is not None:
+            painter.drawPixmap(dirty, image, dirty.translated(-self.image_rect.topLeft()))
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(VALVE_PEN)
+        for name in self.positions:
+            rect = self.valve_rect(name)
+            if rect.intersects(e.rect()):
+                painter.setBrush(VALVE_BRUSHES[self.valve_states[name]])
+                painter.drawEllipse(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5))
@@ -0,0 +1,187 @@
+# GUI_VECTORS.py
+# This file hosts the multi-axis (vector) channels, such as the IMU's accelerometer, which arrive as three keys per
+# sample ("A1x:0.78,A1y:0.34,A1z:2.0") and much faster than the pressure channels. Their samples go straight into
+# preallocated (N x 3) NumPy ring buffers and skip the per-frame scalar pipeline (calibration, filters, aborts), and
+# the plots and grid tiles are redrawn from the buffers on a timer, so the IMU rate never becomes the GUI's frame rate.
+import numpy as np
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QCheckBox
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_lines
+from GUI_CLOCK import NS_PER_SECOND
+from GUI_GRAPHS import new_figure
+
+AXES = ("X", "Y", "Z")
+HISTORY_SECONDS = 10        # Length of the ring buffers, like the 10 s window of the sensor graphs
+FFT_SIZE = 1024             # Samples in each spectrum (the most recent ones)
+
+class VectorRingBuffer:
+    """A fixed size (capacity x width) ring buffer of samples, with one timestamp (ns) per sample"""
+    def __init__(self, capacity, width=3):
+        self.values = np.full((capacity, width), np.nan)
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.capacity = capacity
+        self.head = 0           # Row the next sample is written to
+        self.count = 0          # Samples written in total
+
+    def append(self, t, x, y, z):
+        row = self.head
+        self.values[row, 0] = x
+        self.values[row, 1] = y
+        self.values[row, 2] = z
+        self.times[row] = t
+        self.head = (row + 1) % self.capacity
+        self.count += 1
+
+    @property
+    def last_time(self):
+        return int(self.times[(self.head - 1) % self.capacity])
+
+    def latest(self, n=None):
+        """The last n samples (all of them by default) in time order, as (times, (n x width) values)"""
+        available = min(self.count, self.capacity)
+        n = available if n is None else min(n, available)
+        rows = (self.head - n + np.arange(n)) % self.capacity
+        return self.times[rows], self.values[rows]
+
+class VectorChannel:
+    def __init__(self, ID, name, unit, rate):
+        self.ID = ID.upper()
+        self.name = name
+        self.unit = unit
+        self.rate = rate                                    # Nominal sample rate (Hz), sizes the buffer
+        self.axis_IDs = [self.ID + axis for axis in AXES]   # Keys in the telemetry, e.g. A1X (matched case-insensitively)
+        self.buffer = VectorRingBuffer(max(int(rate * HISTORY_SECONDS), FFT_SIZE))
+        self.slots = None                                   # Index of each axis in the parser's value vector
+        self.displayed_count = 0                            # buffer.count when the tile was last refreshed
+
+    def magnitude(self):
+        """Magnitude of the latest sample"""
+        if not self.buffer.count:
+            return np.nan
+        return float(np.linalg.norm(self.buffer.values[(self.buffer.head - 1) % self.buffer.capacity]))
+
+    def sample_rate(self):
+        """Sample rate measured from the buffered timestamps, or the nominal rate before there are enough"""
+        times, _ = self.buffer.latest(FFT_SIZE)
+        if len(times) < 16:
+            return self.rate
+        dt = np.median(np.diff(times))
+        return NS_PER_SECOND / dt if dt > 0 else self.rate
+
+    def spectrum(self):
+        """Amplitude spectrum of each axis over the latest FFT_SIZE samples, as (frequencies, (bins x 3) amplitudes)"""
+        _, values = self.buffer.latest(FFT_SIZE)
+        n = len(values)
+        if n < 16:
+            return np.zeros(0), np.zeros((0, 3))
+        window = np.hanning(n)
+        values = (values - np.nanmean(values, axis=0)) * window[:, None]
+        amplitudes = 2 * np.abs(np.fft.rfft(np.nan_to_num(values), axis=0)) / window.sum()
+        return np.fft.rfftfreq(n, 1.0 / self.sample_rate()), amplitudes
+
+class VectorChannelSet:
+    def __init__(self, vectors=None):
+        self.vectors = vectors or []
+
+    @classmethod
+    def from_config(cls, config_name=DEFAULT_CONFIG):
+        """Load vectors.cfg from a configuration set (a missing file simply means no vector channels)"""
+        path = config_file("vectors.cfg", config_name)
+        vectors = []
+        for line in read_cfg_lines(path):
+            args = line.split(",")
+            try:
+                if len(args) != 4 or float(args[3]) <= 0:
+                    raise ValueError
+                vectors.append(VectorChannel(args[0], args[1], args[2], float(args[3])))
+            except ValueError:
+                raise ValueError(f"{path}: expected 'ID,name,unit,rate' with a positive rate but found '{line}'")
+        return cls(vectors)
+
+    @property
+    def axis_IDs(self):
+        return [axis for vector in self.vectors for axis in vector.axis_IDs]
+
+    def bind(self, parser):
+        """Look up the parser slot of every axis once, so storing a frame is plain indexing"""
+        for vector in self.vectors:
+            vector.slots = [parser.index[axis] for axis in vector.axis_IDs]
+
+    def store(self, values, t):
+        """Append the axes present in a parsed frame (the parser's value vector) to their ring buffers"""
+        stored = False
+        for vector in self.vectors:
+            ix, iy, iz = vector.slots
+            x = values[ix]
+            if x == x:
+                vector.buffer.append(t, x, values[iy], values[iz])
+                stored = True
+        return stored
+
+class VectorGraph(QDialog):
+    """Per-axis and magnitude plots of a vector channel, with an optional vibration spectrum"""
+    def __init__(self, vector, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"{vector.ID} - Live Graph")
+        self.resize(800, 700)
+        self.setModal(False)
+        self.vector = vector
+
+        self.figure, self.canvas = new_figure()
+        self.fft_checkbox = QCheckBox("Show vibration spectrum")
+        self.fft_checkbox.stateChanged.connect(lambda state: self.build_axes())
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.canvas)
+        layout.addWidget(self.fft_checkbox)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        self.setLayout(layout)
+        self.build_axes()
+
+    def build_axes(self):
+        self.figure.clear()
+        rows = 3 if self.fft_checkbox.isChecked() else 2
+        unit = self.vector.unit
+        self.axis_ax = self.figure.add_subplot(rows, 1, 1)
+        self.axis_lines = [self.axis_ax.plot([], [], linewidth=1, label=axis.lower())[0] for axis in AXES]
+        self.axis_ax.set_title(f"{self.vector.ID} ({unit})")
+        self.axis_ax.set_ylabel(f"Axes ({unit})")
+        self.axis_ax.legend(loc="upper left")
+        self.magnitude_ax = self.figure.add_subplot(rows, 1, 2)
+        self.magnitude_line, = self.magnitude_ax.plot([], [], 'g-', linewidth=1)
+        self.magnitude_ax.set_ylabel(f"Magnitude ({unit})")
+        self.magnitude_ax.set_xlabel("Time (seconds ago)")
+        for ax in (self.axis_ax, self.magnitude_ax):
+            ax.set_xlim(-HISTORY_SECONDS, 0)
+            ax.grid(True)
+
+        self.spectrum_ax = None
+        if self.fft_checkbox.isChecked():
+            self.spectrum_ax = self.figure.add_subplot(rows, 1, 3)
+            self.spectrum_lines = [self.spectrum_ax.semilogy([], [], linewidth=1, label=axis.lower())[0] for axis in AXES]
+            self.spectrum_ax.set_xlabel("Frequency (Hz)")
+            self.spectrum_ax.set_ylabel(f"Amplitude ({unit})")
+            self.spectrum_ax.grid(True)
+        self.figure.tight_layout()
+        self.refresh()
+
+    def refresh(self):
+        times, values = self.vector.buffer.latest()
+        if len(times):
+            relative_times = (times - times[-1]) / NS_PER_SECOND
+            for i, line in enumerate(self.axis_lines):
+                line.set_data(relative_times, values[:, i])
+            self.magnitude_line.set_data(relative_times, np.linalg.norm(values, axis=1))
+            for ax in (self.axis_ax, self.magnitude_ax):
+                ax.relim()
+                ax.autoscale_view(scalex=False)
+
+        if self.spectrum_ax is not None:
+            frequencies, amplitudes = self.vector.spectrum()
+            if len(frequencies) > 1:
+                for i, line in enumerate(self.spectrum_lines):
+                    line.set_data(frequencies[1:], amplitudes[1:, i])
+                self.spectrum_ax.set_xlim(0, frequencies[-1])
+                self.spectrum_ax.relim()
+                self.spectrum_ax.autoscale_view(scalex=False)
+        self.canvas.draw_idle()
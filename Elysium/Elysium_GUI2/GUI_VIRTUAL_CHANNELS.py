@@ -0,0 +1,165 @@
+# GUI_VIRTUAL_CHANNELS.py
+# This file compiles the user-defined formulas in virtual_channels.cfg into vectorized NumPy kernels.
+# Virtual channels are evaluated after every batch of telemetry and are then treated exactly like real sensors.
+# Once bound to a ChannelRegistry, each formula is compiled a second time to index a frame's vector of channel values.
+import ast
+import numpy as np
+from GUI_CONFIG import DEFAULT_CONFIG, config_file, read_cfg_pairs
+
+# Functions that may be called inside a formula, and the NumPy routine each one compiles to
+FUNCTIONS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "sin": np.sin,
+    "cos": np.cos,
+    "min": np.minimum,
+    "max": np.maximum,
+    "clip": np.clip,
+    "where": np.where,
+}
+
+# Only plain arithmetic, single comparisons, numbers, channel names and the functions above are accepted
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.UAdd, ast.USub,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+
+class _ChannelRewriter(ast.NodeTransformer):
+    """Rewrites channel names into lookups on the kernel's input (by name, or by index if slots is given) and
+    function names into NumPy calls"""
+    def __init__(self, slots=None):
+        self.inputs = []
+        self.slots = slots
+
+    def visit_Call(self, node):
+        node.args = [self.visit(arg) for arg in node.args]
+        node.func = ast.Subscript(value=ast.Name(id="_f", ctx=ast.Load()),
+                                  slice=ast.Constant(value=node.func.id), ctx=ast.Load())
+        return node
+
+    def visit_Name(self, node):
+        channel = node.id.upper()
+        if channel not in self.inputs:
+            self.inputs.append(channel)
+        key = channel if self.slots is None else self.slots[channel]
+        return ast.Subscript(value=ast.Name(id="_c", ctx=ast.Load()),
+                             slice=ast.Constant(value=key), ctx=ast.Load())
+
+def compile_expression(expression, slots=None):
+    """
+    Compile a formula such as "P5 - P3" into (kernel, inputs), where kernel(values) works on scalars or arrays.
+    values maps channel IDs to values, or, if slots (channel ID -> index) is given, is a vector indexed by channel.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"{expression!r}: {e.msg}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"{expression!r}: '{type(node).__name__}' is not allowed in a virtual channel")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"{expression!r}: only numeric constants are allowed")
+        if isinstance(node, ast.Compare) and len(node.ops) > 1:
+            raise ValueError(f"{expression!r}: chained comparisons are not supported")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"{expression!r}: unknown function, expected one of {', '.join(FUNCTIONS)}")
+
+    rewriter = _ChannelRewriter(slots)
+    body = rewriter.visit(tree.body)
+    lambda_tree = ast.Expression(body=ast.Lambda(
+        args=ast.arguments(posonlyargs=[], args=[ast.arg(arg="_c")], kwonlyargs=[], kw_defaults=[], defaults=[]),
+        body=body))
+    ast.fix_missing_locations(lambda_tree)
+    kernel = eval(compile(lambda_tree, "<virtual channel>", "eval"), {"__builtins__": {}, "_f": FUNCTIONS})
+    return kernel, tuple(rewriter.inputs)
+
+class VirtualChannel:
+    def __init__(self, ID, name, unit, expression):
+        self.ID = ID.upper()
+        self.name = name
+        self.unit = unit
+        self.expression = expression
+        self.kernel, self.inputs = compile_expression(expression)
+        # Set by VirtualChannelEngine.bind()
+        self.slot = None
+        self.input_slots = None
+        self.slot_kernel = None
+
+class VirtualChannelEngine:
+    def __init__(self, channels=None):
+        self.channels = channels or []
+
+    @classmethod
+    def from_config(cls, config_name=DEFAULT_CONFIG):
+        """Load virtual_channels.cfg from a configuration set (a missing file simply means no virtual channels)"""
+        path = config_file("virtual_channels.cfg", config_name)
+        channels = []
+        for args, expression in read_cfg_pairs(path):
+            if len(args) != 3:
+                raise ValueError(f"{path}: expected 'ID,name,unit' but found '{','.join(args)}'")
+            channels.append(VirtualChannel(*args, expression))
+        return cls(channels)
+
+    def evaluate(self, values, changed=None):
+        """
+        Evaluate every virtual channel, in the order listed, from a mapping of channel ID to value.
+        The values may be floats (one frame) or NumPy arrays (a batch of frames), and a channel may use any
+        virtual channel listed above it. Channels whose inputs have not been received yet are skipped.
+        If changed (the IDs received in this frame) is given, only the channels depending on them are evaluated, so a
+        channel derived from slow sensors gets a new sample when they are sampled, not with every faster frame.
+        """
+        results = {}
+        # As NumPy scalars, an overflow or the root of a negative value gives inf or NaN instead of raising (or a
+        # complex number, with Python floats)
+        scope = {name: np.float64(value) if np.ndim(value) == 0 else value for name, value in values.items()}
+        with np.errstate(all="ignore"):
+            for channel in self.channels:
+                if not all(name in scope for name in channel.inputs):
+                    continue
+                if changed is not None and not any(name in changed or name in results for name in channel.inputs):
+                    continue
+                try:
+                    result = channel.kernel(scope)
+                except (ArithmeticError, TypeError):
+                    # A formula must never take the telemetry path down with it
+                    result = np.nan
+                if np.ndim(result) == 0:
+                    result = float(result)
+                scope[channel.ID] = result
+                results[channel.ID] = result
+        return results
+
+    def bind(self, channels):
+        """Compile every formula against the indices of a ChannelRegistry, for evaluate_frame"""
+        for channel in self.channels:
+            if channel.ID in channels and all(name in channels for name in channel.inputs):
+                channel.slot = channels.index[channel.ID]
+                channel.input_slots = np.array([channels.index[name] for name in channel.inputs], dtype=int)
+                channel.slot_kernel = compile_expression(channel.expression, channels.index)[0]
+            else:
+                # Refers to a channel this set does not have (reported by ConfigSet.validate), so it is never evaluated
+                channel.slot = None
+
+    def evaluate_frame(self, values, present, received):
+        """
+        The same as evaluate, on vectors indexed by channel: values (the latest value of every channel), present (the
+        channels in this frame) and received (the channels received at least once). Each virtual channel that is
+        evaluated is written to values, and marked present and received, in place.
+        """
+        with np.errstate(all="ignore"):
+            for channel in self.channels:
+                slots = channel.input_slots
+                if channel.slot is None or not received[slots].all() or not present[slots].any():
+                    continue
+                try:
+                    result = channel.slot_kernel(values)
+                except (ArithmeticError, TypeError):
+                    result = np.nan
+                values[channel.slot] = result
+                present[channel.slot] = received[channel.slot] = True
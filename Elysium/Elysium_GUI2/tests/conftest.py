@@ -0,0 +1,4 @@
+# The GUI modules import each other by their bare names (they are run from this folder), so the tests do the same
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from GUI_CALIBRATION import Calibration
+from GUI_CHANNELS import ChannelRegistry
+
+def calibration():
+    curves = Calibration()
+    curves.add_linear("P1", 2.0, 1.0)
+    curves.add_polynomial("P2", [1.0, 0.5, 0.01])
+    curves.add_table("TC1", [100, 0], [30, 10])
+    return curves
+
+def registry(*IDs):
+    channels = ChannelRegistry()
+    for ID in IDs:
+        channels.add(ID)
+    return channels
+
+def test_curves():
+    curves = calibration()
+    curves.bind(registry("P1", "P2", "TC1", "LC1"))
+    engineering = curves.apply_frame(np.array([3.0, 10.0, 50.0, 4.0]))
+    assert engineering.tolist() == [7.0, pytest.approx(7.0), 20.0, 4.0]
+
+def test_table_replaces_polynomial():
+    curves = calibration()
+    curves.add_table("P1", [0, 1], [0, 100])
+    curves.bind(registry("P1"))
+    assert curves.apply_frame(np.array([0.5])).tolist() == [50.0] and "P1" not in curves.poly_index
+
+def test_absent_channels_stay_nan():
+    curves = calibration()
+    curves.bind(registry("LC1", "TC1", "P2", "P1"))
+    raw = np.array([4.0, np.nan, np.nan, 3.0])
+    engineering = curves.apply_frame(raw)
+    assert engineering[[0, 3]].tolist() == [4.0, 7.0] and np.isnan(engineering[1:3]).all()
+    assert np.isnan(raw[1]) and raw[3] == 3.0
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from GUI_CALIBRATION_FIT import fit_polynomial, format_calibration, read_session, write_calibration
+
+def test_wide_session(tmp_path):
+    session = tmp_path / "session.csv"
+    session.write_text("reference,P1,P2\n0,1.0,\n10,2.0,5.0\n")
+    points = read_session(session)
+    assert points["P1"][0].tolist() == [1.0, 2.0] and points["P1"][1].tolist() == [0.0, 10.0]
+    assert points["P2"][0].tolist() == [5.0]
+
+def test_long_session(tmp_path):
+    session = tmp_path / "session.csv"
+    session.write_text("reference,channel,raw\n0,p1,1.0\n10,P1,2.0\n,P1,3.0\n")
+    assert read_session(session)["P1"][0].tolist() == [1.0, 2.0]
+
+def test_session_needs_a_reference(tmp_path):
+    session = tmp_path / "session.csv"
+    session.write_text("P1,P2\n1,2\n")
+    with pytest.raises(ValueError):
+        read_session(session)
+
+def test_fit():
+    raw = np.array([0.0, 1.0, 2.0, 3.0])
+    coeffs, residuals = fit_polynomial(raw, 5 + 2 * raw, 1)
+    assert np.allclose(coeffs, [5, 2]) and np.allclose(residuals, 0)
+    assert format_calibration("P1", coeffs).startswith("P1,linear,2,5")
+    with pytest.raises(ValueError):
+        fit_polynomial(np.array([1.0, 1.0]), np.array([0.0, 1.0]), 1)
+
+def test_write_keeps_other_channels(tmp_path):
+    path = tmp_path / "calibration.cfg"
+    path.write_text("P1,linear,1,0\nP2,linear,3,4\n")
+    write_calibration(path, {"P1": "P1,linear,2,5"})
+    assert path.read_text().splitlines() == ["P2,linear,3,4", "P1,linear,2,5"]
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from GUI_CHANNELS import ChannelRegistry, ChannelValues
+
+def test_indices_follow_registration_order():
+    registry = ChannelRegistry()
+    assert [registry.add(ID).index for ID in ("P1", "tc1", "LC1")] == [0, 1, 2]
+    assert registry.add("p1").index == 0 and len(registry) == 3
+    assert registry.IDs == ["P1", "TC1", "LC1"] and "tc1" in registry and registry.get("X") is None
+
+def test_default_configuration():
+    registry = ChannelRegistry.from_config()
+    assert len(registry) and [channel.index for channel in registry] == list(range(len(registry)))
+
+def test_values_by_name():
+    registry = ChannelRegistry()
+    for ID in ("P1", "P2", "P3"):
+        registry.add(ID)
+    values, received = np.array([1.0, np.nan, 3.0]), np.array([True, False, True])
+    view = ChannelValues(registry, values, received)
+    assert dict(view) == {"P1": 1.0, "P3": 3.0} and len(view) == 2
+    assert view.get("P2", 0) == 0 and view["p3"] == 3.0
+    with pytest.raises(KeyError):
+        view["X"]
+    # A view follows the arrays it was made from
+    values[1], received[1] = 2.0, True
+    assert view["P2"] == 2.0
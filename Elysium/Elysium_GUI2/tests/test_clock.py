@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from GUI_CLOCK import MICROS_WRAP, NS_PER_SECOND, ClockSync
+
+OFFSET = 100.0                  # Host time (s) when the Teensy clock read zero
+RTT_NS = 1_000_000
+
+def host_ns(teensy, offset=OFFSET, drift=0.0):
+    """Host time (ns) of a Teensy time (s), for a Teensy clock with this offset and drift"""
+    return round((teensy + offset + drift * teensy) * NS_PER_SECOND)
+
+def sync(clock, micros, host):
+    """A SYNC reply sampled at this host time (ns), answered over a symmetric 1 ms round trip"""
+    clock.add_round_trip(host - RTT_NS // 2, micros, host + RTT_NS // 2)
+
+def test_before_any_measurement_uses_the_arrival_time():
+    assert ClockSync().to_host(5_000_000, received_ns=123) == 123
+
+def test_round_trips_fit_the_drift():
+    clock = ClockSync()
+    drift = -50e-6              # The Teensy runs 50 ppm fast
+    for second in range(30):
+        sync(clock, second * 1_000_000, host_ns(second, drift=drift))
+    assert clock.source == "round trip"
+    assert clock.drift == pytest.approx(drift, abs=1e-7)
+    assert abs(clock.to_host(31_500_000) - host_ns(31.5, drift=drift)) < 10_000
+
+def test_counter_wrap():
+    clock = ClockSync()
+    start = MICROS_WRAP / 1e6 - 5           # Teensy time (s) 5 s before micros() wraps
+    for second in range(10):
+        teensy = start + second
+        sync(clock, round(teensy * 1e6) % MICROS_WRAP, host_ns(teensy))
+    after = start + 10.25
+    assert after * 1e6 > MICROS_WRAP
+    assert abs(clock.to_host(round(after * 1e6) % MICROS_WRAP) - host_ns(after)) < 10_000
+
+def test_mcu_restart_forgets_the_old_clock():
+    clock = ClockSync()
+    for second in range(100, 110):
+        sync(clock, second * 1_000_000, host_ns(second))
+    before = clock.to_host(110_000_000)
+    # The MCU restarts 20 s later, so its clock starts over from zero
+    restart = OFFSET + 130.0
+    sync(clock, 0, host_ns(0, offset=restart))
+    sync(clock, 1_000_000, host_ns(1, offset=restart))
+    mapped = clock.to_host(1_500_000)
+    assert mapped > before
+    assert abs(mapped - host_ns(1.5, offset=restart)) < 10_000
+
+def test_telemetry_only_fallback():
+    clock = ClockSync()
+    latency = 0.002             # Smallest delay from sampling to arrival
+    jitter = np.random.default_rng(0).uniform(0, 0.005, 500)
+    for frame in range(500):
+        teensy = frame / 100
+        clock.observe_frame(frame * 10_000, host_ns(teensy + latency + jitter[frame]))
+    assert clock.source == "telemetry"
+    # The fixed minimum latency is left in the mapping, and the rest is well within the jitter
+    assert abs(clock.to_host(5_000_000) - host_ns(5 + latency)) < 1_000_000
+
+def test_round_trips_take_over_from_telemetry():
+    clock = ClockSync()
+    for frame in range(300):
+        clock.observe_frame(frame * 10_000, host_ns(frame / 100 + 0.01))
+    sync(clock, 3_000_000, host_ns(3))
+    sync(clock, 4_000_000, host_ns(4))
+    assert clock.source == "round trip"
+    assert abs(clock.to_host(4_500_000) - host_ns(4.5)) < 10_000
+
+def test_mapped_times_never_go_backwards():
+    clock = ClockSync()
+    sync(clock, 1_000_000, host_ns(1))
+    first = clock.to_host(2_000_000)
+    # A later fit places the Teensy clock 50 ms earlier than the first one did
+    sync(clock, 3_000_000, host_ns(3, offset=OFFSET - 0.05))
+    sync(clock, 4_000_000, host_ns(4, offset=OFFSET - 0.05))
+    assert clock.to_host(2_010_000) >= first
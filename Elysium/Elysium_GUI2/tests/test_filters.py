@@ -0,0 +1,75 @@
+import math
+import numpy as np
+import pytest
+from GUI_CHANNELS import ChannelRegistry
+from GUI_FILTERS import EMAFilter, FilterBank, LowPassFilter, MedianFilter, MovingAverageFilter
+
+def bank(*stages):
+    filters = FilterBank()
+    for stage in stages:
+        filters.add("P8", stage)
+    return filters
+
+def test_batch_matches_one_at_a_time():
+    x = np.sin(np.arange(200) / 5) + np.random.default_rng(0).normal(0, 0.1, 200)
+    for make in (lambda: MovingAverageFilter(5), lambda: EMAFilter(0.2), lambda: MedianFilter(5),
+                 lambda: LowPassFilter(10, 100)):
+        single, batch = bank(make()), bank(make())
+        one_at_a_time = [single.process("P8", value) for value in x]
+        assert np.allclose(one_at_a_time, batch.process("P8", x))
+
+def test_frame_filters_present_channels_only():
+    filters = bank(MovingAverageFilter(2))
+    registry = ChannelRegistry()
+    for ID in ("P7", "P8"):
+        registry.add(ID)
+    filters.bind(registry)
+    filters.apply_frame(np.array([1.0, 10.0]), np.array([True, True]))
+    filtered = filters.apply_frame(np.array([2.0, 20.0]), np.array([True, True]))
+    assert filtered.tolist() == [2.0, 15.0]
+    assert filters.apply_frame(np.array([3.0, 30.0]), np.array([True, False])).tolist() == [3.0, 30.0]
+
+def test_lowpass_matches_scipy_butter():
+    signal = pytest.importorskip("scipy.signal")
+    b, a = signal.butter(2, 10, fs=100)
+    lowpass = LowPassFilter(10, 100)
+    assert np.allclose(lowpass.b, b) and np.allclose(lowpass.a, a)
+
+def test_single_samples_match_lfilter():
+    signal = pytest.importorskip("scipy.signal")
+    x = np.random.default_rng(1).normal(3, 1, 300)
+    for stage in (LowPassFilter(10, 100), EMAFilter(0.3), MovingAverageFilter(5)):
+        expected, _ = signal.lfilter(stage.b, stage.a, x, zi=signal.lfilter_zi(stage.b, stage.a) * x[0])
+        assert np.allclose([stage.process(value) for value in x], expected, rtol=0, atol=1e-12)
+
+def test_starts_from_the_first_value():
+    assert bank(LowPassFilter(10, 100)).process("P8", 50.0) == pytest.approx(50.0)
+
+@pytest.mark.parametrize("make", [lambda: MovingAverageFilter(5), lambda: EMAFilter(0.2), lambda: MedianFilter(5),
+                                  lambda: LowPassFilter(10, 100)])
+@pytest.mark.parametrize("bad", [math.inf, -math.inf, math.nan])
+def test_non_finite_sample_passes_through(make, bad):
+    filters = bank(make())
+    for _ in range(20):
+        filters.process("P8", 10.0)
+    out = filters.process("P8", bad)
+    assert out == bad or (math.isnan(bad) and math.isnan(out))
+    # The state is untouched, so the next good samples come out as if the bad one never arrived
+    assert all(filters.process("P8", 10.0) == pytest.approx(10.0) for _ in range(20))
+
+def test_non_finite_samples_in_a_batch():
+    filters = bank(EMAFilter(0.5))
+    y = filters.process("P8", np.array([10.0, np.nan, 10.0, np.inf, 10.0]))
+    assert np.isnan(y[1]) and y[3] == np.inf
+    assert np.allclose(y[[0, 2, 4]], 10.0)
+
+def test_unfiltered_channels_pass_through():
+    assert FilterBank().apply({"P1": 3.0}) == {"P1": 3.0}
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        LowPassFilter(60, 100)
+    with pytest.raises(ValueError):
+        EMAFilter(0)
+    with pytest.raises(ValueError):
+        MedianFilter(0)
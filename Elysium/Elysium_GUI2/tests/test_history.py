@@ -0,0 +1,68 @@
+import numpy as np
+from GUI_CLOCK import NS_PER_SECOND
+from GUI_HISTORY import ChannelHistory
+
+MS = 1_000_000
+
+def filled(count, capacity, samples):
+    """A history whose channels each received samples (index -> [(t, value), ...])"""
+    history = ChannelHistory(count, capacity)
+    for index, channel_samples in samples.items():
+        for t, value in channel_samples:
+            history.append(index, t, value)
+    return history
+
+def test_last_before_and_after_the_first_sample():
+    history = filled(2, 8, {0: [(1 * MS, 1.0), (2 * MS, 2.0)]})
+    assert history.last(0) == (2 * MS, 2.0)
+    assert history.last(1) is None
+
+def test_latest_is_in_time_order_after_wrapping():
+    history = filled(1, 4, {0: [(t * MS, float(t)) for t in range(6)]})
+    times, values = history.latest(0)
+    assert times.tolist() == [2 * MS, 3 * MS, 4 * MS, 5 * MS]
+    assert values.tolist() == [2.0, 3.0, 4.0, 5.0]
+
+def test_latest_seconds():
+    history = filled(1, 64, {0: [(t * 100 * MS, float(t)) for t in range(20)]})
+    times, _ = history.latest(0, seconds=0.5)
+    assert times[0] == 14 * 100 * MS and times[-1] == 19 * 100 * MS
+
+def test_sample_rate():
+    history = filled(1, 64, {0: [(t * 10 * MS, 0.0) for t in range(50)]})
+    assert history.sample_rate(0) == 100.0
+    assert ChannelHistory(1, 8).sample_rate(0) == 0.0
+
+def test_resize_keeps_the_existing_channels():
+    history = filled(1, 8, {0: [(1 * MS, 5.0)]})
+    history.resize(3)
+    assert len(history) == 3
+    assert history.last(0) == (1 * MS, 5.0) and history.last(2) is None
+    history.append(2, 2 * MS, 7.0)
+    assert history.last(2) == (2 * MS, 7.0)
+
+def test_copy_channel():
+    old = filled(2, 8, {1: [(1 * MS, 1.0), (2 * MS, 2.0)]})
+    new = ChannelHistory(1, 8)
+    new.copy_channel(0, old, 1)
+    assert new.latest(0)[1].tolist() == [1.0, 2.0]
+    new.append(0, 3 * MS, 3.0)
+    assert old.last(1) == (2 * MS, 2.0)
+
+def test_resample_is_nan_outside_the_samples():
+    history = filled(1, 8, {0: [(10 * MS, 0.0), (20 * MS, 10.0)]})
+    values = history.resample([0], [5 * MS, 15 * MS, 25 * MS])[:, 0]
+    assert np.isnan(values[0]) and values[1] == 5.0 and np.isnan(values[2])
+
+def test_aligned_ends_at_the_slowest_channel():
+    # A fast channel at 1 kHz and a slow one at 10 Hz, both ramps of one unit per second
+    history = filled(2, 4096, {0: [(t * MS, t / 1000) for t in range(2001)],
+                               1: [(t * 100 * MS, t / 10) for t in range(15)]})
+    times, values = history.aligned([0, 1], rate=100, seconds=1)
+    assert times[-1] == 1400 * MS and len(times) == 101
+    assert np.diff(times).tolist() == [NS_PER_SECOND // 100] * 100
+    assert np.allclose(values[:, 0], values[:, 1])
+
+def test_aligned_without_samples():
+    times, values = ChannelHistory(2, 8).aligned([0, 1], rate=100)
+    assert len(times) == 0 and values.shape == (0, 2)
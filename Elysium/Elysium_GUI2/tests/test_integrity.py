@@ -0,0 +1,84 @@
+import numpy as np
+from GUI_INTEGRITY import StreamIntegrityMonitor, StalenessTracker, STALE_TIMEOUT_NS
+
+INTERVAL_US = 1000          # 1 kHz
+
+def feed(monitor, teensy_times, channels=1):
+    """Observe one frame per Teensy time (us) with every channel present, synchronized time = Teensy time"""
+    gaps = []
+    for teensy_time in teensy_times:
+        gaps += monitor.observe(np.ones(channels), teensy_time, teensy_time * 1000)
+    return gaps
+
+def steady(start, count):
+    return [start + i * INTERVAL_US for i in range(count)]
+
+def test_steady_stream_is_clean():
+    monitor = StreamIntegrityMonitor(2)
+    feed(monitor, steady(0, 100), channels=2)
+    assert monitor.totals() == {"samples": 200, "gaps": 0, "missed": 0, "duplicates": 0, "reordered": 0}
+
+def test_gap_counts_missed_samples():
+    monitor = StreamIntegrityMonitor(1)
+    gaps = feed(monitor, steady(0, 10) + steady(15 * INTERVAL_US, 10))
+    assert monitor.totals()["gaps"] == 1 and monitor.totals()["missed"] == 5
+    assert gaps == [(0, 9 * INTERVAL_US * 1000, 15 * INTERVAL_US * 1000, 5)]
+
+def test_duplicates_and_reordering():
+    monitor = StreamIntegrityMonitor(1)
+    feed(monitor, steady(0, 10) + [9 * INTERVAL_US, 5 * INTERVAL_US] + steady(10 * INTERVAL_US, 5))
+    totals = monitor.totals()
+    assert totals["duplicates"] == 1 and totals["reordered"] == 1 and totals["gaps"] == 0
+
+def test_new_rate_is_relearnt():
+    monitor = StreamIntegrityMonitor(1)
+    feed(monitor, steady(0, 20) + [19 * INTERVAL_US + i * 4 * INTERVAL_US for i in range(1, 50)])
+    # The first two slow intervals are gaps, then the channel's interval is relearnt
+    assert monitor.totals()["gaps"] == 2
+    assert abs(monitor.interval[0] - 4 * INTERVAL_US) < INTERVAL_US / 2
+
+def test_outage_after_short_drops_is_a_gap():
+    monitor = StreamIntegrityMonitor(1)
+    times = steady(0, 20)
+    # One sample dropped, another one right after, then a 3 s outage: three gaps in a row, but not a new rate
+    times += [times[-1] + 2 * INTERVAL_US, times[-1] + 4 * INTERVAL_US, times[-1] + 4 * INTERVAL_US + 3_000_000]
+    times += steady(times[-1] + INTERVAL_US, 20)
+    feed(monitor, times)
+    assert monitor.totals()["gaps"] == 3
+    assert monitor.totals()["missed"] == 1 + 1 + 2999
+    assert monitor.interval[0] == INTERVAL_US
+
+def test_mcu_restart_is_not_reordering():
+    monitor = StreamIntegrityMonitor(1)
+    feed(monitor, steady(10_000_000, 10) + steady(0, 10))
+    assert monitor.totals()["reordered"] == 0 and monitor.totals()["gaps"] == 0
+
+def test_missing_channels_are_not_observed():
+    monitor = StreamIntegrityMonitor(2)
+    for t in steady(0, 10):
+        monitor.observe(np.array([1.0, np.nan]), t, t * 1000)
+    assert list(monitor.samples) == [10, 0]
+
+def test_gaps_for():
+    monitor = StreamIntegrityMonitor(1)
+    feed(monitor, steady(0, 10) + steady(15 * INTERVAL_US, 10))
+    assert monitor.gaps_for(0, 0) == [(9 * INTERVAL_US * 1000, 15 * INTERVAL_US * 1000)]
+    assert monitor.gaps_for(0, 15 * INTERVAL_US * 1000) == []
+
+def test_staleness():
+    tracker = StalenessTracker(2)
+    ms = 1_000_000
+    for i in range(1, 11):
+        tracker.update([0, 1], i * ms)
+    tracker.update([0], 11 * ms)
+    went_stale, recovered = tracker.check(11 * ms + STALE_TIMEOUT_NS // 2)
+    assert list(went_stale) == [] and list(recovered) == []
+    went_stale, recovered = tracker.check(10 * ms + STALE_TIMEOUT_NS + ms)
+    assert list(went_stale) == [1]
+    tracker.update([1], 12 * ms + STALE_TIMEOUT_NS)
+    went_stale, recovered = tracker.check(12 * ms + STALE_TIMEOUT_NS)
+    assert list(recovered) == [1] and not tracker.flagged[1]
+
+def test_never_updated_channels_are_not_stale():
+    tracker = StalenessTracker(1)
+    assert not len(tracker.check(10 * STALE_TIMEOUT_NS)[0])
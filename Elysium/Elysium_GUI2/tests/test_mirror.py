@@ -0,0 +1,31 @@
+import socket, time
+import numpy as np
+from GUI_CHANNELS import ChannelRegistry
+from GUI_MIRROR import TelemetryMirror
+
+def wait_for(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+    return condition()
+
+def test_subscriber_stream():
+    registry = ChannelRegistry()
+    registry.add("P1", unit="psi")
+    registry.add("P2", unit="psi")
+    events = []
+    mirror = TelemetryMirror(port=0, host="127.0.0.1")
+    mirror.log_event_callback = lambda event_type, details: events.append(event_type)
+    mirror.set_channels(registry)
+    mirror.start()
+    try:
+        with socket.create_connection(mirror.server.getsockname()) as sock:
+            assert wait_for(lambda: mirror.subscribers)
+            mirror.publish_frame(5, np.array([1]), np.array([1.0, 2.5]))
+            mirror.publish_event("VALVE_CMD", "NCS1, open", t=6)
+            lines = sock.makefile(encoding="utf-8")
+            assert [lines.readline() for _ in range(3)] == ["CHANNELS,P1:psi,P2:psi\n", "DATA,5,P2:2.5\n",
+                                                            "EVENT,6,VALVE_CMD,NCS1; open\n"]
+        assert events == ["MIRROR:SUBSCRIBED"]
+    finally:
+        mirror.stop()
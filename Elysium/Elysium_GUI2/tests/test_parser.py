@@ -0,0 +1,47 @@
+import math
+from GUI_PARSER import TelemetryParser
+
+def parse(parser, line):
+    values = list(parser.parse(line))
+    return values, parser.timestamp
+
+def test_comma_frame():
+    parser = TelemetryParser(["P1", "P2"])
+    values, timestamp = parse(parser, "t:1500,P1:1.5,P2:-2e3")
+    assert values[:2] == [1.5, -2000.0] and timestamp == 1500
+
+def test_whitespace_frame_with_a_bare_timestamp():
+    parser = TelemetryParser(["P1", "P2"])
+    values, timestamp = parse(parser, "123 P1:1.0 P2:2.0")
+    assert values[:2] == [1.0, 2.0] and timestamp == 123
+
+def test_absent_channels_are_nan():
+    parser = TelemetryParser(["P1", "P2"])
+    values, timestamp = parse(parser, "P2:2.0")
+    assert math.isnan(values[0]) and values[1] == 2.0 and timestamp is None
+    assert parser.readings() == {"P2": 2.0}
+
+def test_keys_are_case_insensitive():
+    parser = TelemetryParser(["P1"])
+    assert parser.parse("p1:4.0")[0] == 4.0
+
+def test_malformed_pairs_are_dropped_alone():
+    parser = TelemetryParser(["P1", "P2", "P3"])
+    values, timestamp = parse(parser, "t:10,P1:1.0,P2:1.2.3,P3:3.0")
+    assert values[0] == 1.0 and math.isnan(values[1]) and values[2] == 3.0 and timestamp == 10
+
+def test_unknown_keys_are_learned_after_the_known_channels():
+    parser = TelemetryParser(["P1"])
+    values, timestamp = parse(parser, "t:5,X9:9.0,P1:1.0")
+    assert parser.channels == ["P1", "X9"] and values[:2] == [1.0, 9.0] and timestamp == 5
+    assert parser.readings() == {"P1": 1.0, "X9": 9.0}
+
+def test_unknown_keys_can_be_ignored():
+    parser = TelemetryParser(["P1"], learn_unknown=False)
+    values, _ = parse(parser, "X9:9.0,P1:1.0")
+    assert parser.channels == ["P1"] and values[0] == 1.0 and parser.unknown_keys == {"X9"}
+
+def test_non_readings_are_skipped():
+    parser = TelemetryParser(["P1"])
+    values, _ = parse(parser, "P1:1.0,Aborted,VALVE:NCS1:OPEN")
+    assert parser.channels == ["P1"] and values[0] == 1.0
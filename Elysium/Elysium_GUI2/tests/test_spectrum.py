@@ -0,0 +1,50 @@
+import numpy as np
+from PyQt5.QtCore import Qt
+from GUI_CLOCK import NS_PER_SECOND
+from GUI_SPECTRUM import SpectralChannel, SpectralMonitor, PEAK_PERSISTENCE
+
+RATE = 1000.0
+
+def window(samples):
+    times = (np.arange(len(samples)) * NS_PER_SECOND / RATE).astype(np.int64)
+    return times, np.asarray(samples, dtype=float)
+
+def sine(frequency, amplitude, n=256):
+    return amplitude * np.sin(2 * np.pi * frequency * np.arange(n) / RATE)
+
+def test_peak_in_band():
+    channel = SpectralChannel("P8", 256, RATE, 50, 300, threshold=1.0)
+    frequency, amplitude = channel.analyze(*window(sine(125, 5)))
+    assert abs(frequency - 125) < RATE / 256
+    assert 3 < amplitude <= 5
+
+def test_non_finite_window_is_skipped():
+    channel = SpectralChannel("P8", 256, RATE, 50, 300, threshold=1.0)
+    samples = sine(125, 5)
+    samples[10] = np.inf
+    assert channel.analyze(*window(samples)) is None
+    assert channel.rows == 0
+
+def run_windows(monitor, channel, windows):
+    """Feed windows to the monitor's worker thread and wait until it has gone through all of them"""
+    peaks = []
+    # Delivered on the worker thread, as there is no event loop in the tests
+    monitor.signals.peak_detected.connect(lambda *peak: peaks.append(peak), Qt.DirectConnection)
+    monitor.start()
+    for samples in windows:
+        monitor.pending.put((channel, window(samples)))
+    monitor.pending.put(None)
+    monitor.worker.join(5)
+    return peaks
+
+def test_non_finite_samples_never_report_a_peak():
+    channel = SpectralChannel("P8", 256, RATE, 50, 300, threshold=1.0)
+    samples = np.full(256, 20.0)
+    samples[0] = np.inf
+    peaks = run_windows(SpectralMonitor([channel]), channel, [samples] * (2 * PEAK_PERSISTENCE))
+    assert peaks == [] and channel.over_threshold == 0
+
+def test_persistent_peak_is_reported_once():
+    channel = SpectralChannel("P8", 256, RATE, 50, 300, threshold=1.0)
+    peaks = run_windows(SpectralMonitor([channel]), channel, [sine(125, 5)] * (PEAK_PERSISTENCE + 2))
+    assert len(peaks) == 1 and peaks[0][0] == "P8"
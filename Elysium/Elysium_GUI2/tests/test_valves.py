@@ -0,0 +1,22 @@
+from GUI_VALVES import ControlState, Valve, ValveSet, load_control_states
+
+def valves():
+    return ValveSet([Valve(bit, "Valve", ID, ID, ["0"]) for bit, ID in enumerate(("NCS1", "NCS2", "NCS3"))])
+
+def test_mask():
+    assert valves().mask({"NCS1": True, "NCS2": False, "NCS3": True, "X": True}) == 0b101
+
+def test_changes_are_the_differing_valves():
+    assert valves().changes(0b011, 0b110) == [("NCS1", False), ("NCS3", True)]
+    assert valves().changes(0b101, 0b101) == []
+
+def test_state_only_moves_the_valves_it_lists():
+    state = ControlState(["Purge"], [None], open_mask=0b001, care_mask=0b011)
+    assert state.target(0b110) == 0b101
+
+def test_default_configuration():
+    valve_set = ValveSet.from_config()
+    states = load_control_states(valve_set)
+    assert valve_set.IDs and states
+    for state in states.values():
+        assert state.open_mask & ~state.care_mask == 0 and state.care_mask & ~valve_set.all_mask == 0
@@ -0,0 +1,64 @@
+import math
+import numpy as np
+import pytest
+from GUI_CHANNELS import ChannelRegistry
+from GUI_VIRTUAL_CHANNELS import VirtualChannel, VirtualChannelEngine, compile_expression
+
+def engine(*expressions):
+    return VirtualChannelEngine([VirtualChannel(f"V{i}", "", "", e) for i, e in enumerate(expressions)])
+
+def test_difference():
+    assert engine("P5 - P3").evaluate({"P5": 30.0, "P3": 10.0}) == {"V0": 20.0}
+
+def test_chained_channels():
+    assert engine("P1 * 2", "V0 + 1").evaluate({"P1": 3.0}) == {"V0": 6.0, "V1": 7.0}
+
+def test_missing_inputs_are_skipped():
+    assert engine("P1 + P2").evaluate({"P1": 1.0}) == {}
+
+def test_only_changed_channels():
+    channels = engine("P1 + 1", "P2 + 1")
+    assert channels.evaluate({"P1": 1.0, "P2": 2.0}, changed={"P2"}) == {"V1": 3.0}
+
+def test_overflow_is_inf():
+    assert engine("10 ** P1").evaluate({"P1": 400.0})["V0"] == math.inf
+
+def test_root_of_negative_is_nan():
+    result = engine("P1 ** 0.5").evaluate({"P1": -4.0})["V0"]
+    assert isinstance(result, float) and math.isnan(result)
+
+def test_division_by_zero_is_not_an_error():
+    assert engine("P1 / P2").evaluate({"P1": 1.0, "P2": 0.0})["V0"] == math.inf
+    assert math.isnan(engine("P1 % P2").evaluate({"P1": 1.0, "P2": 0.0})["V0"])
+
+def test_arrays():
+    result = engine("sqrt(P1)").evaluate({"P1": np.array([4.0, -1.0])})["V0"]
+    assert result[0] == 2.0 and math.isnan(result[1])
+
+def test_frame_by_index():
+    channels = engine("P5 - P3", "V0 * 2")
+    registry = ChannelRegistry()
+    for ID in ("P3", "P5", "V0", "V1"):
+        registry.add(ID)
+    channels.bind(registry)
+    values = np.array([10.0, 30.0, np.nan, np.nan])
+    present = np.array([True, True, False, False])
+    received = present.copy()
+    channels.evaluate_frame(values, present, received)
+    assert values.tolist() == [10.0, 30.0, 20.0, 40.0] and present.all() and received.all()
+
+def test_frame_skips_inputs_never_received():
+    channels = engine("P1 + P2")
+    registry = ChannelRegistry()
+    for ID in ("P1", "P2", "V0"):
+        registry.add(ID)
+    channels.bind(registry)
+    values = np.array([1.0, np.nan, np.nan])
+    present = np.array([True, False, False])
+    channels.evaluate_frame(values, present, present.copy())
+    assert math.isnan(values[2]) and not present[2]
+
+@pytest.mark.parametrize("expression", ["__import__('os')", "P1.real", "P1 if P2 else P3", "a < b < c", "open(P1)"])
+def test_rejected_expressions(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression)
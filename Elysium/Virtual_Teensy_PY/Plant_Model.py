@@ -0,0 +1,131 @@
+# Plant_Model.py
+# A lumped model of the Elysium feed system for the Python Virtual Teensy, so that the GUI sees pressures that respond
+# to its valve commands instead of random noise. It is meant to exercise the abort logic and the GUI end to end,
+# not to predict performance, and every constant below is a round number chosen to give the right behavior.
+#
+# All pressures are gauge (psig). The tanks and bottles are nodes of a flow network: each valve is an edge whose flow
+# goes as sqrt(dP), and all edges are integrated at once with NumPy at a fixed step. The line and chamber pressures
+# then follow the tank pressures with first-order lags, which sets their response time to valve changes.
+import threading
+import numpy as np
+
+STEP = 0.001                # Fixed integration step (s)
+
+# Nodes of the flow network. Ambient and the two supplies are held at a fixed pressure
+AMBIENT, GN2_BOTTLE, OX_TANK, FUEL_TANK, N2O_SUPPLY, FUEL_SUPPLY = range(6)
+INITIAL_PRESSURE = np.array([0.0, 2000.0, 0.0, 0.0, 750.0, 60.0])
+# Pressure change per unit of flow in or out of each node (0 for the fixed nodes). The bottle is large
+CAPACITY = np.array([0.0, 0.05, 1.0, 1.0, 0.0, 0.0])
+
+# Valve edges: name -> (from node, to node, conductance). LA-BV1 pressurizes the fuel tank through a regulator
+VALVES = {
+    "NCS1": (GN2_BOTTLE, OX_TANK, 40.0),        # Pressurant into the oxidizer tank
+    "NCS2": (N2O_SUPPLY, OX_TANK, 15.0),        # Oxidizer fill
+    "NCS3": (OX_TANK, AMBIENT, 60.0),           # Oxidizer tank vent
+    "NCS5": (FUEL_SUPPLY, FUEL_TANK, 10.0),     # Fuel fill
+    "NCS6": (FUEL_TANK, AMBIENT, 20.0),         # Fuel tank vent
+    "LA-BV1": (GN2_BOTTLE, FUEL_TANK, 30.0),    # Pressurant into the fuel tank
+    "GV-1": (OX_TANK, AMBIENT, 8.0),            # Oxidizer main valve, draining the tank through the injector
+    "GV-2": (FUEL_TANK, AMBIENT, 6.0),          # Fuel main valve, draining the tank through the injector
+}
+VALVE_NAMES = list(VALVES)
+EDGE_FROM = np.array([edge[0] for edge in VALVES.values()])
+EDGE_TO = np.array([edge[1] for edge in VALVES.values()])
+EDGE_CONDUCTANCE = np.array([edge[2] for edge in VALVES.values()])
+REGULATOR_SETPOINT = 600.0          # Maximum pressure LA-BV1 can deliver to the fuel tank
+LA_BV1 = VALVE_NAMES.index("LA-BV1")
+
+# Lagged pressures: P3 (oxidizer tank outlet), P5 (downstream of GV-1), P6 (downstream of GV-2),
+# P7 (injector line) and P8 (chamber), with their time constants (s)
+LINE_TAU = np.array([0.010, 0.015, 0.015, 0.015, 0.030])
+LINE_HEAD = 2.0                     # Static head of propellant in the injector line while it is closed (psi)
+INJECTOR_FRACTION = 0.6             # Fraction of the tank-to-chamber drop left downstream of a main valve
+CHAMBER_FRACTION = 0.55             # Chamber to line pressure ratio while both propellants flow
+COLD_FLOW_FRACTION = 0.1            # Chamber to line pressure ratio while only one propellant flows
+THRUST_PER_PSI = 1.4                # Thrust coefficient times throat area (lbf/psi)
+LOAD_CELL_SHARE = np.array([0.5, 0.25, 0.25])
+
+class PlantModel:
+    """Drop-in replacement for NoiseSource in Virtual_Teensy.py"""
+    def __init__(self, channels, noise=0.2, fault=None, seed=None):
+        self.channels = channels
+        self.noise = noise
+        self.fault = fault              # "stuck_vent" keeps NCS3 closed regardless of commands
+        self.rng = np.random.default_rng(seed)
+        # Valve commands arrive on the Virtual Teensy's receive thread while its send thread steps the model
+        self.lock = threading.Lock()
+
+        self.time = 0.0
+        self.nodes = INITIAL_PRESSURE.copy()
+        self.valves = np.zeros(len(VALVE_NAMES))
+        self.lines = np.array([0.0, 0.0, 0.0, LINE_HEAD, 0.0])
+        self.temperatures = np.full(3, 20.0)        # TC1 chamber wall, TC2 oxidizer line, TC3 ambient (degC)
+        self.masses = np.zeros(2)                   # B1 oxidizer and B2 fuel loaded (lb)
+
+        # Column of each output in the order of the generated channels, and the outputs they read
+        outputs = ["P1", "P2", "P3", "P4", "P5", "P6", "P7", "P8", "TC1", "TC2", "TC3", "LC1", "LC2", "LC3", "B1", "B2"]
+        self.modeled = [i for i, name in enumerate(channels) if name in outputs]
+        self.output_index = [outputs.index(channels[i]) for i in self.modeled]
+
+    def set_valve(self, name, state):
+        if name not in VALVES or (self.fault == "stuck_vent" and name == "NCS3"):
+            return
+        with self.lock:
+            self.valves[VALVE_NAMES.index(name)] = 1.0 if state else 0.0
+
+    def restart_clock(self):
+        """A new connection starts its sample times over from 0. The plant itself carries on from where it was"""
+        with self.lock:
+            self.time = 0.0
+
+    def step(self):
+        p = self.nodes
+        # Flow through every valve at once. The regulator limits the pressure LA-BV1 can deliver
+        upstream = p[EDGE_FROM].copy()
+        upstream[LA_BV1] = min(upstream[LA_BV1], REGULATOR_SETPOINT)
+        dp = upstream - p[EDGE_TO]
+        flow = self.valves * EDGE_CONDUCTANCE * np.sign(dp) * np.sqrt(np.abs(dp))
+        # Do not let a step overshoot equilibrium across a valve
+        limit = np.abs(dp) / (STEP * (CAPACITY[EDGE_FROM] + CAPACITY[EDGE_TO]) + 1e-12)
+        flow = np.clip(flow, -limit, limit)
+
+        change = np.zeros_like(p)
+        np.add.at(change, EDGE_TO, flow * CAPACITY[EDGE_TO])
+        np.subtract.at(change, EDGE_FROM, flow * CAPACITY[EDGE_FROM])
+        self.nodes = np.maximum(p + change * STEP, 0.0)
+
+        # Targets for the lagged line and chamber pressures, given which main valves are open
+        ox_open, fuel_open = self.valves[VALVE_NAMES.index("GV-1")], self.valves[VALVE_NAMES.index("GV-2")]
+        p_tank_ox, p_tank_fuel, p_chamber = self.nodes[OX_TANK], self.nodes[FUEL_TANK], self.lines[4]
+        p3 = p_tank_ox - 0.05 * ox_open * max(p_tank_ox - p_chamber, 0.0)
+        p5 = ox_open * (p_chamber + INJECTOR_FRACTION * max(p3 - p_chamber, 0.0))
+        p6 = fuel_open * (p_chamber + INJECTOR_FRACTION * max(p_tank_fuel - p_chamber, 0.0))
+        p7 = max(p5, p6, LINE_HEAD)
+        fraction = CHAMBER_FRACTION if ox_open and fuel_open else COLD_FLOW_FRACTION if ox_open or fuel_open else 0.0
+        targets = np.array([p3, p5, p6, p7, fraction * p7])
+        self.lines += (targets - self.lines) * (STEP / LINE_TAU)
+
+        # Chamber wall heats with chamber pressure, the oxidizer line is chilled by flowing N2O
+        heating = np.array([0.02 * self.lines[4], -0.5 * ox_open * np.sqrt(p_tank_ox), 0.0])
+        self.temperatures += (heating - 0.05 * (self.temperatures - 20.0)) * STEP
+
+        # Propellant loaded follows the fill and main valve flows
+        fill = np.array([flow[VALVE_NAMES.index("NCS2")], flow[VALVE_NAMES.index("NCS5")]])
+        drain = np.array([flow[VALVE_NAMES.index("GV-1")], flow[VALVE_NAMES.index("GV-2")]])
+        self.masses = np.maximum(self.masses + 0.01 * (fill - drain) * STEP, 0.0)
+        self.time += STEP
+
+    def outputs(self):
+        thrust = THRUST_PER_PSI * self.lines[4]
+        return np.concatenate((self.nodes[[GN2_BOTTLE, OX_TANK]], self.lines[:1], self.nodes[[FUEL_TANK]],
+                               self.lines[1:], self.temperatures, thrust * LOAD_CELL_SHARE, self.masses))
+
+    def sample(self, times):
+        """Step the model up to each of the given times (s) and return the (len(times), channels) readings"""
+        readings = self.rng.normal(0.0, self.noise, (len(times), len(self.channels)))
+        with self.lock:
+            for row, t in enumerate(times):
+                while self.time + STEP <= t:
+                    self.step()
+                readings[row, self.modeled] += self.outputs()[self.output_index]
+        return readings
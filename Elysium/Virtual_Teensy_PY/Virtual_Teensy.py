@@ -0,0 +1,222 @@
+# Virtual_Teensy.py
+# A Python stand-in for the flight MCU that speaks the Elysium2 Ethernet protocol over TCP, for stress testing the
+# GUI (Elysium_GUI2) on one machine with no hardware. It streams key:value telemetry at a configurable sample rate
+# and channel count, and echoes and records every command (VALVE:..., NOOP) that it receives. SYNC requests are
+# answered with its clock, which can be given a drift to exercise the GUI's clock synchronization.
+#
+# By default the readings come from the feed system model in Plant_Model.py, which responds to the valve commands.
+#
+# Usage: python Virtual_Teensy.py [--port 8888] [--rate 1000] [--channels 16] [--format comma|space] [--log FILE]
+#                                 [--source plant|noise] [--noise PSI] [--fault stuck_vent] [--drift PPM]
+import argparse, socket, threading, time
+import numpy as np
+from Plant_Model import PlantModel
+
+# The channels that the Elysium2 GUI displays, in the order they are generated. Extra channels are named S17, S18, ...
+DEFAULT_CHANNELS = [f"P{i}" for i in range(1, 9)] + [f"TC{i}" for i in range(1, 4)] + \
+                   [f"LC{i}" for i in range(1, 4)] + [f"B{i}" for i in range(1, 3)]
+
+# Time between batches of telemetry. Every batch holds all of the frames that came due since the previous one,
+# so high sample rates cost one socket write per batch instead of one per frame
+BATCH_INTERVAL = 0.005
+
+def channel_names(count):
+    return DEFAULT_CHANNELS[:count] + [f"S{i}" for i in range(len(DEFAULT_CHANNELS) + 1, count + 1)]
+
+class NoiseSource:
+    """Random readings around a fixed level per channel type, like the original Virtual_Teensy.py"""
+    LEVELS = {"P": 30.0, "TC": 20.0, "LC": 0.0, "B": 0.0}
+
+    def __init__(self, channels, seed=None):
+        self.channels = channels
+        self.rng = np.random.default_rng(seed)
+        self.levels = np.array([next((level for prefix, level in self.LEVELS.items() if name.startswith(prefix)), 0.0)
+                                for name in channels])
+
+    def set_valve(self, name, state):
+        pass
+
+    def restart_clock(self):
+        pass
+
+    def sample(self, times):
+        """Return a (len(times), channels) array of readings at the given times (in seconds)"""
+        return self.levels + self.rng.random((len(times), len(self.channels)))
+
+class TelemetryFormatter:
+    """
+    Turns a batch of readings into telemetry lines. The "comma" format is the one in Elysium/README.md
+    ("t:123,P1:1.0,P2:2.0"), the "space" format is the older one with the timestamp first and pairs separated by
+    spaces ("123 P1:1.0 P2:2.0"). The Elysium2 GUI accepts both.
+    """
+    def __init__(self, channels, fmt="comma", precision=3):
+        if fmt == "comma":
+            template = ",".join(["t:%d"] + [f"{name}:%.{precision}f" for name in channels])
+        else:
+            template = " ".join(["%d"] + [f"{name}:%.{precision}f" for name in channels])
+        self.template = template + "\r\n"
+
+    def format(self, micros, values):
+        rows = np.column_stack((micros, values)).tolist()
+        return "".join(self.template % tuple(row) for row in rows).encode()
+
+class VirtualTeensy:
+    def __init__(self, host="0.0.0.0", port=8888, rate=100.0, channels=None, fmt="comma", source=None, log_file=None,
+                 drift=0.0):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.channels = channels or list(DEFAULT_CHANNELS)
+        self.formatter = TelemetryFormatter(self.channels, fmt)
+        self.source = source or NoiseSource(self.channels)
+        self.log_file = log_file
+        self.drift = drift          # How fast (ppm) the simulated micros() clock runs compared to this computer's
+
+        self.received = []          # (seconds since start, command) for every command received
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.start_time = None
+        self.running = False
+
+    def serve_forever(self):
+        """Accept one GUI connection at a time, like the MCU, until interrupted"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((self.host, self.port))
+        server.listen(1)
+        print(f"Virtual Teensy listening on {self.host}:{self.port} "
+              f"({len(self.channels)} channels at {self.rate:g} Hz)")
+        try:
+            while True:
+                conn, addr = server.accept()
+                print(f"Connected to {addr[0]}:{addr[1]}")
+                self.handle_connection(conn)
+                print("Disconnected")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+
+    def micros(self):
+        """The simulated Teensy clock, in microseconds since the connection (unlike micros(), it does not wrap)"""
+        return (time.perf_counter() - self.start_time) * (1 + self.drift * 1e-6) * 1e6
+
+    def handle_connection(self, conn):
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.running = True
+        self.start_time = time.perf_counter()
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        # The sample times start over with the connection, so the source's clock has to as well
+        self.source.restart_clock()
+        receiver = threading.Thread(target=self.receive_loop, args=(conn,), daemon=True)
+        receiver.start()
+        try:
+            self.send_loop(conn)
+        finally:
+            self.running = False
+            conn.close()
+            receiver.join(1)
+
+    def send_loop(self, conn):
+        next_report = self.start_time + 1
+        while self.running:
+            # Generate every frame that has come due, stamped with the sample time in microseconds (like micros())
+            elapsed = self.micros() / 1e6
+            due = int(elapsed * self.rate) - self.frames_sent
+            if due > 0:
+                times = (self.frames_sent + np.arange(due)) / self.rate
+                data = self.formatter.format(times * 1e6, self.source.sample(times))
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    break
+                self.frames_sent += due
+                self.bytes_sent += len(data)
+
+            now = time.perf_counter()
+            if now >= next_report:
+                self.report(now)
+                next_report += 1
+            time.sleep(BATCH_INTERVAL)
+
+    def receive_loop(self, conn):
+        buffer = b""
+        while self.running:
+            try:
+                data = conn.recv(1024)
+            except OSError:
+                break
+            if not data:
+                break
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                self.handle_command(conn, line.decode(errors="ignore").strip())
+        self.running = False
+
+    def handle_command(self, conn, command):
+        if not command:
+            return
+        t = time.perf_counter() - self.start_time
+        self.received.append((t, command))
+        if self.log_file:
+            self.log_file.write(f"{t:.6f},{command}\n")
+            self.log_file.flush()
+
+        if command.startswith("VALVE:"):
+            parts = command.split(":")
+            if len(parts) == 3:
+                self.source.set_valve(parts[1], parts[2] == "1")
+        if command.startswith("SYNC:"):
+            try:
+                conn.sendall(f"{command}:{self.micros():.0f}\r\n".encode())
+            except OSError:
+                pass
+        if command.startswith("VALVE:") or command == "NOOP":
+            try:
+                conn.sendall(f"{command}\r\n".encode())
+            except OSError:
+                pass
+
+    def report(self, now):
+        elapsed = now - self.start_time
+        target = int(elapsed * self.rate)
+        # If the GUI stops reading, sendall blocks and the frames sent fall behind the target
+        print(f"{elapsed:7.1f}s  sent {self.frames_sent} frames ({self.frames_sent / elapsed:.0f}/s, "
+              f"{self.bytes_sent / elapsed / 1e3:.0f} kB/s), behind by {target - self.frames_sent}, "
+              f"received {len(self.received)} commands")
+
+def main():
+    parser = argparse.ArgumentParser(description="Python virtual Teensy for stress testing the Elysium2 GUI")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--rate", type=float, default=100, help="Frames per second (10 to 10000)")
+    parser.add_argument("--channels", type=int, default=len(DEFAULT_CHANNELS), help="Number of channels per frame")
+    parser.add_argument("--format", choices=["comma", "space"], default="comma", help="Telemetry line format")
+    parser.add_argument("--log", help="File to record every received command in")
+    parser.add_argument("--source", choices=["plant", "noise"], default="plant", help="Where the readings come from")
+    parser.add_argument("--noise", type=float, default=0.2, help="Standard deviation of the plant model's sensor noise")
+    parser.add_argument("--fault", choices=["stuck_vent"], help="Fault to inject into the plant model")
+    parser.add_argument("--drift", type=float, default=0, help="Drift of the simulated clock (ppm)")
+    args = parser.parse_args()
+
+    if not 10 <= args.rate <= 10000:
+        parser.error("--rate must be between 10 and 10000")
+
+    channels = channel_names(args.channels)
+    if args.source == "plant":
+        source = PlantModel(channels, noise=args.noise, fault=args.fault)
+    else:
+        source = NoiseSource(channels)
+
+    log_file = open(args.log, "w") if args.log else None
+    try:
+        VirtualTeensy(args.host, args.port, args.rate, channels, args.format, source, log_file,
+                      args.drift).serve_forever()
+    finally:
+        if log_file:
+            log_file.close()
+
+if __name__ == "__main__":
+    main()